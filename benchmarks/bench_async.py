@@ -0,0 +1,153 @@
+"""
+Throughput and tail latency of DB_MODE=sync versus DB_MODE=async under
+increasing client concurrency.
+
+Each mode runs a real uvicorn server in a subprocess against the same seeded
+SQLite file; an httpx.AsyncClient keeps `concurrency` requests in flight for
+a mix of patient reads, one-day listings and bookings.
+
+    python -m benchmarks.bench_async --concurrency 1 8 32 128 --duration 5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import create_engine, insert
+
+from benchmarks.common import emit, latency_stats, uvicorn_server
+from src.models.model import Appointment, Base, Doctor, Patient
+
+DAY = date(2030, 1, 15)
+DOCTORS = 200
+PATIENTS = 2000
+
+
+def seed(url: str) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    start = datetime.combine(DAY, datetime.min.time(), tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Patient),
+            [
+                {
+                    "fname": f"F{i}",
+                    "lname": f"L{i}",
+                    "email": f"p{i}@example.com",
+                    "age": 18 + i % 70,
+                }
+                for i in range(PATIENTS)
+            ],
+        )
+        conn.execute(
+            insert(Doctor),
+            [{"full_name": f"Dr. {i}", "specialty": "General"} for i in range(DOCTORS)],
+        )
+        # Mornings are booked; afternoons are left for the write traffic
+        conn.execute(
+            insert(Appointment),
+            [
+                {
+                    "patient_id": 1 + i % PATIENTS,
+                    "doctor_id": 1 + i // 8,
+                    "reason": "benchmark row",
+                    "start_time": start + timedelta(hours=8, minutes=30 * (i % 8)),
+                    "duration": 30,
+                }
+                for i in range(DOCTORS * 8)
+            ],
+        )
+    engine.dispose()
+
+
+def request_factory(rng: random.Random, future_day: date):
+    minutes = iter(range(10**9))
+    base = datetime.combine(future_day, datetime.min.time(), tzinfo=timezone.utc)
+
+    def next_request() -> tuple[str, str, dict | None]:
+        roll = rng.random()
+        if roll < 0.6:
+            return "GET", f"/patients/{rng.randint(1, PATIENTS)}", None
+        if roll < 0.9:
+            doctor = rng.randint(1, DOCTORS)
+            return "GET", f"/appointments?date={DAY}&doctor_id={doctor}", None
+        # Distinct 15 minute slots so bookings measure inserts, not conflicts
+        slot = next(minutes)
+        body = {
+            "patient_id": rng.randint(1, PATIENTS),
+            "doctor_id": 1 + slot % DOCTORS,
+            "reason": "benchmark booking",
+            "start_time": (
+                base + timedelta(minutes=15 * (slot // DOCTORS))
+            ).isoformat(),
+            "duration": 15,
+        }
+        return "POST", "/appointments", body
+
+    return next_request
+
+
+async def load(base_url: str, concurrency: int, duration: float, seed: int) -> dict:
+    rng = random.Random(seed)
+    next_request = request_factory(rng, date.today() + timedelta(days=30 + seed))
+    samples: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                method, path, body = next_request()
+                t0 = time.perf_counter()
+                response = await client.request(method, path, json=body)
+                samples.append(time.perf_counter() - t0)
+                if response.status_code >= 400:
+                    errors += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    return {
+        "concurrency": concurrency,
+        "rps": len(samples) / elapsed,
+        "errors": errors,
+        **latency_stats(samples),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per step")
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"])
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes:
+            # A fresh copy per mode so both servers see identical data
+            url = f"sqlite:///{os.path.join(tmp, f'{mode}.db')}"
+            seed(url)
+            with uvicorn_server(url, DB_MODE=mode) as (base_url, _):
+                for step, concurrency in enumerate(args.concurrency):
+                    stats = asyncio.run(
+                        load(base_url, concurrency, args.duration, step)
+                    )
+                    results.append({"mode": mode, **stats})
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
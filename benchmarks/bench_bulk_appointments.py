@@ -0,0 +1,76 @@
+"""
+Rows per second for POST /appointments/bulk versus looping POST /appointments.
+
+Both paths run in-process through TestClient against a temporary database,
+booking the same shape of non-overlapping schedule.
+
+    python -m benchmarks.bench_bulk_appointments --rows 2000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from benchmarks.common import app_on_engine, emit, session_factory, temp_engine
+from src.models.model import Doctor, Patient
+
+
+def payloads(rows: int, doctors: int, day_offset: int) -> list[dict]:
+    base = (datetime.now(timezone.utc) + timedelta(days=day_offset)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return [
+        {
+            "patient_id": 1,
+            "doctor_id": 1 + i % doctors,
+            "start_time": (base + timedelta(minutes=30 * (i // doctors))).isoformat(),
+            "duration": 30,
+        }
+        for i in range(rows)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--doctors", type=int, default=20)
+    args = parser.parse_args()
+
+    with temp_engine() as engine:
+        with session_factory(engine)() as db:
+            db.add(Patient(fname="B", lname="K", email="b@k.io", ph_no="0", age=30))
+            db.add_all(
+                Doctor(full_name=f"Dr. {i}", specialty="Bulk")
+                for i in range(args.doctors)
+            )
+            db.commit()
+
+        with app_on_engine(engine) as app:
+            client = TestClient(app)
+
+            looped = payloads(args.rows, args.doctors, day_offset=10)
+            t0 = time.perf_counter()
+            for body in looped:
+                assert client.post("/appointments", json=body).status_code == 201
+            loop_seconds = time.perf_counter() - t0
+
+            batch = payloads(args.rows, args.doctors, day_offset=400)
+            t0 = time.perf_counter()
+            resp = client.post("/appointments/bulk", json=batch)
+            bulk_seconds = time.perf_counter() - t0
+            assert all(r["status"] == "created" for r in resp.json())
+
+    emit(
+        {
+            "rows": args.rows,
+            "loop_rows_per_sec": args.rows / loop_seconds,
+            "bulk_rows_per_sec": args.rows / bulk_seconds,
+            "speedup": loop_seconds / bulk_seconds,
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
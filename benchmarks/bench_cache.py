@@ -0,0 +1,82 @@
+"""
+Hot-read latency of GET /patients/{id} and GET /doctors/{id} with the
+read-through cache disabled and enabled.
+
+    python -m benchmarks.bench_cache --requests 5000 --hot 100
+"""
+
+import argparse
+import random
+
+from sqlalchemy import insert
+
+from benchmarks.common import app_on_engine, asgi_get, emit, measure, temp_engine
+from src.models.model import Doctor, Patient
+from src.services.cache import doctor_cache, patient_cache
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--hot", type=int, default=100, help="distinct ids read")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with temp_engine() as engine:
+        with engine.begin() as conn:
+            conn.execute(
+                insert(Patient),
+                [
+                    {
+                        "fname": f"F{i}",
+                        "lname": f"L{i}",
+                        "email": f"p{i}@example.com",
+                        "ph_no": "5550000000",
+                        "age": 18 + i % 70,
+                    }
+                    for i in range(args.rows)
+                ],
+            )
+            conn.execute(
+                insert(Doctor),
+                [
+                    {"full_name": f"Dr. {i}", "specialty": "General"}
+                    for i in range(args.rows)
+                ],
+            )
+
+        hot = rng.sample(range(1, args.rows + 1), args.hot)
+        results = []
+        with app_on_engine(engine) as app:
+            for resource, cache in (
+                ("patients", patient_cache),
+                ("doctors", doctor_cache),
+            ):
+                configured = cache.maxsize
+                for label, maxsize in (("uncached", 0), ("cached", configured)):
+                    cache.maxsize = maxsize
+                    cache.clear()
+
+                    def read():
+                        status, _, _ = asgi_get(app, f"/{resource}/{rng.choice(hot)}")
+                        assert status == 200
+
+                    # Warm the hot set (and the connection pool) first
+                    for _ in range(args.hot * 2):
+                        read()
+                    results.append(
+                        {
+                            "resource": resource,
+                            "mode": label,
+                            **measure(read, args.requests),
+                            "cache": cache.stats(),
+                        }
+                    )
+                cache.maxsize = configured
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
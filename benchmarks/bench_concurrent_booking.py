@@ -0,0 +1,128 @@
+"""
+Throughput of create_appointment under concurrent, conflicting writers.
+
+Every thread books random slots for a small pool of doctors through its own
+session on one shared engine. The run fails loudly if any doctor ends up
+double-booked.
+
+    python -m benchmarks.bench_concurrent_booking --threads 16 --bookings 5000
+"""
+
+import argparse
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from benchmarks.common import emit, session_factory, temp_engine
+from src.models.model import Appointment, Doctor, Patient
+from src.schemas.schema import AppointmentCreate
+from src.services.queries import create_appointment
+from src.services.utils import as_utc
+
+
+def count_overlaps(rows) -> int:
+    count, last_end = 0, {}
+    for doctor_id, start, duration in sorted(rows):
+        start = as_utc(start)
+        if doctor_id in last_end and start < last_end[doctor_id]:
+            count += 1
+        end = start + timedelta(minutes=duration)
+        last_end[doctor_id] = max(end, last_end.get(doctor_id, end))
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--bookings", type=int, default=4000)
+    parser.add_argument("--doctors", type=int, default=5)
+    parser.add_argument("--slots", type=int, default=200)
+    parser.add_argument("--url", help="database URL (default: temporary SQLite)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = []
+    for threads in args.threads:
+        with temp_engine(args.url) as engine:
+            Session = session_factory(engine)
+            with Session() as db:
+                db.add(Patient(fname="L", lname="T", email="l@t.io", ph_no="0", age=1))
+                db.add_all(
+                    Doctor(full_name=f"Dr. {i}", specialty="Load")
+                    for i in range(args.doctors)
+                )
+                db.commit()
+
+            base = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=1)
+            per_thread = args.bookings // threads
+            counts = {"created": 0, "conflict": 0, "error": 0}
+            lock = threading.Lock()
+            barrier = threading.Barrier(threads + 1)
+
+            def worker(seed):
+                rng = random.Random(seed)
+                local = dict.fromkeys(counts, 0)
+                barrier.wait()
+                with Session() as db:
+                    for _ in range(per_thread):
+                        payload = AppointmentCreate(
+                            patient_id=1,
+                            doctor_id=rng.randint(1, args.doctors),
+                            start_time=base
+                            + timedelta(minutes=15 * rng.randrange(args.slots)),
+                            duration=rng.choice([15, 30, 45, 60]),
+                        )
+                        try:
+                            create_appointment(db, payload)
+                            local["created"] += 1
+                        except HTTPException:
+                            local["conflict"] += 1
+                        except Exception:
+                            db.rollback()
+                            local["error"] += 1
+                with lock:
+                    for key, value in local.items():
+                        counts[key] += value
+
+            pool = [
+                threading.Thread(target=worker, args=(args.seed + i,))
+                for i in range(threads)
+            ]
+            for t in pool:
+                t.start()
+            barrier.wait()
+            t0 = time.perf_counter()
+            for t in pool:
+                t.join()
+            elapsed = time.perf_counter() - t0
+
+            with Session() as db:
+                rows = db.execute(
+                    select(
+                        Appointment.doctor_id,
+                        Appointment.start_time,
+                        Appointment.duration,
+                    )
+                ).all()
+            overlaps = count_overlaps(rows)
+            results.append(
+                {
+                    "threads": threads,
+                    "attempts": per_thread * threads,
+                    **counts,
+                    "overlaps": overlaps,
+                    "seconds": elapsed,
+                    "attempts_per_sec": per_thread * threads / elapsed,
+                }
+            )
+            if overlaps:
+                raise SystemExit(f"double booking detected: {results[-1]}")
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Polling with and without conditional requests.
+
+Clients re-poll the same patient, doctor and day listing. "plain" polls
+send no validators; "conditional" polls send the ETag from the previous
+response, so unchanged resources come back as empty 304s. For each
+resource it reports bytes on the wire and CPU time per poll.
+
+    python -m benchmarks.bench_conditional_get --rows 1000 --polls 500
+"""
+
+import argparse
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from benchmarks.common import (
+    app_on_engine,
+    asgi_get,
+    emit,
+    session_factory,
+    temp_engine,
+)
+from src.models.model import Appointment, Doctor, Patient
+from src.services.summary import rebuild_daily_summary
+
+DAY = date(2030, 1, 15)
+
+
+def seed(engine, rows: int) -> None:
+    start = datetime.combine(DAY, datetime.min.time(), tzinfo=timezone.utc)
+    slots = 48
+    doctors = rows // slots + 1
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Patient), [{"fname": "P", "lname": "L", "email": "p@l.io", "age": 1}]
+        )
+        conn.execute(
+            insert(Doctor),
+            [{"full_name": f"Dr. {i}", "specialty": "Poll"} for i in range(doctors)],
+        )
+        conn.execute(
+            insert(Appointment),
+            [
+                {
+                    "patient_id": 1,
+                    "doctor_id": 1 + i // slots,
+                    "reason": "follow-up",
+                    "start_time": start + timedelta(minutes=30 * (i % slots)),
+                    "duration": 30,
+                }
+                for i in range(rows)
+            ],
+        )
+    with session_factory(engine)() as db:
+        rebuild_daily_summary(db)
+
+
+def poll(app, path: str, query: str, polls: int, conditional: bool) -> dict:
+    etag = None
+    wire = 0
+    cpu = time.process_time()
+    for _ in range(polls):
+        headers = [("If-None-Match", etag)] if conditional and etag else []
+        status, response_headers, size = asgi_get(app, path, query, headers)
+        assert status in (200, 304)
+        etag = response_headers.get("etag", etag)
+        wire += size
+    cpu = time.process_time() - cpu
+    return {
+        "bytes_per_poll": wire / polls,
+        "cpu_ms_per_poll": 1000 * cpu / polls,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--polls", type=int, default=500)
+    args = parser.parse_args()
+
+    results = []
+    with temp_engine() as engine:
+        seed(engine, args.rows)
+        with app_on_engine(engine) as app:
+            for resource, path, query in (
+                ("patient", "/patients/1", ""),
+                ("doctor", "/doctors/1", ""),
+                ("day_listing", "/appointments", f"date={DAY}"),
+            ):
+                plain = poll(app, path, query, args.polls, conditional=False)
+                conditional = poll(app, path, query, args.polls, conditional=True)
+                results.append(
+                    {
+                        "resource": resource,
+                        "plain": plain,
+                        "conditional": conditional,
+                        "bytes_saved": 1
+                        - conditional["bytes_per_poll"] / plain["bytes_per_poll"],
+                        "cpu_speedup": plain["cpu_ms_per_poll"]
+                        / conditional["cpu_ms_per_poll"],
+                    }
+                )
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
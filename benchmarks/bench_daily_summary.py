@@ -0,0 +1,84 @@
+"""
+Dashboard aggregates from the DailyScheduleSummary rollup versus aggregating
+full appointment rows in Python.
+
+For windows of 1, 7 and 30 days it times the naive path (load every
+appointment in the window, count per doctor and day) against
+get_daily_summary, checks both give the same numbers, and reports how long
+a full rebuild of the rollup takes.
+
+    python -m benchmarks.bench_daily_summary --appointments 1000000
+"""
+
+import argparse
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from benchmarks import dataset
+from benchmarks.common import emit, measure, session_factory, temp_engine
+from src.services.queries import get_appointments_in_range
+from src.services.summary import get_daily_summary, rebuild_daily_summary
+from src.services.utils import as_utc
+
+
+def naive_summary(db, start_date, end_date) -> dict:
+    totals = defaultdict(lambda: [0, 0])
+    for appt in get_appointments_in_range(db, start_date, end_date):
+        key = (appt.doctor_id, as_utc(appt.start_time).date())
+        totals[key][0] += 1
+        totals[key][1] += appt.duration
+    return {key: tuple(value) for key, value in totals.items()}
+
+
+def rollup_summary(db, start_date, end_date) -> dict:
+    return {
+        (s.doctor_id, s.day): (s.appointments, s.booked_minutes)
+        for s in get_daily_summary(db, start_date, end_date)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    dataset.add_arguments(parser)
+    parser.add_argument("--windows", type=int, nargs="+", default=[1, 7, 30])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    spec = dataset.spec_from_args(args)
+
+    results = []
+    with temp_engine() as engine:
+        ds = dataset.generate(engine, spec)
+        with session_factory(engine)() as db:
+            t0 = time.perf_counter()
+            rows = rebuild_daily_summary(db)
+            rebuild_seconds = time.perf_counter() - t0
+            results.append(
+                {
+                    "appointments": ds.appointments,
+                    "summary_rows": rows,
+                    "rebuild_seconds": rebuild_seconds,
+                    "rebuild_rows_per_sec": ds.appointments / rebuild_seconds,
+                }
+            )
+
+            start = spec.start + timedelta(days=7)
+            for days in args.windows:
+                end = start + timedelta(days=days - 1)
+                assert naive_summary(db, start, end) == rollup_summary(db, start, end)
+                results.append(
+                    {
+                        "window_days": days,
+                        "naive": measure(
+                            lambda: naive_summary(db, start, end), args.repeat
+                        ),
+                        "rollup": measure(
+                            lambda: rollup_summary(db, start, end), args.repeat
+                        ),
+                    }
+                )
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Bytes on the wire and encode cost of appointment listings per format and
+content coding.
+
+Formats are the default row-object JSON, arrays-of-columns JSON and
+MessagePack (when msgpack is installed). Codings are identity, gzip and br
+(when brotli is installed). "encode_ms" covers serialization plus
+compression of one day's rows. "request_ms" is a whole GET /appointments
+through the app with the matching Accept and Accept-Encoding headers.
+
+    python -m benchmarks.bench_encodings --sizes 1000 10000 100000
+"""
+
+import argparse
+
+from benchmarks.bench_serialization import DAY, best_of, seed
+from benchmarks.common import (
+    app_on_engine,
+    asgi_get,
+    emit,
+    session_factory,
+    temp_engine,
+)
+from src.compression import _Compressor, supported_encodings
+from src.services import serialization
+from src.services.queries import get_appointments_in_range
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    codings = ("identity",) + supported_encodings()
+    results = []
+    for size in args.sizes:
+        with temp_engine() as engine:
+            seed(engine, size)
+            with session_factory(engine)() as db:
+                rows = get_appointments_in_range(db, DAY, DAY, columns=True)
+
+            with app_on_engine(engine) as app:
+                for media_type in serialization.listing_media_types():
+                    for coding in codings:
+
+                        def encode():
+                            body = serialization.encode_appointments(rows, media_type)
+                            if coding != "identity":
+                                body = _Compressor(coding).finish(body)
+                            return body
+
+                        headers = [("Accept", media_type), ("Accept-Encoding", coding)]
+
+                        def request():
+                            status, _, _ = asgi_get(
+                                app, "/appointments", f"date={DAY}", headers
+                            )
+                            assert status == 200
+
+                        status, response_headers, wire = asgi_get(
+                            app, "/appointments", f"date={DAY}", headers
+                        )
+                        assert status == 200
+                        assert response_headers.get("content-encoding", "identity") == (
+                            coding
+                        )
+                        results.append(
+                            {
+                                "rows": size,
+                                "format": media_type,
+                                "coding": coding,
+                                "bytes": wire,
+                                "bytes_per_row": wire / size,
+                                "encode_ms": 1000 * best_of(encode, args.repeat),
+                                "request_ms": 1000 * best_of(request, args.repeat),
+                            }
+                        )
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Embedding patients and doctors in a day listing: one expanded request
+versus the listing plus a GET per row for each related object (N+1).
+
+Both variants run in-process against the same seeded day. "queries" counts
+SQL statements sent to the database for one client-side view of the day;
+patient and doctor caches are cleared first so the N+1 variant pays for
+its lookups as a cold client would.
+
+    python -m benchmarks.bench_expand --rows 100 1000
+"""
+
+import argparse
+import time
+
+from sqlalchemy import event
+
+from benchmarks.bench_conditional_get import DAY, seed
+from benchmarks.common import app_on_engine, asgi_get, emit, temp_engine
+from src.services.cache import doctor_cache, patient_cache
+
+SLOTS = 48  # appointments per doctor in bench_conditional_get.seed
+
+
+def expanded(app) -> None:
+    status, _, _ = asgi_get(app, "/appointments", f"date={DAY}&expand=patient,doctor")
+    assert status == 200
+
+
+def n_plus_one(app, rows: int) -> None:
+    status, _, _ = asgi_get(app, "/appointments", f"date={DAY}")
+    assert status == 200
+    for i in range(rows):
+        asgi_get(app, "/patients/1")
+        asgi_get(app, f"/doctors/{1 + i // SLOTS}")
+
+
+def run(engine, fn) -> dict:
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    patient_cache.clear()
+    doctor_cache.clear()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return {"queries": statements, "ms": 1000 * elapsed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        with temp_engine() as engine:
+            seed(engine, rows)
+            with app_on_engine(engine) as app:
+                one = run(engine, lambda: expanded(app))
+                many = run(engine, lambda: n_plus_one(app, rows))
+            results.append(
+                {
+                    "rows": rows,
+                    "expanded": one,
+                    "n_plus_one": many,
+                    "speedup": many["ms"] / one["ms"],
+                }
+            )
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Write throughput of single-row creates with and without group commit.
+
+Threads create patients, or book non-conflicting appointments, one call at
+a time through their own sessions, as concurrent POST requests would. Each
+window size installs a GroupCommitter with that window (0 = one commit per
+call, the default). Reports creates/s, call latency and the mean number of
+rows per commit. Runs on a durable SQLite file (SQLITE_PROFILE default, so
+each commit is an fsync) unless --profile says otherwise.
+
+    python -m benchmarks.bench_group_commit --threads 32 --windows 0 1 2 5 10
+"""
+
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from benchmarks.common import emit, latency_stats, session_factory, temp_engine
+from src.models.model import Doctor, Patient
+from src.schemas.schema import AppointmentCreate, PatientCreate
+from src.services import queries
+from src.services.group_commit import GroupCommitter
+
+START = datetime(2031, 1, 6, 8, 0, tzinfo=timezone.utc)
+KINDS = {
+    "patient": ("patient_writes", queries.create_patient),
+    "appointment": ("appointment_writes", queries.create_appointment),
+}
+
+
+def payload(kind: str, thread: int, i: int):
+    if kind == "patient":
+        return PatientCreate(
+            fname="W", lname="B", email=f"w{thread}.{i}@example.com", age=40
+        )
+    # One doctor per thread, back-to-back slots: contention but no conflicts
+    return AppointmentCreate(
+        patient_id=1,
+        doctor_id=thread + 1,
+        start_time=START + timedelta(minutes=15 * i),
+        duration=15,
+    )
+
+
+def run(engine, kind: str, threads: int, per_thread: int) -> dict:
+    _, create = KINDS[kind]
+    Session = session_factory(engine)
+    barrier = threading.Barrier(threads + 1)
+    samples: list[float] = []
+    lock = threading.Lock()
+
+    def worker(thread: int):
+        local = []
+        barrier.wait()
+        for i in range(per_thread):
+            with Session() as db:
+                t0 = time.perf_counter()
+                create(db, payload(kind, thread, i))
+                local.append(time.perf_counter() - t0)
+        with lock:
+            samples.extend(local)
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for t in pool:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    return {"creates_per_s": len(samples) / elapsed, **latency_stats(samples)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--per-thread", type=int, default=50)
+    parser.add_argument("--windows", type=float, nargs="+", default=[0, 1, 2, 5, 10])
+    parser.add_argument("--kinds", nargs="+", default=list(KINDS), choices=KINDS)
+    parser.add_argument("--profile", default="default")
+    args = parser.parse_args()
+
+    results = []
+    for kind in args.kinds:
+        name, _ = KINDS[kind]
+        original = getattr(queries, name)
+        for window in args.windows:
+            committer = GroupCommitter(original.run_batch, window_ms=window)
+            setattr(queries, name, committer)
+            try:
+                with temp_engine(profile=args.profile) as engine:
+                    with engine.begin() as conn:
+                        conn.execute(
+                            insert(Patient),
+                            [{"fname": "P", "lname": "L", "email": "p@l.io", "age": 1}],
+                        )
+                        conn.execute(
+                            insert(Doctor),
+                            [
+                                {"full_name": f"Dr. {i}", "specialty": "W"}
+                                for i in range(args.threads)
+                            ],
+                        )
+                    stats = run(engine, kind, args.threads, args.per_thread)
+            finally:
+                setattr(queries, name, original)
+            batching = committer.stats() if committer.enabled else {}
+            results.append(
+                {
+                    "kind": kind,
+                    "window_ms": window,
+                    "threads": args.threads,
+                    "rows_per_commit": batching.get("mean_batch", 1.0),
+                    **stats,
+                }
+            )
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Peak RSS of GET /appointments versus GET /appointments/stream for one day.
+
+Each measurement runs in a fresh subprocess so ru_maxrss reflects only that
+request. The streaming endpoint should stay flat as the day grows.
+
+    python -m benchmarks.bench_listing_memory --sizes 1000 10000 100000
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, insert
+
+from benchmarks.common import app_on_engine, asgi_get, emit
+from src.models.model import Appointment, Base
+
+DAY = date(2030, 1, 15)
+
+
+def seed(url: str, rows: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    start = datetime.combine(DAY, datetime.min.time(), tzinfo=timezone.utc)
+    slots = 48  # 30 minute slots per doctor per day
+    with engine.begin() as conn:
+        for lo in range(0, rows, 50_000):
+            conn.execute(
+                insert(Appointment),
+                [
+                    {
+                        "patient_id": 1,
+                        "doctor_id": 1 + i // slots,
+                        "reason": "benchmark row",
+                        "start_time": start + timedelta(minutes=30 * (i % slots)),
+                        "duration": 30,
+                    }
+                    for i in range(lo, min(lo + 50_000, rows))
+                ],
+            )
+    engine.dispose()
+
+
+def child(url: str, path: str) -> None:
+    engine = create_engine(url)
+    with app_on_engine(engine) as app:
+        # Warm imports and the first connection before taking the baseline
+        asgi_get(app, "/health")
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        status, _, nbytes = asgi_get(app, path, f"date={DAY.isoformat()}")
+        after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    assert status == 200, status
+    # ru_maxrss is KiB on Linux
+    print(f"{(after - before) / 1024:.2f} {after / 1024:.2f} {nbytes}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--child", nargs=2, metavar=("URL", "PATH"))
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            url = f"sqlite:///{os.path.join(tmp, f'listing_{size}.db')}"
+            seed(url, size)
+            for path in ("/appointments", "/appointments/stream"):
+                out = subprocess.run(
+                    [sys.executable, "-m", __spec__.name, "--child", url, path],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout.split()
+                growth, peak, nbytes = out[-3:]
+                results.append(
+                    {
+                        "rows": size,
+                        "endpoint": path,
+                        "rss_growth_mb": float(growth),
+                        "peak_rss_mb": float(peak),
+                        "response_bytes": int(nbytes),
+                    }
+                )
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
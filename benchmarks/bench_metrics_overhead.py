@@ -0,0 +1,112 @@
+"""
+Per-request cost of the metrics middleware and SQL event hooks.
+
+Runs the same GET mix with instrumentation off, on, and on with SQL capture
+for the slow-request log (threshold set high enough that nothing is logged).
+The caches are disabled so every request reaches the database.
+
+    python -m benchmarks.bench_metrics_overhead --requests 5000
+"""
+
+import argparse
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from benchmarks.common import app_on_engine, asgi_get, emit, measure, temp_engine
+from src.models.model import Appointment, Doctor, Patient
+from src.observability import metrics
+from src.services.cache import doctor_cache, patient_cache
+
+DAY = date(2030, 1, 15)
+MODES = {
+    "off": (False, None),
+    "on": (True, None),
+    "on+slow_log": (True, 60_000.0),
+}
+
+
+def seed(engine, rows: int) -> None:
+    start = datetime.combine(DAY, datetime.min.time(), tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Patient),
+            [
+                {"fname": "F", "lname": "L", "email": f"p{i}@example.com", "age": 40}
+                for i in range(rows)
+            ],
+        )
+        conn.execute(
+            insert(Doctor),
+            [{"full_name": f"Dr. {i}", "specialty": "Ops"} for i in range(rows)],
+        )
+        conn.execute(
+            insert(Appointment),
+            [
+                {
+                    "patient_id": 1 + i % rows,
+                    "doctor_id": 1 + i % rows,
+                    "reason": "benchmark row",
+                    "start_time": start + timedelta(minutes=15 * (i // rows)),
+                    "duration": 15,
+                }
+                for i in range(rows * 8)
+            ],
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3, help="interleaved repeats")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    sizes = (patient_cache.maxsize, doctor_cache.maxsize)
+    patient_cache.maxsize = doctor_cache.maxsize = 0
+    samples = {mode: [] for mode in MODES}
+    try:
+        with temp_engine() as engine:
+            seed(engine, args.rows)
+            with app_on_engine(engine) as app:
+
+                def request():
+                    roll = rng.random()
+                    if roll < 0.5:
+                        path, query = f"/patients/{rng.randint(1, args.rows)}", ""
+                    elif roll < 0.8:
+                        path, query = f"/doctors/{rng.randint(1, args.rows)}", ""
+                    else:
+                        doctor = rng.randint(1, args.rows)
+                        path, query = "/appointments", f"date={DAY}&doctor_id={doctor}"
+                    status, _, _ = asgi_get(app, path, query)
+                    assert status == 200, status
+
+                for _ in range(200):
+                    request()
+                # Alternate modes so drift (page cache, CPU clocks) hits all alike
+                for _ in range(args.rounds):
+                    for mode, (enabled, slow_ms) in MODES.items():
+                        metrics.enabled, metrics.slow_request_ms = enabled, slow_ms
+                        samples[mode].append(
+                            measure(request, args.requests // args.rounds)
+                        )
+    finally:
+        patient_cache.maxsize, doctor_cache.maxsize = sizes
+        metrics.enabled, metrics.slow_request_ms = True, None
+
+    results = []
+    for mode, runs in samples.items():
+        best = min(runs, key=lambda run: run["mean_ms"])
+        results.append({"mode": mode, **best})
+    baseline = results[0]["mean_ms"]
+    for result in results:
+        result["overhead_pct"] = 100 * (result["mean_ms"] / baseline - 1)
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Overlap-check latency as a doctor's appointment history grows.
+
+Compares the indexed window query in has_overlapping_appointment with the
+previous approach of loading every appointment for the doctor.
+
+    python -m benchmarks.bench_overlap --sizes 100 10000 1000000
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+
+from benchmarks.common import emit, measure, session_factory, temp_engine
+from src.models.model import Appointment, Doctor, Patient
+from src.services.utils import as_utc, has_overlapping_appointment
+
+BASE = datetime(2020, 1, 1, 9, tzinfo=timezone.utc)
+SLOT = timedelta(minutes=30)
+
+
+def seed_history(session, doctor_id: int, patient_id: int, start: int, stop: int):
+    """Inserts back-to-back 30 minute slots [start, stop) for one doctor."""
+    chunk = 50_000
+    for lo in range(start, stop, chunk):
+        rows = [
+            {
+                "patient_id": patient_id,
+                "doctor_id": doctor_id,
+                "reason": "",
+                "start_time": BASE + i * SLOT,
+                "duration": 30,
+            }
+            for i in range(lo, min(lo + chunk, stop))
+        ]
+        session.execute(insert(Appointment), rows)
+    session.commit()
+
+
+def full_scan_overlap(session, doctor_id, start_time, duration) -> bool:
+    """The pre-index implementation, kept here as the baseline."""
+    end_time = start_time + timedelta(minutes=duration)
+    rows = session.execute(
+        select(Appointment.start_time, Appointment.duration).where(
+            Appointment.doctor_id == doctor_id
+        )
+    )
+    for raw_start, existing_duration in rows:
+        existing_start = as_utc(raw_start)
+        if existing_start < end_time and (
+            existing_start + timedelta(minutes=existing_duration) > start_time
+        ):
+            return True
+    return False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument(
+        "--baseline-limit",
+        type=int,
+        default=100_000,
+        help="skip the full-scan baseline above this history size",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    results = []
+    with temp_engine() as engine:
+        Session = session_factory(engine)
+        with Session() as session:
+            patient = Patient(
+                fname="B", lname="M", email="b@example.com", ph_no="0", age=40
+            )
+            doctor = Doctor(full_name="Dr. Bench", specialty="Load")
+            session.add_all([patient, doctor])
+            session.commit()
+            doctor_id, patient_id = doctor.id, patient.id
+
+            seeded = 0
+            for size in sorted(args.sizes):
+                seed_history(session, doctor_id, patient_id, seeded, size)
+                seeded = size
+
+                def probe(check):
+                    # Half the probes land inside the history (conflict), half
+                    # just past its end (free slot).
+                    i = rng.randrange(size * 2)
+                    check(session, doctor_id, BASE + i * SLOT, 30)
+
+                row = {
+                    "history_rows": size,
+                    "indexed": measure(
+                        lambda: probe(has_overlapping_appointment), args.repeat
+                    ),
+                }
+                if size <= args.baseline_limit:
+                    row["full_scan"] = measure(
+                        lambda: probe(full_scan_overlap), max(5, args.repeat // 20)
+                    )
+                results.append(row)
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
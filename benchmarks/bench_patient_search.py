@@ -0,0 +1,153 @@
+"""
+Patient search latency on a large patients table, with and without the
+search indexes.
+
+Seeds random names, emails and phone numbers in assorted formats, then
+times first pages of last-name-prefix, name+first-name, email and phone
+searches through queries.search_patients. Before timing, each search's
+query plan is checked: it must be answered from its index with no table
+scan and no sort. The same searches are then repeated with the indexes
+dropped, as the full-scan baseline.
+
+    python -m benchmarks.bench_patient_search --patients 1000000
+"""
+
+import argparse
+import random
+import time
+
+from sqlalchemy import insert, text
+
+from benchmarks.common import emit, latency_stats, session_factory, temp_engine
+from src.models.model import Patient
+from src.services.queries import _patient_search_query, search_patients
+
+SYLLABLES = [
+    "an",
+    "ber",
+    "cor",
+    "dal",
+    "el",
+    "fen",
+    "gar",
+    "hol",
+    "is",
+    "jor",
+    "kel",
+    "lin",
+    "mor",
+    "nor",
+    "ol",
+    "per",
+    "quin",
+    "ros",
+    "sal",
+    "tor",
+]
+PHONE_FORMATS = ["({}) {}-{}", "{}-{}-{}", "{}.{}.{}", "{}{}{}", "+1 {} {} {}"]
+
+
+def name(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+
+
+def phone(rng: random.Random) -> str:
+    parts = (rng.randint(200, 999), rng.randint(100, 999), rng.randint(1000, 9999))
+    return rng.choice(PHONE_FORMATS).format(*parts)
+
+
+def seed(engine, patients: int, rng: random.Random) -> list[dict]:
+    rows = [
+        {
+            "fname": name(rng),
+            "lname": name(rng),
+            "email": f"patient{i}@example.com",
+            "ph_no": phone(rng),
+            "age": rng.randint(1, 99),
+        }
+        for i in range(patients)
+    ]
+    with engine.begin() as conn:
+        for lo in range(0, len(rows), 50_000):
+            conn.execute(insert(Patient), rows[lo : lo + 50_000])
+        conn.execute(text("ANALYZE"))
+    return rows
+
+
+def searches(rows: list[dict], count: int, rng: random.Random) -> dict:
+    picks = [rng.choice(rows) for _ in range(count)]
+    return {
+        "last_name_prefix": [{"last_name": r["lname"][:3]} for r in picks],
+        "last_and_first": [
+            {"last_name": r["lname"][:4], "first_name": r["fname"][:2]} for r in picks
+        ],
+        "email": [{"email": r["email"]} for r in picks],
+        "phone": [{"phone": r["ph_no"]} for r in picks],
+    }
+
+
+def assert_indexed(db, search: dict) -> str:
+    args = {"last_name": None, "first_name": None, "email": None, "phone": None}
+    stmt = _patient_search_query(**{**args, **search}, after=None).limit(21)
+    compiled = stmt.compile(db.bind, compile_kwargs={"literal_binds": True})
+    plan = " ".join(
+        row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    )
+    assert "SCAN" not in plan and "TEMP B-TREE" not in plan, plan
+    return plan
+
+
+def time_searches(db, cases: list[dict], limit: int) -> dict:
+    samples = []
+    for search in cases:
+        t0 = time.perf_counter()
+        search_patients(db, **search, limit=limit)
+        samples.append(time.perf_counter() - t0)
+    return latency_stats(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--baseline-searches", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = []
+    with temp_engine() as engine:
+        rows = seed(engine, args.patients, rng)
+        cases = searches(rows, args.searches, rng)
+        with session_factory(engine)() as db:
+            indexed = {}
+            for kind, kind_cases in cases.items():
+                plan = assert_indexed(db, kind_cases[0])
+                indexed[kind] = (plan, time_searches(db, kind_cases, args.limit))
+
+            db.execute(text("DROP INDEX ix_patients_name"))
+            db.execute(text("DROP INDEX ix_patients_phone"))
+            for kind, kind_cases in cases.items():
+                plan, stats = indexed[kind]
+                # The email lookup keeps its unique index, so the baseline
+                # only differs for names and phones
+                scan = time_searches(
+                    db, kind_cases[: args.baseline_searches], args.limit
+                )
+                results.append(
+                    {
+                        "patients": args.patients,
+                        "search": kind,
+                        "plan": plan,
+                        "indexed": stats,
+                        "full_scan": scan,
+                        "p50_speedup": scan["p50_ms"] / stats["p50_ms"],
+                    }
+                )
+            db.rollback()
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
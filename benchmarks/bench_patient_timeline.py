@@ -0,0 +1,125 @@
+"""
+GET /patients/{id}/appointments latency as a patient's history grows.
+
+Seeds one patient per history size (plus background patients sharing the
+table) and times the first page and a deep page, reached by following
+X-Next-Cursor, through the app. "relationship" is the naive
+alternative: loading Patient.appointments, which reads the whole history.
+
+    python -m benchmarks.bench_patient_timeline --histories 10 1000 10000 100000
+"""
+
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, text
+
+from benchmarks.common import (
+    app_on_engine,
+    asgi_get,
+    emit,
+    measure,
+    session_factory,
+    temp_engine,
+)
+from src.models.model import Appointment, Doctor, Patient
+from src.services.queries import get_patient_appointments
+from src.services.utils import encode_cursor
+
+FIRST = datetime(2020, 1, 6, 9, 0, tzinfo=timezone.utc)
+BACKGROUND = 200_000  # other patients' appointments in the same table
+
+
+def seed(engine, histories: list[int]) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Patient),
+            [
+                {"fname": "P", "lname": str(i), "email": f"p{i}@t.io", "age": 50}
+                for i in range(len(histories) + 1)
+            ],
+        )
+        conn.execute(insert(Doctor), [{"full_name": "Dr. T", "specialty": "Gen"}])
+        background = len(histories) + 1
+        rows = [
+            {
+                "patient_id": background,
+                "doctor_id": 1,
+                "reason": "",
+                "start_time": FIRST + timedelta(minutes=15 * i),
+                "duration": 15,
+            }
+            for i in range(BACKGROUND)
+        ]
+        for patient_id, size in enumerate(histories, start=1):
+            rows += [
+                {
+                    "patient_id": patient_id,
+                    "doctor_id": 1,
+                    "reason": "",
+                    "start_time": FIRST + timedelta(hours=6 * i),
+                    "duration": 30,
+                }
+                for i in range(size)
+            ]
+        for lo in range(0, len(rows), 50_000):
+            conn.execute(insert(Appointment), rows[lo : lo + 50_000])
+        conn.execute(text("ANALYZE"))
+
+
+def deep_cursor(engine, patient_id: int, pages: int, limit: int):
+    """The cursor `pages` pages into the patient's timeline, or None."""
+    with session_factory(engine)() as db:
+        before = None
+        for _ in range(pages):
+            _, key = get_patient_appointments(
+                db, patient_id, limit=limit, before=before
+            )
+            if key is None:
+                break
+            before = key
+    return before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--histories", type=int, nargs="+", default=[10, 1000, 10_000, 100_000]
+    )
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    results = []
+    with temp_engine() as engine:
+        seed(engine, args.histories)
+        with app_on_engine(engine) as app:
+            for patient_id, size in enumerate(args.histories, start=1):
+                path = f"/patients/{patient_id}/appointments"
+                query = f"limit={args.limit}"
+                key = deep_cursor(
+                    engine, patient_id, size // args.limit // 2, args.limit
+                )
+                deep = f"{query}&cursor={encode_cursor(*key)}" if key else query
+
+                def load_relationship():
+                    with session_factory(engine)() as db:
+                        assert len(db.get(Patient, patient_id).appointments) == size
+
+                results.append(
+                    {
+                        "history": size,
+                        "first_page": measure(
+                            lambda: asgi_get(app, path, query), args.repeat
+                        ),
+                        "middle_page": measure(
+                            lambda: asgi_get(app, path, deep), args.repeat
+                        ),
+                        "relationship": measure(load_relationship, 3),
+                    }
+                )
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
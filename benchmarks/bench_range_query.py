@@ -0,0 +1,100 @@
+"""
+One GET /appointments range call versus the per-day, per-doctor fan-out a
+week-by-department dashboard used to issue.
+
+    python -m benchmarks.bench_range_query --doctors 2000 --days 60 --department 20
+"""
+
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from benchmarks.common import app_on_engine, emit, latency_stats, temp_engine
+from src.models.model import Appointment
+
+FIRST_DAY = date(2030, 3, 4)
+
+
+def seed(engine, doctors: int, days: int, per_day: int, rng: random.Random):
+    rows = []
+    for day in range(days):
+        start = datetime.combine(
+            FIRST_DAY + timedelta(days=day), datetime.min.time(), timezone.utc
+        ) + timedelta(hours=8)
+        for doctor_id in range(1, doctors + 1):
+            for slot in rng.sample(range(20), per_day):
+                rows.append(
+                    {
+                        "patient_id": 1,
+                        "doctor_id": doctor_id,
+                        "reason": "",
+                        "start_time": start + timedelta(minutes=30 * slot),
+                        "duration": 30,
+                    }
+                )
+    with engine.begin() as conn:
+        for lo in range(0, len(rows), 50_000):
+            conn.execute(insert(Appointment), rows[lo : lo + 50_000])
+    return len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--doctors", type=int, default=500)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--per-day", type=int, default=8)
+    parser.add_argument("--department", type=int, default=20)
+    parser.add_argument("--week", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with temp_engine() as engine:
+        total = seed(engine, args.doctors, args.days, args.per_day, rng)
+        with app_on_engine(engine) as app:
+            client = TestClient(app)
+            range_samples, fanout_samples = [], []
+            for _ in range(args.repeat):
+                first = FIRST_DAY + timedelta(days=rng.randrange(args.days - 7))
+                last = first + timedelta(days=args.week - 1)
+                doctors = rng.sample(range(1, args.doctors + 1), args.department)
+
+                t0 = time.perf_counter()
+                params = [("start_date", first), ("end_date", last)]
+                params += [("doctor_ids", d) for d in doctors]
+                ranged = client.get("/appointments", params=params).json()
+                range_samples.append(time.perf_counter() - t0)
+
+                t0 = time.perf_counter()
+                fanned = 0
+                for offset in range(args.week):
+                    day = first + timedelta(days=offset)
+                    for d in doctors:
+                        fanned += len(
+                            client.get(
+                                "/appointments", params={"date": day, "doctor_id": d}
+                            ).json()
+                        )
+                fanout_samples.append(time.perf_counter() - t0)
+                assert fanned == len(ranged)
+
+    ranged_stats = latency_stats(range_samples)
+    fanout_stats = latency_stats(fanout_samples)
+    emit(
+        {
+            "table_rows": total,
+            "calls_replaced": args.week * args.department,
+            "range_call": ranged_stats,
+            "fan_out": fanout_stats,
+            "speedup_p50": fanout_stats["p50_ms"] / ranged_stats["p50_ms"],
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
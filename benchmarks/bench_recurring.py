@@ -0,0 +1,110 @@
+"""
+Booking a recurring treatment plan: POST /appointments/recurring versus one
+POST /appointments per occurrence.
+
+Each doctor already has a morning appointment every day for the next two
+years, so every check has real intervals to scan. Series are weekly on
+Mon/Wed/Fri (dialysis-style) at a free hour, so every occurrence is booked.
+
+    python -m benchmarks.bench_recurring --counts 12 52 156
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from benchmarks.common import app_on_engine, emit, temp_engine
+from src.models.model import Appointment, Doctor, Patient
+from src.services.utils import expand_recurrence
+
+HORIZON_DAYS = 730
+
+
+def seed(engine, doctors: int, base: datetime) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Patient), [{"fname": "R", "lname": "S", "email": "r@s.io", "age": 1}]
+        )
+        conn.execute(
+            insert(Doctor),
+            [{"full_name": f"Dr. {i}", "specialty": "Series"} for i in range(doctors)],
+        )
+        conn.execute(
+            insert(Appointment),
+            [
+                {
+                    "patient_id": 1,
+                    "doctor_id": 1 + d,
+                    "reason": "",
+                    "start_time": base + timedelta(days=day, hours=-2),
+                    "duration": 60,
+                }
+                for d in range(doctors)
+                for day in range(HORIZON_DAYS)
+            ],
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--counts", type=int, nargs="+", default=[12, 52, 156])
+    args = parser.parse_args()
+
+    # Two doctors per series length: one for each path
+    base = (datetime.now(timezone.utc) + timedelta(days=1)).replace(
+        hour=10, minute=0, second=0, microsecond=0
+    )
+    results = []
+    with temp_engine() as engine:
+        seed(engine, 2 * len(args.counts), base)
+        with app_on_engine(engine) as app:
+            client = TestClient(app)
+            for n, count in enumerate(args.counts):
+                series = {
+                    "patient_id": 1,
+                    "start_time": base.isoformat(),
+                    "duration": 45,
+                    "freq": "weekly",
+                    "weekdays": [0, 2, 4],
+                    "count": count,
+                }
+                starts = expand_recurrence(
+                    base, "weekly", count=count, weekdays=[0, 2, 4]
+                )
+
+                t0 = time.perf_counter()
+                for start in starts:
+                    body = {
+                        "patient_id": 1,
+                        "doctor_id": 1 + 2 * n,
+                        "start_time": start.isoformat(),
+                        "duration": 45,
+                    }
+                    assert client.post("/appointments", json=body).status_code == 201
+                loop_seconds = time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                resp = client.post(
+                    "/appointments/recurring",
+                    json={**series, "doctor_id": 2 + 2 * n},
+                )
+                series_seconds = time.perf_counter() - t0
+                assert resp.status_code == 201
+                assert resp.json()["booked"] == count
+
+                results.append(
+                    {
+                        "occurrences": count,
+                        "loop_seconds": loop_seconds,
+                        "series_seconds": series_seconds,
+                        "speedup": loop_seconds / series_seconds,
+                    }
+                )
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
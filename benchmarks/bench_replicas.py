@@ -0,0 +1,124 @@
+"""
+Read throughput against the number of read replicas.
+
+The primary is seeded with one day's appointments and copied to each
+replica file, i.e. fully caught-up replicas. Threads then read that day's
+listing, routed per read by a ReplicaSet the way get_read_db routes
+requests (0 replicas = every read on the primary).
+
+Local SQLite files stand in for database servers, so each engine gets
+--connections connections (default 1) and every statement holds its
+connection for an extra --server-ms. That models a database server with
+fixed capacity and a network round trip, which is the limit replicas
+exist to lift. Reports reads/s, read latency and reads served per
+database.
+
+    python -m benchmarks.bench_replicas --replicas 0 1 2 4 --threads 16
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from sqlalchemy import event
+
+from benchmarks.bench_serialization import DAY, seed
+from benchmarks.common import emit, latency_stats, session_factory
+from src import database
+from src.database import build_engine
+from src.models.model import Base
+from src.replicas import ReplicaSet
+from src.services.queries import get_appointments_in_range
+
+
+def hold_connections(engine, server_ms: float) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def server_time(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(server_ms / 1000)
+
+
+def run(primary, replicas: ReplicaSet, threads: int, per_thread: int) -> dict:
+    Primary = session_factory(primary)
+    barrier = threading.Barrier(threads + 1)
+    samples: list[float] = []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        barrier.wait()
+        for _ in range(per_thread):
+            t0 = time.perf_counter()
+            replica = replicas.pick()
+            Session = replica.sessionmaker if replica else Primary
+            with Session() as db:
+                rows = get_appointments_in_range(db, DAY, DAY, columns=True)
+            assert rows
+            local.append(time.perf_counter() - t0)
+        with lock:
+            samples.extend(local)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    return {"reads_per_s": len(samples) / elapsed, **latency_stats(samples)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--replicas", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--per-thread", type=int, default=50)
+    parser.add_argument("--connections", type=int, default=1)
+    parser.add_argument("--server-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    # Every engine, replicas' included, gets the same fixed capacity
+    database.DB_POOL_SIZE = str(args.connections)
+    database.DB_MAX_OVERFLOW = "0"
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        primary_url = f"sqlite:///{os.path.join(tmp, 'primary.db')}"
+        primary = build_engine(primary_url)
+        Base.metadata.create_all(primary)
+        seed(primary, args.rows)
+        primary.dispose()
+        urls = []
+        for i in range(max(args.replicas)):
+            path = os.path.join(tmp, f"replica{i}.db")
+            shutil.copy(os.path.join(tmp, "primary.db"), path)
+            urls.append(f"sqlite:///{path}")
+
+        primary = build_engine(primary_url)
+        hold_connections(primary, args.server_ms)
+        for count in args.replicas:
+            replicas = ReplicaSet(urls[:count], health_interval=3600)
+            for replica in replicas.replicas:
+                hold_connections(replica.engine, args.server_ms)
+            stats = run(primary, replicas, args.threads, args.per_thread)
+            routed = replicas.stats()
+            results.append(
+                {
+                    "replicas": count,
+                    "threads": args.threads,
+                    **stats,
+                    "primary_reads": routed["primary_reads"],
+                    "replica_reads": [r["reads"] for r in routed["replicas"]],
+                }
+            )
+            replicas.dispose()
+        primary.dispose()
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+In-memory schedule index versus the SQL overlap check.
+
+For each table size it reports warm-up time and the index's memory. It
+times overlap checks through has_overlapping_appointment (SQL) and
+ScheduleIndex.overlaps, and create_appointment throughput with the index
+off and on.
+
+    python -m benchmarks.bench_schedule_index --sizes 10000 100000 1000000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+
+from benchmarks.common import emit, measure, session_factory, temp_engine
+from src.models.model import Appointment, Doctor, Patient
+from src.schemas.schema import AppointmentCreate
+from src.services.queries import create_appointment
+from src.services.schedule_index import schedule_index
+from src.services.utils import has_overlapping_appointment
+
+SLOTS_PER_DAY = 16
+
+
+def seed(engine, rows: int, doctors: int, base: datetime) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Patient), [{"fname": "S", "lname": "I", "email": "s@i.io", "age": 1}]
+        )
+        conn.execute(
+            insert(Doctor),
+            [{"full_name": f"Dr. {i}", "specialty": "Idx"} for i in range(doctors)],
+        )
+        for lo in range(0, rows, 50_000):
+            conn.execute(
+                insert(Appointment),
+                [
+                    {
+                        "patient_id": 1,
+                        "doctor_id": 1 + i % doctors,
+                        "reason": "",
+                        # Each doctor gets back-to-back 30 minute slots, day by day
+                        "start_time": base
+                        + timedelta(
+                            days=(i // doctors) // SLOTS_PER_DAY,
+                            minutes=30 * ((i // doctors) % SLOTS_PER_DAY),
+                        ),
+                        "duration": 30,
+                    }
+                    for i in range(lo, min(lo + 50_000, rows))
+                ],
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--doctors", type=int, default=200)
+    parser.add_argument("--checks", type=int, default=5000)
+    parser.add_argument("--bookings", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    base = (datetime.now(timezone.utc) + timedelta(days=1)).replace(
+        hour=8, minute=0, second=0, microsecond=0
+    )
+    results = []
+    for size in args.sizes:
+        days = size // args.doctors // SLOTS_PER_DAY + 1
+        with temp_engine() as engine:
+            seed(engine, size, args.doctors, base)
+            Session = session_factory(engine)
+            rng = random.Random(args.seed)
+
+            def probe():
+                # Random quarter-hours across the booked range: mostly conflicts
+                return (
+                    rng.randint(1, args.doctors),
+                    base + timedelta(minutes=15 * rng.randrange(days * 96)),
+                    30,
+                )
+
+            with Session() as db:
+                t0 = time.perf_counter()
+                loaded = schedule_index.warm(db)
+                warm_seconds = time.perf_counter() - t0
+                stats = schedule_index.stats()
+                sql = measure(
+                    lambda: has_overlapping_appointment(db, *probe()), args.checks
+                )
+                indexed = measure(
+                    lambda: schedule_index.overlaps(*probe()), args.checks
+                )
+                schedule_index.reset()
+
+                # Bookings past the seeded range, so every one succeeds
+                free = base + timedelta(days=days + 1)
+                slots = iter(range(10**9))
+
+                def book():
+                    n = next(slots)
+                    payload = AppointmentCreate(
+                        patient_id=1,
+                        doctor_id=1 + n % args.doctors,
+                        start_time=free + timedelta(minutes=30 * (n // args.doctors)),
+                        duration=30,
+                    )
+                    try:
+                        create_appointment(db, payload)
+                    except HTTPException:
+                        pass
+
+                booking = {}
+                for mode in ("sql", "index"):
+                    if mode == "index":
+                        schedule_index.warm(db)
+                    booking[mode] = measure(book, args.bookings)
+                schedule_index.reset()
+
+            results.append(
+                {
+                    "rows": size,
+                    "index_rows": loaded,
+                    "index_intervals": stats["intervals"],
+                    "index_memory_mib": stats["memory_bytes"] / 2**20,
+                    "warm_seconds": warm_seconds,
+                    "check_sql": sql,
+                    "check_index": indexed,
+                    "booking_sql": booking["sql"],
+                    "booking_index": booking["index"],
+                }
+            )
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Rows per second serialized for appointment listings, with the default
+response_model path and with FAST_JSON.
+
+"encode" times serialization alone. The default path validates ORM objects
+through List[AppointmentRead] and renders them like FastAPI's JSONResponse.
+The fast path encodes column tuples with serialization.appointments_json.
+"request" times a whole GET /appointments for one day, query included.
+
+    python -m benchmarks.bench_serialization --sizes 1000 10000 100000
+"""
+
+import argparse
+import json
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+
+from benchmarks.common import (
+    app_on_engine,
+    asgi_get,
+    emit,
+    session_factory,
+    temp_engine,
+)
+from src.models.model import Appointment
+from src.schemas.schema import AppointmentRead
+from src.services import serialization
+from src.services.queries import get_appointments_in_range
+
+DAY = date(2030, 1, 15)
+
+
+def seed(engine, rows: int) -> None:
+    start = datetime.combine(DAY, datetime.min.time(), tzinfo=timezone.utc)
+    slots = 48
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Appointment),
+            [
+                {
+                    "patient_id": 1 + i % 1000,
+                    "doctor_id": 1 + i // slots,
+                    "reason": "follow-up" if i % 3 else "contrôle",
+                    "start_time": start + timedelta(minutes=30 * (i % slots)),
+                    "duration": 30,
+                }
+                for i in range(rows)
+            ],
+        )
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[AppointmentRead])
+
+    def default_encode(objects):
+        # What FastAPI does for response_model=List[AppointmentRead]
+        value = adapter.validate_python(objects, from_attributes=True)
+        content = adapter.dump_python(value, mode="json")
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+    results = []
+    for size in args.sizes:
+        with temp_engine() as engine:
+            seed(engine, size)
+            with session_factory(engine)() as db:
+                objects = get_appointments_in_range(db, DAY, DAY)
+                rows = get_appointments_in_range(db, DAY, DAY, columns=True)
+                # Same bytes either way, or the comparison is meaningless
+                assert default_encode(objects) == serialization.appointments_json(rows)
+
+                for path, encode in (
+                    ("default", lambda: default_encode(objects)),
+                    ("fast", lambda: serialization.appointments_json(rows)),
+                ):
+                    seconds = best_of(encode, args.repeat)
+                    results.append(
+                        {
+                            "rows": size,
+                            "stage": "encode",
+                            "path": path,
+                            "seconds": seconds,
+                            "rows_per_sec": size / seconds,
+                        }
+                    )
+
+            with app_on_engine(engine) as app:
+                for path, fast in (("default", False), ("fast", True)):
+                    serialization.FAST_JSON = fast
+
+                    def request():
+                        status, _, _ = asgi_get(app, "/appointments", f"date={DAY}")
+                        assert status == 200
+
+                    request()
+                    seconds = best_of(request, args.repeat)
+                    results.append(
+                        {
+                            "rows": size,
+                            "stage": "request",
+                            "path": path,
+                            "seconds": seconds,
+                            "rows_per_sec": size / seconds,
+                        }
+                    )
+                serialization.FAST_JSON = False
+    results.append({"encoder": "orjson" if serialization.orjson else "json"})
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Mixed read/write throughput for each SQLITE_PROFILE.
+
+Threads share one engine; each operation is a one-day, one-doctor listing
+with probability --read-ratio and a booking of a free slot otherwise.
+"errors" counts operations that failed, typically "database is locked".
+
+    python -m benchmarks.bench_sqlite_profiles --threads 1 4 16 --ops 4000
+"""
+
+import argparse
+import itertools
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+
+from benchmarks.common import emit, latency_stats, session_factory, temp_engine
+from src.database import SQLITE_PROFILES
+from src.models.model import Appointment, Doctor, Patient
+from src.schemas.schema import AppointmentCreate
+from src.services.queries import create_appointment, get_appointments_in_range
+
+DAY = date(2030, 1, 15)
+
+
+def seed(engine, doctors: int) -> None:
+    start = datetime.combine(DAY, datetime.min.time(), tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Patient),
+            [{"fname": "M", "lname": "X", "email": "m@x.io", "age": 30}],
+        )
+        conn.execute(
+            insert(Doctor),
+            [{"full_name": f"Dr. {i}", "specialty": "Mix"} for i in range(doctors)],
+        )
+        conn.execute(
+            insert(Appointment),
+            [
+                {
+                    "patient_id": 1,
+                    "doctor_id": 1 + i // 16,
+                    "reason": "benchmark row",
+                    "start_time": start + timedelta(minutes=30 * (i % 16)),
+                    "duration": 30,
+                }
+                for i in range(doctors * 16)
+            ],
+        )
+
+
+def run(profile: str, threads: int, args) -> dict:
+    with temp_engine(profile=profile) as engine:
+        seed(engine, args.doctors)
+        Session = session_factory(engine)
+        # Every booking gets its own 15 minute slot on a later day
+        slots = itertools.count()
+        base = datetime.combine(DAY, datetime.min.time(), tzinfo=timezone.utc)
+        reads, writes, errors = [], [], [0]
+        lock = threading.Lock()
+        barrier = threading.Barrier(threads + 1)
+        per_thread = args.ops // threads
+
+        def worker(seed):
+            rng = random.Random(seed)
+            local_reads, local_writes, local_errors = [], [], 0
+            barrier.wait()
+            with Session() as db:
+                for _ in range(per_thread):
+                    doctor_id = rng.randint(1, args.doctors)
+                    t0 = time.perf_counter()
+                    try:
+                        if rng.random() < args.read_ratio:
+                            get_appointments_in_range(db, DAY, DAY, [doctor_id])
+                            db.rollback()
+                            local_reads.append(time.perf_counter() - t0)
+                            continue
+                        slot = next(slots)
+                        payload = AppointmentCreate(
+                            patient_id=1,
+                            doctor_id=doctor_id,
+                            start_time=base + timedelta(days=1, minutes=15 * slot),
+                            duration=15,
+                        )
+                        create_appointment(db, payload)
+                        local_writes.append(time.perf_counter() - t0)
+                    except HTTPException:
+                        local_writes.append(time.perf_counter() - t0)
+                    except Exception:
+                        db.rollback()
+                        local_errors += 1
+            with lock:
+                reads.extend(local_reads)
+                writes.extend(local_writes)
+                errors[0] += local_errors
+
+        pool = [
+            threading.Thread(target=worker, args=(args.seed + i,))
+            for i in range(threads)
+        ]
+        for t in pool:
+            t.start()
+        barrier.wait()
+        t0 = time.perf_counter()
+        for t in pool:
+            t.join()
+        elapsed = time.perf_counter() - t0
+
+    return {
+        "profile": profile,
+        "threads": threads,
+        "ops_per_sec": (len(reads) + len(writes)) / elapsed,
+        "errors": errors[0],
+        "reads": latency_stats(reads) if reads else None,
+        "writes": latency_stats(writes) if writes else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profiles", nargs="+", default=list(SQLITE_PROFILES))
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--ops", type=int, default=4000)
+    parser.add_argument("--read-ratio", type=float, default=0.8)
+    parser.add_argument("--doctors", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    emit(
+        [
+            run(profile, threads, args)
+            for profile in args.profiles
+            for threads in args.threads
+        ]
+    )
+
+
+if __name__ == "__main__":
+    main()
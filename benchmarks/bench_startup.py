@@ -0,0 +1,127 @@
+"""
+Cold-start cost of a worker process.
+
+Each sample is a fresh interpreter, as with a newly forked or scaled-out
+worker:
+- "import_ms": `import src.main`, and `import src.models.model` for
+  CLI-style use of the models.
+- "ready_ms": spawning `uvicorn src.main:app` until GET /health answers.
+- "first_query_ms": spawning until the first database-backed request
+  answers.
+
+--root points the subprocesses at another checkout, to compare revisions.
+
+    python -m benchmarks.bench_startup --samples 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import emit, free_port
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def import_seconds(root: str, module: str, env: dict) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def wait_for(url: str, started: float, server) -> float:
+    while True:
+        try:
+            if httpx.get(url).status_code < 500:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            if server.poll() is not None:
+                raise RuntimeError("uvicorn exited")
+            time.sleep(0.005)
+
+
+def server_seconds(root: str, env: dict, path: str) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port)],
+        cwd=root,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        return wait_for(f"http://127.0.0.1:{port}{path}", started, server)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summary(samples: list[float]) -> dict:
+    ms = sorted(1000 * s for s in samples)
+    return {"median_ms": statistics.median(ms), "min_ms": ms[0], "max_ms": ms[-1]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--root", default=os.getcwd())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'startup.db')}",
+            "PYTHONDONTWRITEBYTECODE": "",
+        }
+        # Schema once, outside the timed runs
+        subprocess.run(
+            [sys.executable, "-m", "src.models.model"],
+            cwd=args.root,
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        results = {
+            "import_src_main": summary(
+                [
+                    import_seconds(args.root, "src.main", env)
+                    for _ in range(args.samples)
+                ]
+            ),
+            "import_models": summary(
+                [
+                    import_seconds(args.root, "src.models.model", env)
+                    for _ in range(args.samples)
+                ]
+            ),
+            "ready": summary(
+                [server_seconds(args.root, env, "/health") for _ in range(args.samples)]
+            ),
+            "first_query": summary(
+                [
+                    server_seconds(args.root, env, "/patients/1")
+                    for _ in range(args.samples)
+                ]
+            ),
+        }
+    emit(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run against a throwaway SQLite file so they never touch test.db.
+Run them as modules from the repository root, e.g.
+
+    python -m benchmarks.bench_overlap
+"""
+
+import json
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.database import build_engine
+from src.models.model import Base
+
+
+@contextmanager
+def temp_engine(url: str | None = None, profile: str = "default") -> Iterator[Engine]:
+    """
+    Yields an engine with the schema created, backed by a temporary SQLite
+    file unless an explicit URL is given. `profile` names the SQLite PRAGMA
+    profile from src.database.SQLITE_PROFILES.
+    """
+    tmpdir = None
+    if url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+    engine = build_engine(url, profile=profile)
+    Base.metadata.create_all(engine)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+
+def session_factory(engine: Engine) -> sessionmaker[Session]:
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def latency_stats(samples: list[float]) -> dict:
+    """Summarises per-call latencies (seconds) in milliseconds."""
+    return {
+        "calls": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+def measure(fn: Callable[[], object], repeat: int) -> dict:
+    """Calls fn repeat times and returns latency_stats for the calls."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return latency_stats(samples)
+
+
+def emit(results: dict | list) -> None:
+    print(json.dumps(results, indent=2, default=str))
+
+
+def asgi_request(
+    app,
+    method: str,
+    path: str,
+    query: str = "",
+    body: bytes = b"",
+    headers=(),
+) -> tuple[int, dict, int]:
+    """
+    Issues one request straight against an ASGI app and discards the body as
+    it streams, returning (status, headers, body bytes). Unlike TestClient
+    this never buffers the response, so it does not skew memory measurements.
+    """
+    import asyncio
+
+    result = {"status": 0, "headers": {}, "bytes": 0}
+    sent_request = False
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Like a real server: block until the client disconnects (never)
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+            result["headers"] = {
+                k.decode().lower(): v.decode() for k, v in message["headers"]
+            }
+        elif message["type"] == "http.response.body":
+            result["bytes"] += len(message.get("body", b""))
+
+    headers = list(headers)
+    if body:
+        headers += [("content-type", "application/json")]
+        headers += [("content-length", str(len(body)))]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    asyncio.run(app(scope, receive, send))
+    return result["status"], result["headers"], result["bytes"]
+
+
+def asgi_get(app, path: str, query: str = "", headers=()) -> tuple[int, dict, int]:
+    return asgi_request(app, "GET", path, query, headers=headers)
+
+
+def peak_rss_mib(pid: int | None = None) -> float:
+    """Peak resident set size of this process, or of `pid` (Linux only)."""
+    if pid is None:
+        import resource
+
+        # ru_maxrss is KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError(f"no VmHWM for pid {pid}")
+
+
+def free_port() -> int:
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def uvicorn_server(url: str, **env: str) -> Iterator[tuple[str, int]]:
+    """
+    Runs `uvicorn src.main:app` against `url` in a subprocess and yields
+    (base URL, pid) once /health answers. Extra keyword arguments become
+    environment variables of the server process.
+    """
+    import subprocess
+    import sys
+
+    import httpx
+
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, "DATABASE_URL": url, **env},
+        stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(f"{base_url}/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError("uvicorn did not start")
+                time.sleep(0.1)
+        yield base_url, server.pid
+    finally:
+        server.terminate()
+        server.wait()
+
+
+@contextmanager
+def app_on_engine(engine: Engine):
+    """Points the FastAPI app's get_db and get_read_db dependencies at `engine`."""
+    from src.database import get_db
+    from src.main import app
+    from src.replicas import get_read_db
+
+    Session = session_factory(engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    try:
+        yield app
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_read_db, None)
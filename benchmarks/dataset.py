@@ -0,0 +1,228 @@
+"""
+Seeded synthetic data for benchmarks.
+
+Appointment load is skewed the way a clinic's is: a few popular doctors take
+a large share of bookings (Zipf-like popularity), weekdays are much busier
+than weekends, and each doctor's day fills from the morning onwards. Rows
+never overlap per doctor, so availability and booking behave realistically.
+
+The same seed and sizes always produce the same rows. Use it standalone to
+build a database once and reuse it across runs:
+
+    python -m benchmarks.dataset --url sqlite:///bench.db --appointments 1000000
+"""
+
+import argparse
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import accumulate
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from benchmarks.common import emit
+from src.models.model import Appointment, Base, Doctor, Patient
+from src.services.summary import rebuild_daily_summary
+
+SPECIALTIES = (
+    "General",
+    "Cardiology",
+    "Dermatology",
+    "Neurology",
+    "Oncology",
+    "Orthopedics",
+    "Pediatrics",
+    "Psychiatry",
+)
+DURATIONS = (15, 30, 30, 30, 45, 60)
+# Relative booking volume Monday..Sunday
+WEEKDAY_WEIGHTS = (1.0, 1.0, 0.95, 0.95, 0.85, 0.25, 0.1)
+DAY_START = time(8, 0)
+DAY_MINUTES = 10 * 60
+BATCH = 50_000
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    doctors: int = 2000
+    patients: int = 200_000
+    appointments: int = 1_000_000
+    days: int = 180
+    start: date = date(2030, 1, 7)
+    seed: int = 0
+    # Zipf exponent of doctor popularity; 0 spreads bookings evenly
+    doctor_skew: float = 0.8
+
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=self.days - 1)
+
+
+@dataclass(frozen=True)
+class Dataset:
+    spec: DatasetSpec
+    doctors: int
+    patients: int
+    appointments: int
+    # Busiest (doctor, day) and day, handy as worst-case query targets
+    busiest_doctor: int
+    busiest_day: date
+
+
+def _appointments(spec: DatasetSpec, rng: random.Random):
+    doctor_weights = list(
+        accumulate(1 / (rank**spec.doctor_skew) for rank in range(1, spec.doctors + 1))
+    )
+    # Popularity is by rank; shuffle so popular doctors are not simply low ids
+    doctor_ids = list(range(1, spec.doctors + 1))
+    rng.shuffle(doctor_ids)
+    days = [spec.start + timedelta(days=i) for i in range(spec.days)]
+    day_weights = list(accumulate(WEEKDAY_WEIGHTS[d.weekday()] for d in days))
+
+    # Minutes already booked from DAY_START, per (doctor, day)
+    filled: dict[tuple[int, int], int] = {}
+    produced = attempts = 0
+    while produced < spec.appointments:
+        if attempts > spec.appointments * 20:
+            raise ValueError("Dataset too dense: not enough free doctor-days")
+        ranks = rng.choices(range(spec.doctors), cum_weights=doctor_weights, k=BATCH)
+        day_idx = rng.choices(range(spec.days), cum_weights=day_weights, k=BATCH)
+        for rank, day_i in zip(ranks, day_idx):
+            attempts += 1
+            doctor_id = doctor_ids[rank]
+            key = (doctor_id, day_i)
+            offset = filled.get(key, 0)
+            duration = rng.choice(DURATIONS)
+            if offset + duration > DAY_MINUTES:
+                continue
+            # Leave the odd gap so availability searches have work to do
+            gap = 15 if rng.random() < 0.2 else 0
+            filled[key] = offset + duration + gap
+            start = datetime.combine(days[day_i], DAY_START, tzinfo=timezone.utc)
+            yield {
+                "patient_id": rng.randint(1, spec.patients),
+                "doctor_id": doctor_id,
+                "reason": "synthetic",
+                "start_time": start + timedelta(minutes=offset),
+                "duration": duration,
+            }
+            produced += 1
+            if produced == spec.appointments:
+                return
+
+
+def _batches(rows, size: int = BATCH):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate(engine: Engine, spec: DatasetSpec) -> Dataset:
+    """Creates the schema and inserts the rows described by `spec`."""
+    rng = random.Random(spec.seed)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for lo in range(0, spec.patients, BATCH):
+            conn.execute(
+                insert(Patient),
+                [
+                    {
+                        "fname": f"First{i}",
+                        "lname": f"Last{i % 5000}",
+                        "email": f"patient{i}@example.com",
+                        "ph_no": f"555{i:07d}",
+                        "age": rng.randint(0, 99),
+                    }
+                    for i in range(lo, min(lo + BATCH, spec.patients))
+                ],
+            )
+        conn.execute(
+            insert(Doctor),
+            [
+                {
+                    "full_name": f"Dr. {i}",
+                    "specialty": SPECIALTIES[i % len(SPECIALTIES)],
+                    # A few inactive doctors exercise the availability filters
+                    "active": i % 50 != 0,
+                }
+                for i in range(spec.doctors)
+            ],
+        )
+        for batch in _batches(_appointments(spec, rng)):
+            conn.execute(insert(Appointment), batch)
+    # Rows went in behind the API's back, so the rollup starts from scratch
+    with Session(engine) as db:
+        rebuild_daily_summary(db)
+    return describe(engine, spec)
+
+
+def describe(engine: Engine, spec: DatasetSpec) -> Dataset:
+    """Summarises an already populated database."""
+    day = func.date(Appointment.start_time)
+    with engine.connect() as conn:
+        busiest_doctor, busiest_day = conn.execute(
+            select(Appointment.doctor_id, day)
+            .group_by(Appointment.doctor_id, day)
+            .order_by(func.count().desc())
+            .limit(1)
+        ).one()
+        return Dataset(
+            spec=spec,
+            doctors=conn.scalar(select(func.count()).select_from(Doctor)),
+            patients=conn.scalar(select(func.count()).select_from(Patient)),
+            appointments=conn.scalar(select(func.count()).select_from(Appointment)),
+            busiest_doctor=busiest_doctor,
+            busiest_day=date.fromisoformat(str(busiest_day)),
+        )
+
+
+def load_or_generate(engine: Engine, spec: DatasetSpec) -> Dataset:
+    """Reuses a database that already holds data, otherwise generates it."""
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        populated = conn.scalar(select(func.count()).select_from(Appointment))
+    return describe(engine, spec) if populated else generate(engine, spec)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = DatasetSpec()
+    parser.add_argument("--doctors", type=int, default=defaults.doctors)
+    parser.add_argument("--patients", type=int, default=defaults.patients)
+    parser.add_argument("--appointments", type=int, default=defaults.appointments)
+    parser.add_argument("--days", type=int, default=defaults.days)
+    parser.add_argument("--doctor-skew", type=float, default=defaults.doctor_skew)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def spec_from_args(args: argparse.Namespace) -> DatasetSpec:
+    return DatasetSpec(
+        doctors=args.doctors,
+        patients=args.patients,
+        appointments=args.appointments,
+        days=args.days,
+        seed=args.seed,
+        doctor_skew=args.doctor_skew,
+    )
+
+
+def main() -> None:
+    from sqlalchemy import create_engine
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", required=True)
+    add_arguments(parser)
+    args = parser.parse_args()
+    engine = create_engine(args.url)
+    emit(asdict(generate(engine, spec_from_args(args))))
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
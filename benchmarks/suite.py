@@ -0,0 +1,539 @@
+"""
+End-to-end benchmark suite: every endpoint of src.main against a seeded
+synthetic dataset (see benchmarks.dataset), in-process and over HTTP.
+
+For each scenario it reports throughput, p50/p95/p99 latency, non-2xx
+responses and peak RSS as JSON. The output can be kept per commit and
+compared with --baseline. A p95 regression beyond --tolerance exits
+non-zero.
+
+    python -m benchmarks.suite --db /tmp/bench.db --output bench.json
+    python -m benchmarks.suite --doctors 200 --patients 20000 \\
+        --appointments 100000 --transport inprocess --requests 200
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import func, select
+
+from benchmarks import dataset
+from benchmarks.common import (
+    app_on_engine,
+    asgi_request,
+    emit,
+    latency_stats,
+    peak_rss_mib,
+    temp_engine,
+    uvicorn_server,
+)
+from src.models.model import Appointment
+
+# Quarter-hour booking slots per synthetic day
+SLOTS_PER_DAY = 36
+# Weekly occurrences per recurring series, and the days after the first
+# free day where series are booked, clear of the single bookings
+SERIES_COUNT = 4
+SERIES_OFFSET_DAYS = 3650
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    route: str
+    # Returns (path, query string, JSON body or None) for one request
+    make: Callable[[], tuple[str, str, Optional[object]]]
+
+
+class Workload:
+    """Request factories for every endpoint, drawing from the dataset."""
+
+    def __init__(self, ds: dataset.Dataset, first_free_day, seed: int):
+        self.ds = ds
+        self.rng = random.Random(seed)
+        self.days = [ds.spec.start + timedelta(days=i) for i in range(ds.spec.days)]
+        # Inactive doctors (every 50th) cannot be booked
+        self.active_doctors = [d for d in range(1, ds.doctors + 1) if (d - 1) % 50]
+        self.first_free_day = first_free_day
+        # Unique emails and free slots even when a database is reused
+        self.token = uuid.uuid4().hex[:8]
+        self.serial = itertools.count()
+        self.slot = itertools.count()
+        self.series_slot = itertools.count()
+
+    def patient_id(self) -> int:
+        return self.rng.randint(1, self.ds.patients)
+
+    def doctor_id(self) -> int:
+        return self.rng.randint(1, self.ds.doctors)
+
+    def patient_index(self) -> int:
+        # Position in dataset.generate(), which names patients after it
+        return self.rng.randrange(self.ds.patients)
+
+    def day(self) -> str:
+        return self.rng.choice(self.days).isoformat()
+
+    def new_patient(self) -> dict:
+        n = next(self.serial)
+        return {
+            "fname": "Bench",
+            "lname": f"Run{n}",
+            "email": f"bench-{self.token}-{n}@example.com",
+            "ph_no": "5550000000",
+            "age": 40,
+        }
+
+    def new_doctor(self) -> dict:
+        # A specialty of their own keeps /availability?specialty= stable
+        return {"full_name": f"Dr. Bench {next(self.serial)}", "specialty": "Bench"}
+
+    def new_appointment(self) -> dict:
+        # Walk doctors first, then quarter-hour slots, then days
+        n = next(self.slot)
+        doctors = len(self.active_doctors)
+        slot, day = (n // doctors) % SLOTS_PER_DAY, n // (doctors * SLOTS_PER_DAY)
+        start = datetime.combine(
+            self.first_free_day + timedelta(days=day),
+            dataset.DAY_START,
+            tzinfo=timezone.utc,
+        ) + timedelta(minutes=15 * slot)
+        return {
+            "patient_id": self.patient_id(),
+            "doctor_id": self.active_doctors[n % doctors],
+            "reason": "benchmark",
+            "start_time": start.isoformat(),
+            "duration": 15,
+        }
+
+    def new_series(self) -> dict:
+        # Each series owns one doctor's slot on the same weekday for
+        # SERIES_COUNT weeks; consecutive blocks of weeks never overlap
+        n = next(self.series_slot)
+        doctors = len(self.active_doctors)
+        slot, block = (n // doctors) % SLOTS_PER_DAY, n // (doctors * SLOTS_PER_DAY)
+        start = datetime.combine(
+            self.first_free_day
+            + timedelta(days=SERIES_OFFSET_DAYS + 7 * SERIES_COUNT * block),
+            dataset.DAY_START,
+            tzinfo=timezone.utc,
+        ) + timedelta(minutes=15 * slot)
+        return {
+            "patient_id": self.patient_id(),
+            "doctor_id": self.active_doctors[n % doctors],
+            "reason": "benchmark series",
+            "start_time": start.isoformat(),
+            "duration": 15,
+            "freq": "weekly",
+            "count": SERIES_COUNT,
+        }
+
+    def week(self) -> str:
+        start = self.rng.choice(self.days[:-6])
+        return f"start_date={start}&end_date={start + timedelta(days=6)}"
+
+    def scenarios(self, bulk_size: int) -> list[Scenario]:
+        busy = f"date={self.ds.busiest_day}&doctor_id={self.ds.busiest_doctor}"
+        return [
+            Scenario("health", "GET", "/health", lambda: ("/health", "", None)),
+            Scenario(
+                "get_patient",
+                "GET",
+                "/patients/{id}",
+                lambda: (f"/patients/{self.patient_id()}", "", None),
+            ),
+            Scenario(
+                "get_patient_expanded",
+                "GET",
+                "/patients/{id}",
+                lambda: (f"/patients/{self.patient_id()}", "expand=appointments", None),
+            ),
+            Scenario(
+                "patient_appointments",
+                "GET",
+                "/patients/{id}/appointments",
+                lambda: (f"/patients/{self.patient_id()}/appointments", "", None),
+            ),
+            Scenario(
+                "search_patients_by_name",
+                "GET",
+                "/patients/search",
+                lambda: (
+                    "/patients/search",
+                    f"last_name=last{self.patient_index() % 5000}",
+                    None,
+                ),
+            ),
+            Scenario(
+                "search_patients_by_email",
+                "GET",
+                "/patients/search",
+                lambda: (
+                    "/patients/search",
+                    f"email=patient{self.patient_index()}@example.com",
+                    None,
+                ),
+            ),
+            Scenario(
+                "search_patients_by_phone",
+                "GET",
+                "/patients/search",
+                lambda: (
+                    "/patients/search",
+                    f"phone=555-{self.patient_index():07d}",
+                    None,
+                ),
+            ),
+            Scenario(
+                "create_patient",
+                "POST",
+                "/patients",
+                lambda: ("/patients", "", self.new_patient()),
+            ),
+            Scenario(
+                "create_patients_bulk",
+                "POST",
+                "/patients/bulk",
+                lambda: (
+                    "/patients/bulk",
+                    "",
+                    [self.new_patient() for _ in range(bulk_size)],
+                ),
+            ),
+            Scenario(
+                "get_doctor",
+                "GET",
+                "/doctors/{id}",
+                lambda: (f"/doctors/{self.doctor_id()}", "", None),
+            ),
+            Scenario(
+                "get_doctor_expanded",
+                "GET",
+                "/doctors/{id}",
+                lambda: (f"/doctors/{self.doctor_id()}", "expand=appointments", None),
+            ),
+            Scenario(
+                "create_doctor",
+                "POST",
+                "/doctors",
+                lambda: ("/doctors", "", self.new_doctor()),
+            ),
+            Scenario(
+                "create_doctors_bulk",
+                "POST",
+                "/doctors/bulk",
+                lambda: (
+                    "/doctors/bulk",
+                    "",
+                    [self.new_doctor() for _ in range(bulk_size)],
+                ),
+            ),
+            Scenario(
+                "doctor_availability",
+                "GET",
+                "/doctors/{id}/availability",
+                lambda: (
+                    f"/doctors/{self.doctor_id()}/availability",
+                    f"date={self.day()}&duration=30",
+                    None,
+                ),
+            ),
+            Scenario(
+                "availability_by_specialty",
+                "GET",
+                "/availability",
+                lambda: (
+                    "/availability",
+                    f"date={self.day()}&duration=30"
+                    f"&specialty={self.rng.choice(dataset.SPECIALTIES)}",
+                    None,
+                ),
+            ),
+            Scenario(
+                "list_day",
+                "GET",
+                "/appointments",
+                lambda: ("/appointments", f"date={self.day()}", None),
+            ),
+            Scenario(
+                "list_day_doctor",
+                "GET",
+                "/appointments",
+                lambda: (
+                    "/appointments",
+                    f"date={self.day()}&doctor_id={self.doctor_id()}",
+                    None,
+                ),
+            ),
+            Scenario(
+                "list_busiest_doctor_day",
+                "GET",
+                "/appointments",
+                lambda: ("/appointments", busy, None),
+            ),
+            Scenario(
+                "list_week_doctors",
+                "GET",
+                "/appointments",
+                lambda: (
+                    "/appointments",
+                    self.week()
+                    + "".join(f"&doctor_ids={self.doctor_id()}" for _ in range(3)),
+                    None,
+                ),
+            ),
+            Scenario(
+                "list_day_expanded",
+                "GET",
+                "/appointments",
+                lambda: (
+                    "/appointments",
+                    f"date={self.day()}&expand=patient,doctor",
+                    None,
+                ),
+            ),
+            Scenario(
+                "list_day_page",
+                "GET",
+                "/appointments",
+                lambda: ("/appointments", f"date={self.day()}&limit=100", None),
+            ),
+            Scenario(
+                "stream_day",
+                "GET",
+                "/appointments/stream",
+                lambda: ("/appointments/stream", f"date={self.day()}", None),
+            ),
+            Scenario(
+                "stats_week",
+                "GET",
+                "/stats/appointments",
+                lambda: ("/stats/appointments", self.week(), None),
+            ),
+            Scenario(
+                "create_appointment",
+                "POST",
+                "/appointments",
+                lambda: ("/appointments", "", self.new_appointment()),
+            ),
+            Scenario(
+                "create_appointments_bulk",
+                "POST",
+                "/appointments/bulk",
+                lambda: (
+                    "/appointments/bulk",
+                    "",
+                    [self.new_appointment() for _ in range(bulk_size)],
+                ),
+            ),
+            Scenario(
+                "create_appointment_series",
+                "POST",
+                "/appointments/recurring",
+                lambda: ("/appointments/recurring", "", self.new_series()),
+            ),
+            Scenario(
+                "cache_stats", "GET", "/cache/stats", lambda: ("/cache/stats", "", None)
+            ),
+            Scenario("metrics", "GET", "/metrics", lambda: ("/metrics", "", None)),
+        ]
+
+
+def first_free_day(engine):
+    """First day after every existing appointment, so bookings never clash."""
+    with engine.connect() as conn:
+        latest = conn.scalar(select(func.max(Appointment.start_time)))
+    return datetime.fromisoformat(str(latest)).date() + timedelta(days=1)
+
+
+def summarise(scenario: Scenario, transport: str, samples, errors, elapsed, rss):
+    return {
+        "scenario": scenario.name,
+        "transport": transport,
+        "method": scenario.method,
+        "route": scenario.route,
+        "errors": errors,
+        "rps": len(samples) / elapsed,
+        **latency_stats(samples),
+        "peak_rss_mib": rss,
+    }
+
+
+def run_inprocess(engine, scenarios, args) -> list[dict]:
+    results = []
+    with app_on_engine(engine) as app:
+        for scenario in scenarios:
+
+            def call():
+                path, query, body = scenario.make()
+                payload = json.dumps(body).encode() if body is not None else b""
+                t0 = time.perf_counter()
+                status, _, _ = asgi_request(app, scenario.method, path, query, payload)
+                return time.perf_counter() - t0, status
+
+            for _ in range(args.warmup):
+                call()
+            samples, errors = [], 0
+            t0 = time.perf_counter()
+            for _ in range(args.requests):
+                seconds, status = call()
+                samples.append(seconds)
+                errors += status >= 400
+            elapsed = time.perf_counter() - t0
+            results.append(
+                summarise(
+                    scenario, "inprocess", samples, errors, elapsed, peak_rss_mib()
+                )
+            )
+    return results
+
+
+async def _drive_http(base_url, scenario, count, concurrency):
+    import httpx
+
+    samples, errors = [], 0
+    remaining = iter(range(count))
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as c:
+
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                path, query, body = scenario.make()
+                t0 = time.perf_counter()
+                response = await c.request(
+                    scenario.method, f"{path}?{query}" if query else path, json=body
+                )
+                samples.append(time.perf_counter() - t0)
+                errors += response.status_code >= 400
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return samples, errors, time.perf_counter() - t0
+
+
+def run_http(url, scenarios, args) -> list[dict]:
+    results = []
+    with uvicorn_server(url) as (base_url, pid):
+        for scenario in scenarios:
+            asyncio.run(_drive_http(base_url, scenario, args.warmup, args.concurrency))
+            samples, errors, elapsed = asyncio.run(
+                _drive_http(base_url, scenario, args.requests, args.concurrency)
+            )
+            results.append(
+                summarise(scenario, "http", samples, errors, elapsed, peak_rss_mib(pid))
+            )
+    return results
+
+
+def compare(results: list[dict], baseline_path: str, tolerance: float) -> list[dict]:
+    """Scenarios whose p95 grew by more than `tolerance` over the baseline."""
+    with open(baseline_path) as f:
+        baseline = {(r["scenario"], r["transport"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        before = baseline.get((result["scenario"], result["transport"]))
+        if before and result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                {
+                    "scenario": result["scenario"],
+                    "transport": result["transport"],
+                    "baseline_p95_ms": before["p95_ms"],
+                    "p95_ms": result["p95_ms"],
+                }
+            )
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    dataset.add_arguments(parser)
+    parser.add_argument("--db", help="SQLite file to reuse (generated if empty)")
+    parser.add_argument(
+        "--transport",
+        nargs="+",
+        choices=["inprocess", "http"],
+        default=["inprocess", "http"],
+    )
+    parser.add_argument("--scenarios", nargs="+", help="only run these scenarios")
+    parser.add_argument("--requests", type=int, default=500, help="per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8, help="HTTP clients")
+    parser.add_argument("--bulk-size", type=int, default=50)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--baseline", help="earlier --output to compare p95 against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.abspath(args.db or os.path.join(tmp, "suite.db"))
+        url = f"sqlite:///{path}"
+        with temp_engine(url) as engine:
+            t0 = time.perf_counter()
+            ds = dataset.load_or_generate(engine, dataset.spec_from_args(args))
+            setup_seconds = time.perf_counter() - t0
+            workload = Workload(ds, first_free_day(engine), args.seed)
+            scenarios = workload.scenarios(args.bulk_size)
+            if args.scenarios:
+                scenarios = [s for s in scenarios if s.name in args.scenarios]
+
+            results = []
+            if "inprocess" in args.transport:
+                results += run_inprocess(engine, scenarios, args)
+            if "http" in args.transport:
+                results += run_http(url, scenarios, args)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests_per_scenario": args.requests,
+            "concurrency": args.concurrency,
+            "dataset_setup_seconds": setup_seconds,
+        },
+        "dataset": asdict(ds),
+        "results": results,
+    }
+    regressions = []
+    if args.baseline:
+        regressions = report["regressions"] = compare(
+            results, args.baseline, args.tolerance
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+    else:
+        emit(report)
+    if regressions:
+        sys.exit(f"{len(regressions)} scenario(s) regressed beyond tolerance")
+
+
+if __name__ == "__main__":
+    main()
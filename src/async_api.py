@@ -0,0 +1,374 @@
+"""
+Async endpoints mounted by src.main when DB_MODE=async.
+
+Routes, parameters and responses match the sync router in src.main; only the
+session type and the awaited service calls differ.
+"""
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    status,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.services import async_queries as service
+from src.services import serialization
+from src.schemas.schema import (
+    PatientCreate,
+    PatientRead,
+    DoctorCreate,
+    DoctorRead,
+    AppointmentCreate,
+    AppointmentRead,
+    AppointmentSeriesCreate,
+    AppointmentSeriesResult,
+    BulkItemResult,
+    DailyScheduleStats,
+    DoctorAvailability,
+    MAX_APPOINTMENT_DURATION,
+    MIN_APPOINTMENT_DURATION,
+)
+from src.dependencies import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+    MAX_BULK_ITEMS,
+    MAX_PAGE_SIZE,
+    MAX_SEARCH_LIMIT,
+    WORKING_DAY_END,
+    WORKING_DAY_START,
+    appointment_range,
+    availability_payload,
+    booking_error,
+    cached_json_response,
+    check_availability_doctors,
+    check_expandable,
+    check_working_window,
+    expand_param,
+    listing_media_type,
+    not_modified,
+    not_modified_response,
+    history_range,
+    page_after,
+    patient_search,
+    search_after,
+    stats_range,
+)
+from src.services.utils import encode_cursor, encode_search_cursor
+from src.database import get_async_db
+from src.replicas import get_async_read_db
+from datetime import date, time
+from typing import Optional, List
+
+router = APIRouter()
+
+
+@router.get("/patients/search", response_model=List[PatientRead])
+async def search_patients_endpoint(
+    response: Response,
+    search: dict = Depends(patient_search),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of a page"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    patients, next_key = await service.search_patients(
+        db, **search, limit=limit, after=search_after(cursor)
+    )
+    if next_key is not None:
+        response.headers["X-Next-Cursor"] = encode_search_cursor(next_key)
+    return patients
+
+
+@router.get("/patients/{id}", response_model=PatientRead)
+async def retrieve_patient(
+    id: int,
+    request: Request,
+    expand: frozenset = Depends(expand_param("appointments")),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    if expand:
+        entry = await service.load_patient_expanded_json(db, id)
+    else:
+        entry = await service.get_patient_json(db, id)
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found"
+        )
+    return cached_json_response(request, entry)
+
+
+@router.get("/patients/{id}/appointments", response_model=List[AppointmentRead])
+async def patient_appointments(
+    id: int,
+    response: Response,
+    period: tuple = Depends(history_range),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of a page"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    # Newest first; the cursor walks back in time
+    rows, next_key = await service.get_patient_appointments(
+        db,
+        id,
+        *period,
+        limit=limit,
+        before=page_after(cursor),
+        columns=serialization.FAST_JSON,
+    )
+    # Only an empty page needs to tell "no appointments" from "no patient"
+    if not rows and await service.get_patient_json(db, id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found"
+        )
+    headers = {}
+    if next_key is not None:
+        headers["X-Next-Cursor"] = encode_cursor(*next_key)
+    if serialization.FAST_JSON:
+        return Response(
+            serialization.appointments_json(rows),
+            media_type="application/json",
+            headers=headers,
+        )
+    response.headers.update(headers)
+    return rows
+
+
+@router.post("/patients", response_model=PatientRead, status_code=201)
+async def post_patient(
+    patient: PatientCreate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        return await service.create_patient(db, patient)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Patient with this email already exists",
+        )
+
+
+@router.post("/patients/bulk", response_model=List[BulkItemResult])
+async def post_patients_bulk(
+    patients: List[PatientCreate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await service.create_patients_bulk(db, patients)
+
+
+@router.get("/doctors/{id}", response_model=DoctorRead)
+async def retrieve_doctor(
+    id: int,
+    request: Request,
+    expand: frozenset = Depends(expand_param("appointments")),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    if expand:
+        entry = await service.load_doctor_expanded_json(db, id)
+    else:
+        entry = await service.get_doctor_json(db, id)
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Doctor not found"
+        )
+    return cached_json_response(request, entry)
+
+
+@router.post("/doctors", response_model=DoctorRead, status_code=201)
+async def post_doctor(
+    doctor: DoctorCreate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await service.create_doctor(db, doctor)
+
+
+@router.get("/doctors/{id}/availability", response_model=DoctorAvailability)
+async def doctor_availability(
+    id: int,
+    date: date = Query(..., description="YYYY-MM-DD"),
+    duration: int = Query(30, ge=MIN_APPOINTMENT_DURATION, le=MAX_APPOINTMENT_DURATION),
+    day_start: time = Query(WORKING_DAY_START, description="HH:MM, UTC"),
+    day_end: time = Query(WORKING_DAY_END, description="HH:MM, UTC"),
+    step: int = Query(15, ge=5, le=180, description="Slot grid in minutes"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    check_working_window(day_start, day_end)
+    doctor = await service.get_doctor(db, id)
+    if not doctor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Doctor not found"
+        )
+    slots = {}
+    if doctor.active:
+        slots = await service.find_available_slots(
+            db, [id], date, duration, day_start, day_end, step
+        )
+    return availability_payload([id], date, duration, slots)[0]
+
+
+@router.get("/availability", response_model=List[DoctorAvailability])
+async def availability_search(
+    date: date = Query(..., description="YYYY-MM-DD"),
+    duration: int = Query(30, ge=MIN_APPOINTMENT_DURATION, le=MAX_APPOINTMENT_DURATION),
+    doctor_ids: Optional[List[int]] = Query(None, description="Repeatable"),
+    specialty: Optional[str] = Query(None),
+    day_start: time = Query(WORKING_DAY_START, description="HH:MM, UTC"),
+    day_end: time = Query(WORKING_DAY_END, description="HH:MM, UTC"),
+    step: int = Query(15, ge=5, le=180, description="Slot grid in minutes"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    check_working_window(day_start, day_end)
+    ids = await service.get_bookable_doctor_ids(db, doctor_ids, specialty)
+    check_availability_doctors(ids)
+    slots = await service.find_available_slots(
+        db, ids, date, duration, day_start, day_end, step
+    )
+    return availability_payload(ids, date, duration, slots)
+
+
+@router.post("/doctors/bulk", response_model=List[BulkItemResult])
+async def post_doctors_bulk(
+    doctors: List[DoctorCreate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await service.create_doctors_bulk(db, doctors)
+
+
+@router.get("/appointments", response_model=List[AppointmentRead])
+async def list_appointments_endpoint(
+    request: Request,
+    response: Response,
+    filters: tuple = Depends(appointment_range),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of a page"),
+    expand: frozenset = Depends(expand_param("patient", "doctor")),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    media_type = listing_media_type(request)
+    # A returned Response does not pick up headers set on `response`, so
+    # they are collected here for both paths
+    headers = {"Vary": "Accept"}
+    if expand:
+        # Embedded patients and doctors are not versioned by the schedule
+        # rollup, so expanded listings go out without validators
+        check_expandable(media_type)
+    else:
+        # The ETag is read before the rows: a booking landing in between
+        # makes it stale, which costs the client a full response, never a
+        # wrong 304.
+        etag = await service.schedule_etag(
+            db, *filters, variant=f"{request.url.query}|{media_type}"
+        )
+        if not_modified(request, etag):
+            return not_modified_response(etag)
+        headers["ETag"] = etag
+
+    # FAST_JSON and the compact formats encode column tuples straight to
+    # bytes, skipping per-row AppointmentRead validation; FAST_JSON output
+    # is byte-for-byte the response_model output.
+    raw = not expand and (
+        serialization.FAST_JSON or media_type != serialization.JSON_MEDIA_TYPE
+    )
+    if limit is None and cursor is None:
+        rows = await service.get_appointments_in_range(
+            db, *filters, columns=raw, expand=expand
+        )
+    else:
+        # Keyset pagination over (start_time, id); the next page's cursor is
+        # returned in a header so the body keeps the plain list shape.
+        rows, next_key = await service.get_appointments_page(
+            db,
+            *filters,
+            limit=limit or DEFAULT_PAGE_SIZE,
+            after=page_after(cursor),
+            columns=raw,
+            expand=expand,
+        )
+        if next_key is not None:
+            headers["X-Next-Cursor"] = encode_cursor(*next_key)
+
+    if expand:
+        return Response(
+            serialization.expanded_appointments_json(rows, expand),
+            media_type=media_type,
+            headers=headers,
+        )
+    if raw:
+        return Response(
+            serialization.encode_appointments(rows, media_type),
+            media_type=media_type,
+            headers=headers,
+        )
+    response.headers.update(headers)
+    return rows
+
+
+@router.get("/appointments/stream")
+async def stream_appointments_endpoint(
+    filters: tuple = Depends(appointment_range),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    if serialization.FAST_JSON:
+
+        async def chunks():
+            async for batch in service.stream_appointments(db, *filters, columns=True):
+                for chunk in serialization.appointments_ndjson(batch, len(batch)):
+                    yield chunk
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    async def lines():
+        async for row in service.stream_appointments(db, *filters):
+            yield AppointmentRead.model_validate(row).model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/stats/appointments", response_model=List[DailyScheduleStats])
+async def appointment_stats(
+    filters: tuple = Depends(stats_range),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    return await service.get_daily_summary(db, *filters)
+
+
+@router.post(
+    "/appointments", response_model=AppointmentRead, status_code=status.HTTP_201_CREATED
+)
+async def create_appointment_endpoint(
+    payload: AppointmentCreate, db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        return await service.create_appointment(db, payload)
+    except HTTPException as exc:
+        raise booking_error(exc)
+
+
+@router.post("/appointments/bulk", response_model=List[BulkItemResult])
+async def create_appointments_bulk_endpoint(
+    payload: List[AppointmentCreate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await service.create_appointments_bulk(db, payload)
+
+
+@router.post(
+    "/appointments/recurring",
+    response_model=AppointmentSeriesResult,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_409_CONFLICT: {"model": AppointmentSeriesResult}},
+)
+async def create_appointment_series_endpoint(
+    payload: AppointmentSeriesCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    result = await service.create_appointment_series(db, payload)
+    if not result["booked"]:
+        response.status_code = status.HTTP_409_CONFLICT
+    return result
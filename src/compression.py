@@ -0,0 +1,180 @@
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+# Set COMPRESSION_ENABLED=false to always send identity responses
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Bodies smaller than this (bytes) are not worth the CPU or the extra header
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# zlib level for gzip; brotli quality. Low values favour CPU over ratio.
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Media types that compress well; everything else passes through
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/vnd.columns+json",
+    "application/msgpack",
+)
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Content codings this process can produce, in server preference order."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """
+    Picks a content coding for an Accept-Encoding header: the highest q-value
+    wins, ties go to server preference, and None means identity.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for coding in supported_encodings():
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Compressor:
+    """Incremental gzip or brotli encoder with a common interface."""
+
+    def __init__(self, coding: str):
+        self.coding = coding
+        if coding == "br":
+            self._br = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._gz = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compresses and flushes, so a streamed chunk reaches the client now."""
+        if self.coding == "br":
+            return self._br.process(data) + self._br.flush()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.coding == "br":
+            return self._br.process(data) + self._br.finish()
+        return self._gz.compress(data) + self._gz.flush()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with the client's preferred
+    supported coding (br when the brotli package is installed, else gzip).
+
+    Whole bodies under minimum_size and non-compressible media types go out
+    untouched. Streamed bodies are compressed chunk by chunk and flushed, so
+    NDJSON streams keep arriving incrementally. Strong ETags are weakened on
+    compressed responses, as the bytes differ from the identity encoding.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.enabled = COMPRESSION_ENABLED
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        coding = negotiate_encoding(accept) if accept else None
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # Held back until the first body shows whether to compress
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+            if compressor is None:
+                if not self._should_compress(start, body, more):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(coding)
+                if more:
+                    await send(self._compressed_start(start, coding, None))
+                else:
+                    body = compressor.finish(body)
+                    await send(self._compressed_start(start, coding, len(body)))
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+            body = compressor.chunk(body) if more else compressor.finish(body)
+            await send({"type": "http.response.body", "body": body, "more_body": more})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _should_compress(self, start, body: bytes, more: bool) -> bool:
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return False
+        headers = {k.lower(): v for k, v in start["headers"]}
+        if b"content-encoding" in headers:
+            return False
+        media_type = headers.get(b"content-type", b"").decode("latin-1")
+        if not media_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        # A streamed body's size is unknown up front; assume it is large
+        return more or len(body) >= self.minimum_size
+
+    @staticmethod
+    def _compressed_start(start, coding: str, length: int | None):
+        headers = []
+        vary = None
+        for name, value in start["headers"]:
+            key = name.lower()
+            if key == b"content-length":
+                continue
+            if key == b"vary":
+                vary = value
+                continue
+            if key == b"etag" and not value.startswith(b"W/"):
+                value = b"W/" + value
+            headers.append((name, value))
+        headers.append((b"content-encoding", coding.encode()))
+        headers.append(
+            (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding")
+        )
+        if length is not None:
+            headers.append((b"content-length", str(length).encode()))
+        return {**start, "headers": headers}
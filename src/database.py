@@ -1,32 +1,237 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
 from sqlalchemy.orm import sessionmaker, Session
 from dotenv import load_dotenv
+import logging
 import os
-from typing import Generator
+import threading
+from typing import AsyncGenerator, Generator, Optional
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Prefer an explicit DATABASE_URL env var; otherwise default to a local SQLite DB
 DATABASE_URL = os.getenv("DATABASE_URL")
+# "sync" serves requests with blocking Sessions from FastAPI's threadpool;
+# "async" mounts the async endpoints backed by an AsyncEngine.
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+# Optional explicit async URL; otherwise derived from DATABASE_URL
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
 
-try:
-    if DATABASE_URL:
-        engine = create_engine(DATABASE_URL, echo=False)
-    else:
-        # Use a file-based SQLite DB by default. Allow multiple threads for tests.
-        engine = create_engine(
-            "sqlite:///./test.db", connect_args={"check_same_thread": False}, echo=False
-        )
-    print("Engine Created:", engine.url)
-except Exception as e:
-    print(e)
+# Pool tuning; unset values keep SQLAlchemy's defaults for the backend
+DB_POOL_SIZE = os.getenv("DB_POOL_SIZE")
+DB_MAX_OVERFLOW = os.getenv("DB_MAX_OVERFLOW")
+DB_POOL_TIMEOUT = os.getenv("DB_POOL_TIMEOUT")
+# Seconds after which a pooled connection is replaced (-1 disables)
+DB_POOL_RECYCLE = os.getenv("DB_POOL_RECYCLE")
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# PRAGMAs run on every new SQLite connection, per SQLITE_PROFILE. "tuned" lets
+# readers proceed alongside a writer (WAL), waits on a locked database instead
+# of failing at once and trades fsyncs per commit for fsyncs per checkpoint.
+SQLITE_PROFILES = {
+    "default": {},
+    "tuned": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -65536,  # KiB, i.e. 64 MiB per connection
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+}
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default").lower()
+
+
+def pool_options() -> dict:
+    """create_engine() keyword arguments for the DB_POOL_* settings."""
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    for name, value in (
+        ("pool_size", DB_POOL_SIZE),
+        ("max_overflow", DB_MAX_OVERFLOW),
+        ("pool_timeout", DB_POOL_TIMEOUT),
+        ("pool_recycle", DB_POOL_RECYCLE),
+    ):
+        if value is not None:
+            options[name] = int(value)
+    return options
+
+
+def apply_sqlite_profile(engine: Engine, profile: str) -> None:
+    """Runs the profile's PRAGMAs on each connection the engine opens."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE {profile!r}")
+    pragmas = SQLITE_PROFILES[profile]
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def build_engine(url, profile: Optional[str] = None, **kwargs) -> Engine:
+    """
+    Creates a sync engine with the configured pool options and, for SQLite,
+    the PRAGMAs of `profile` (SQLITE_PROFILE by default).
+    """
+    url = make_url(url)
+    options = pool_options()
+    if url.get_backend_name() == "sqlite":
+        # Allow multiple threads for tests and FastAPI's threadpool
+        options["connect_args"] = {"check_same_thread": False}
+    options.update(kwargs)
+    engine = create_engine(url, **options)
+    apply_sqlite_profile(engine, profile or SQLITE_PROFILE)
+    return engine
+
+
+def engine_settings(engine: Engine, profile: Optional[str] = None) -> dict:
+    """
+    Pool and SQLite settings of `engine`, for logging. Options the pool has
+    no public accessor for are reported as configured by DB_POOL_*, or as
+    SQLAlchemy's defaults when unset.
+    """
+    profile = profile or SQLITE_PROFILE
+    options = pool_options()
+    pool = engine.pool
+    settings = {
+        "url": engine.url.render_as_string(hide_password=True),
+        "pool": type(pool).__name__,
+        "pre_ping": options["pool_pre_ping"],
+        "recycle": options.get("pool_recycle", -1),
+    }
+    if hasattr(pool, "size"):
+        settings["size"] = pool.size()
+        settings["max_overflow"] = options.get("max_overflow", 10)
+        settings["timeout"] = pool.timeout()
+    if engine.dialect.name == "sqlite":
+        settings["sqlite_profile"] = profile
+        settings["pragmas"] = SQLITE_PROFILES[profile]
+    return settings
+
+
+_engine: Optional[Engine] = None
+_sessionmaker: Optional[sessionmaker] = None
+_engine_lock = threading.Lock()
+
+
+def database_url() -> str:
+    # Use a file-based SQLite DB by default.
+    return DATABASE_URL or "sqlite:///./test.db"
+
+
+def get_engine() -> Engine:
+    """
+    The process-wide sync engine, created on first use (normally by the app
+    lifespan at startup) rather than at import, so importing the app, the
+    models or a CLI costs no engine setup.
+    """
+    global _engine, _sessionmaker
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = build_engine(database_url(), echo=False)
+                logger.info("Database engine settings: %s", engine_settings(engine))
+                _sessionmaker = sessionmaker(bind=engine)
+                _engine = engine
+    return _engine
+
+
+def get_sessionmaker() -> sessionmaker:
+    """The session factory bound to get_engine()."""
+    get_engine()
+    return _sessionmaker
 
-SessionLocal = sessionmaker(bind=engine)
+
+def dispose_engine() -> None:
+    """Closes the engine's pooled connections, if an engine was created."""
+    if _engine is not None:
+        _engine.dispose()
+
+
+def __getattr__(name: str):
+    # `engine` and `SessionLocal` used to be created at import; they still
+    # resolve, creating the engine on first access
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
+
+
+# Async drivers substituted for each backend when deriving ASYNC_DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+_async_sessionmaker = None
+
+
+def to_async_url(url) -> URL:
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {url.drivername}")
+    return url.set(drivername=driver)
+
+
+def build_async_sessionmaker(url):
+    """
+    Session factory over a new AsyncEngine for the async `url`, with the
+    configured pool options and SQLite profile.
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(make_url(url), echo=False, **pool_options())
+    apply_sqlite_profile(async_engine.sync_engine, SQLITE_PROFILE)
+    logger.info(
+        "Async database engine settings: %s",
+        engine_settings(async_engine.sync_engine),
+    )
+    # Objects must stay readable after commit without lazy (sync) reloads
+    return async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+def get_async_sessionmaker():
+    """
+    Creates the AsyncEngine and its session factory on first use, so sync
+    deployments never import an async driver.
+    """
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        _async_sessionmaker = build_async_sessionmaker(
+            ASYNC_DATABASE_URL or to_async_url(database_url())
+        )
+    return _async_sessionmaker
+
+
+async def dispose_async_engine() -> None:
+    """Closes the AsyncEngine's pooled connections, if one was created."""
+    if _async_sessionmaker is not None:
+        await _async_sessionmaker.kw["bind"].dispose()
+
+
+async def get_async_db() -> AsyncGenerator:
+    async with get_async_sessionmaker()() as db:
+        yield db
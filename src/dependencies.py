@@ -0,0 +1,338 @@
+"""
+Request parsing and response shaping shared by the sync endpoints in
+src.main and the async endpoints in src.async_api.
+"""
+
+from fastapi import HTTPException, Query, Request, Response, status
+from datetime import date, datetime, time, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import List, Optional
+
+from src.services import serialization
+from src.services.cache import JSONEntry
+from src.services.utils import decode_cursor, decode_search_cursor, normalize_phone
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_RANGE_DAYS = 31
+MAX_STATS_RANGE_DAYS = 366
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Items per bulk request; each batch is locked, checked and inserted in one
+# transaction
+MAX_BULK_ITEMS = 1000
+# Default bookable hours (UTC) for availability searches
+WORKING_DAY_START = time(9, 0)
+WORKING_DAY_END = time(18, 0)
+# Doctors one availability search may compute slots for
+MAX_AVAILABILITY_DOCTORS = 200
+
+
+def appointment_range(
+    date: Optional[date] = Query(None, description="YYYY-MM-DD"),
+    start_date: Optional[date] = Query(None, description="First day, YYYY-MM-DD"),
+    end_date: Optional[date] = Query(None, description="Last day, inclusive"),
+    doctor_id: Optional[int] = Query(None, gt=0),
+    doctor_ids: Optional[List[int]] = Query(None, description="Repeatable"),
+) -> tuple:
+    """
+    Resolves the listing filters: a single `date` or a `start_date`/`end_date`
+    range, and one `doctor_id` and/or several `doctor_ids`.
+    """
+    if date is not None and (start_date is not None or end_date is not None):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Use either date or start_date/end_date",
+        )
+    start_date = start_date or date
+    if start_date is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="date or start_date is required",
+        )
+    end_date = end_date or start_date
+    _check_span(start_date, end_date, MAX_RANGE_DAYS)
+    return start_date, end_date, _doctor_filter(doctor_id, doctor_ids)
+
+
+def stats_range(
+    start_date: date = Query(..., description="First day, YYYY-MM-DD"),
+    end_date: Optional[date] = Query(None, description="Last day, inclusive"),
+    doctor_id: Optional[int] = Query(None, gt=0),
+    doctor_ids: Optional[List[int]] = Query(None, description="Repeatable"),
+) -> tuple:
+    """Filters for /stats/appointments; rollups allow a much longer range."""
+    end_date = end_date or start_date
+    _check_span(start_date, end_date, MAX_STATS_RANGE_DAYS)
+    return start_date, end_date, _doctor_filter(doctor_id, doctor_ids)
+
+
+def history_range(
+    start_date: Optional[date] = Query(None, description="First day, YYYY-MM-DD"),
+    end_date: Optional[date] = Query(None, description="Last day, inclusive"),
+) -> tuple:
+    """
+    Optional day bounds for a patient's timeline. Unlike the listing there is
+    no span limit: pages are bounded by the patient, not by the range.
+    """
+    if start_date is not None and end_date is not None and end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="end_date must not be before start_date",
+        )
+    return start_date, end_date
+
+
+def patient_search(
+    last_name: Optional[str] = Query(
+        None, min_length=1, max_length=100, description="Prefix, any case"
+    ),
+    first_name: Optional[str] = Query(
+        None, min_length=1, max_length=100, description="Prefix; needs last_name"
+    ),
+    email: Optional[str] = Query(None, max_length=100, description="Exact"),
+    phone: Optional[str] = Query(
+        None, max_length=100, description="Spaces, dashes etc. are ignored"
+    ),
+) -> dict:
+    """Filters for /patients/search: exactly one of last_name, email, phone."""
+    if sum(v is not None for v in (last_name, email, phone)) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Search by exactly one of last_name, email or phone",
+        )
+    if first_name is not None and last_name is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="first_name only narrows a last_name search",
+        )
+    if phone is not None and not normalize_phone(phone):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="phone must contain digits",
+        )
+    return {
+        "last_name": last_name,
+        "first_name": first_name,
+        "email": email,
+        "phone": phone,
+    }
+
+
+def _check_span(start_date: date, end_date: date, max_days: int) -> None:
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="end_date must not be before start_date",
+        )
+    if (end_date - start_date).days >= max_days:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Date range is limited to {max_days} days",
+        )
+
+
+def _doctor_filter(
+    doctor_id: Optional[int], doctor_ids: Optional[List[int]]
+) -> Optional[List[int]]:
+    ids = list(doctor_ids or [])
+    if doctor_id is not None:
+        ids.append(doctor_id)
+    if any(i <= 0 for i in ids):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="doctor_ids must be positive",
+        )
+    return ids or None
+
+
+def page_after(cursor: Optional[str]) -> Optional[tuple[datetime, int]]:
+    """Decodes a listing cursor, turning malformed input into a 400."""
+    try:
+        return decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def search_after(cursor: Optional[str]) -> Optional[tuple]:
+    """Decodes a patient search cursor, turning malformed input into a 400."""
+    try:
+        return decode_search_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def check_working_window(day_start: time, day_end: time) -> None:
+    if day_end <= day_start:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="day_end must be after day_start",
+        )
+
+
+def check_availability_doctors(doctor_ids) -> None:
+    if len(doctor_ids) > MAX_AVAILABILITY_DOCTORS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=(
+                f"More than {MAX_AVAILABILITY_DOCTORS} doctors match;"
+                " narrow the search with doctor_ids or specialty"
+            ),
+        )
+
+
+def availability_payload(doctor_ids, day: date, duration: int, slots) -> list[dict]:
+    """Shapes find_available_slots output as DoctorAvailability dicts."""
+    return [
+        {
+            "doctor_id": doctor_id,
+            "day": day,
+            "duration": duration,
+            "slots": [
+                {"start_time": start, "end_time": end}
+                for start, end in slots.get(doctor_id, [])
+            ],
+        }
+        for doctor_id in doctor_ids
+    ]
+
+
+def booking_error(exc: HTTPException) -> HTTPException:
+    # propagate 409 for overlapping appointments
+    if exc.status_code == status.HTTP_409_CONFLICT:
+        return exc
+    # otherwise raise 400 for other validation errors
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc.detail)
+    )
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> dict:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            last_modified.astimezone(timezone.utc), usegmt=True
+        )
+    return headers
+
+
+def not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    """
+    Evaluates If-None-Match, or If-Modified-Since when no If-None-Match is
+    sent (RFC 9110 13.2.2), against the current validators.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison: W/"x" matches "x"
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        # HTTP dates have whole-second precision
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def not_modified_response(
+    etag: str, last_modified: Optional[datetime] = None
+) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=validator_headers(etag, last_modified),
+    )
+
+
+def cached_json_response(request: Request, entry: JSONEntry) -> Response:
+    """Serves a cached read model, or a bodiless 304 if the client has it."""
+    if not_modified(request, entry.etag, entry.last_modified):
+        return not_modified_response(entry.etag, entry.last_modified)
+    return Response(
+        content=entry.body,
+        media_type="application/json",
+        headers=validator_headers(entry.etag, entry.last_modified),
+    )
+
+
+def expand_param(*allowed: str):
+    """
+    Dependency factory for a comma-separated `expand` query parameter naming
+    related objects to embed; returns the names as a frozenset and rejects
+    unknown ones with a 422.
+    """
+    description = "Comma-separated: " + ", ".join(allowed)
+
+    def dependency(
+        expand: Optional[str] = Query(None, description=description),
+    ) -> frozenset:
+        names = frozenset(n.strip() for n in (expand or "").split(",") if n.strip())
+        unknown = names - set(allowed)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=f"Cannot expand {', '.join(sorted(unknown))}; "
+                f"choose from {', '.join(allowed)}",
+            )
+        return names
+
+    return dependency
+
+
+def check_expandable(media_type: str) -> None:
+    """Embedded objects only exist in the plain JSON listing."""
+    if media_type != serialization.JSON_MEDIA_TYPE:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="expand is only available as application/json",
+        )
+
+
+def listing_media_type(request: Request) -> str:
+    """
+    Negotiates the appointment listing representation from Accept: plain
+    JSON, arrays-of-columns JSON or MessagePack. Each type takes the q-value
+    of its most specific matching range; the highest wins, ties go to plain
+    JSON, and nothing acceptable is a 406.
+    """
+    accept = request.headers.get("accept")
+    if not accept:
+        return serialization.JSON_MEDIA_TYPE
+    ranges: dict[str, float] = {}
+    for item in accept.split(","):
+        media_range, *params = (part.strip() for part in item.split(";"))
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if media_range in serialization.MSGPACK_ALIASES:
+            media_range = serialization.MSGPACK_MEDIA_TYPE
+        ranges[media_range.lower()] = max(q, ranges.get(media_range.lower(), 0.0))
+
+    best, best_q = None, 0.0
+    for media_type in serialization.listing_media_types():
+        # The most specific matching range sets the type's q-value
+        for key in (media_type, media_type.split("/")[0] + "/*", "*/*"):
+            if key in ranges:
+                if ranges[key] > best_q:
+                    best, best_q = media_type, ranges[key]
+                break
+    if best is None:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="Supported types: " + ", ".join(serialization.listing_media_types()),
+        )
+    return best
@@ -1,11 +1,35 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Query
+from fastapi import (
+    APIRouter,
+    Body,
+    FastAPI,
+    Depends,
+    HTTPException,
+    status,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from src.services.queries import (
-    get_appointments_by_date_and_doctor,
+    get_appointments_in_range,
+    get_appointments_page,
     get_doctor,
-    get_patient,
+    get_patient_appointments,
+    get_doctor_json,
+    get_patient_json,
+    load_doctor_expanded_json,
+    load_patient_expanded_json,
     create_appointment,
+    create_appointment_series,
+    create_appointments_bulk,
     create_doctor,
+    create_doctors_bulk,
     create_patient,
+    create_patients_bulk,
+    find_available_slots,
+    get_bookable_doctor_ids,
+    search_patients,
+    stream_appointments,
 )
 from src.schemas.schema import (
     PatientCreate,
@@ -14,26 +38,181 @@ from src.schemas.schema import (
     DoctorRead,
     AppointmentCreate,
     AppointmentRead,
+    AppointmentSeriesCreate,
+    AppointmentSeriesResult,
+    BulkItemResult,
+    DailyScheduleStats,
+    DoctorAvailability,
+    MAX_APPOINTMENT_DURATION,
+    MIN_APPOINTMENT_DURATION,
+)
+from src.dependencies import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+    MAX_BULK_ITEMS,
+    MAX_PAGE_SIZE,
+    MAX_SEARCH_LIMIT,
+    WORKING_DAY_END,
+    WORKING_DAY_START,
+    appointment_range,
+    availability_payload,
+    booking_error,
+    cached_json_response,
+    check_availability_doctors,
+    check_expandable,
+    check_working_window,
+    expand_param,
+    listing_media_type,
+    not_modified,
+    not_modified_response,
+    history_range,
+    page_after,
+    patient_search,
+    search_after,
+    stats_range,
+)
+from src.services.cache import doctor_cache, patient_cache
+from src.services import serialization
+from src.services.schedule_index import schedule_index
+from src.services.summary import get_daily_summary, schedule_etag
+from src.compression import CompressionMiddleware
+from src.observability import MetricsMiddleware, configure_logging, metrics
+from src.services.utils import encode_cursor, encode_search_cursor
+from src.database import (
+    DB_MODE,
+    dispose_async_engine,
+    dispose_engine,
+    get_async_sessionmaker,
+    get_db,
+    get_engine,
+    get_sessionmaker,
 )
-from src.database import get_db
+from src.replicas import ReadYourWritesMiddleware, get_read_db, replicas
 from sqlalchemy.orm import Session
-from datetime import date
+from contextlib import asynccontextmanager
+from datetime import date, time
 from typing import Optional, List
+import logging
+
+logger = logging.getLogger(__name__)
+
 
-app = FastAPI(title="Patient Encounter System")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The engine is built here rather than at import, so importing the app
+    # (workers, tests, CLIs) stays cheap and the first request does not pay
+    # for connection pool setup either
+    configure_logging()
+    if DB_MODE == "async":
+        get_async_sessionmaker()
+    else:
+        get_engine()
+    if schedule_index.enabled:
+        # Warm before serving so the first bookings already skip the SQL pre-check
+        with get_sessionmaker()() as db:
+            loaded = schedule_index.warm(db)
+        logger.info(
+            "Schedule index warmed with %d appointments (%d bytes)",
+            loaded,
+            schedule_index.memory_bytes(),
+        )
+    yield
+    dispose_engine()
+    await dispose_async_engine()
+    replicas.dispose()
+    await replicas.dispose_async()
+
+
+app = FastAPI(title="Patient Encounter System", lifespan=lifespan)
+# gzip/br for clients that accept it; added first so metrics, the outer
+# middleware, time the compression too
+app.add_middleware(CompressionMiddleware)
+# Per-route latency histograms and SQL counters, served on /metrics
+app.add_middleware(MetricsMiddleware)
+# Pins a client's reads to the primary after its writes, when
+# READ_YOUR_WRITES_SECONDS and REPLICA_DATABASE_URLS are set
+app.add_middleware(ReadYourWritesMiddleware)
 
+# Endpoints backed by the blocking Session; src.async_api mirrors them for
+# DB_MODE=async and only one of the two routers is mounted.
+router = APIRouter()
 
-@app.get("/patients/{id}", response_model=PatientRead)
-def retrieve_patient(id: int, db: Session = Depends(get_db)):
-    patient = get_patient(db, id)
-    if not patient:
+
+# Declared before /patients/{id} so "search" is not taken for an id
+@router.get("/patients/search", response_model=List[PatientRead])
+def search_patients_endpoint(
+    response: Response,
+    search: dict = Depends(patient_search),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of a page"),
+    db: Session = Depends(get_read_db),
+):
+    patients, next_key = search_patients(
+        db, **search, limit=limit, after=search_after(cursor)
+    )
+    if next_key is not None:
+        response.headers["X-Next-Cursor"] = encode_search_cursor(next_key)
+    return patients
+
+
+@router.get("/patients/{id}", response_model=PatientRead)
+def retrieve_patient(
+    id: int,
+    request: Request,
+    expand: frozenset = Depends(expand_param("appointments")),
+    db: Session = Depends(get_read_db),
+):
+    # Cached PatientRead bytes; a hit skips both SQL and serialization, and
+    # a matching If-None-Match / If-Modified-Since gets an empty 304.
+    # expand=appointments embeds the schedule, loaded in one extra query.
+    if expand:
+        entry = load_patient_expanded_json(db, id)
+    else:
+        entry = get_patient_json(db, id)
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found"
+        )
+    return cached_json_response(request, entry)
+
+
+@router.get("/patients/{id}/appointments", response_model=List[AppointmentRead])
+def patient_appointments(
+    id: int,
+    response: Response,
+    period: tuple = Depends(history_range),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of a page"),
+    db: Session = Depends(get_read_db),
+):
+    # Newest first; the cursor walks back in time
+    rows, next_key = get_patient_appointments(
+        db,
+        id,
+        *period,
+        limit=limit,
+        before=page_after(cursor),
+        columns=serialization.FAST_JSON,
+    )
+    # Only an empty page needs to tell "no appointments" from "no patient"
+    if not rows and get_patient_json(db, id) is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found"
         )
-    return patient
+    headers = {}
+    if next_key is not None:
+        headers["X-Next-Cursor"] = encode_cursor(*next_key)
+    if serialization.FAST_JSON:
+        return Response(
+            serialization.appointments_json(rows),
+            media_type="application/json",
+            headers=headers,
+        )
+    response.headers.update(headers)
+    return rows
 
 
-@app.post("/patients", response_model=PatientRead, status_code=201)
+@router.post("/patients", response_model=PatientRead, status_code=201)
 def post_patient(
     patient: PatientCreate,
     db: Session = Depends(get_db),
@@ -50,17 +229,34 @@ def post_patient(
         )
 
 
-@app.get("/doctors/{id}", response_model=DoctorRead)
-def retrieve_doctor(id: int, db: Session = Depends(get_db)):
-    doctor = get_doctor(db, id)
-    if not doctor:
+@router.post("/patients/bulk", response_model=List[BulkItemResult])
+def post_patients_bulk(
+    patients: List[PatientCreate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: Session = Depends(get_db),
+):
+    # Duplicate emails are reported per item instead of failing the batch
+    return create_patients_bulk(db, patients)
+
+
+@router.get("/doctors/{id}", response_model=DoctorRead)
+def retrieve_doctor(
+    id: int,
+    request: Request,
+    expand: frozenset = Depends(expand_param("appointments")),
+    db: Session = Depends(get_read_db),
+):
+    if expand:
+        entry = load_doctor_expanded_json(db, id)
+    else:
+        entry = get_doctor_json(db, id)
+    if entry is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Doctor not found"
         )
-    return doctor
+    return cached_json_response(request, entry)
 
 
-@app.post("/doctors", response_model=DoctorRead, status_code=201)
+@router.post("/doctors", response_model=DoctorRead, status_code=201)
 def post_doctor(
     doctor: DoctorCreate,
     db: Session = Depends(get_db),
@@ -68,16 +264,149 @@ def post_doctor(
     return create_doctor(db, doctor)
 
 
-@app.get("/appointments", response_model=List[AppointmentRead])
-def list_appointments_endpoint(
+@router.get("/doctors/{id}/availability", response_model=DoctorAvailability)
+def doctor_availability(
+    id: int,
     date: date = Query(..., description="YYYY-MM-DD"),
-    doctor_id: Optional[int] = Query(None, gt=0),
+    duration: int = Query(30, ge=MIN_APPOINTMENT_DURATION, le=MAX_APPOINTMENT_DURATION),
+    day_start: time = Query(WORKING_DAY_START, description="HH:MM, UTC"),
+    day_end: time = Query(WORKING_DAY_END, description="HH:MM, UTC"),
+    step: int = Query(15, ge=5, le=180, description="Slot grid in minutes"),
+    db: Session = Depends(get_read_db),
+):
+    check_working_window(day_start, day_end)
+    doctor = get_doctor(db, id)
+    if not doctor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Doctor not found"
+        )
+    slots = {}
+    if doctor.active:
+        slots = find_available_slots(db, [id], date, duration, day_start, day_end, step)
+    return availability_payload([id], date, duration, slots)[0]
+
+
+@router.get("/availability", response_model=List[DoctorAvailability])
+def availability_search(
+    date: date = Query(..., description="YYYY-MM-DD"),
+    duration: int = Query(30, ge=MIN_APPOINTMENT_DURATION, le=MAX_APPOINTMENT_DURATION),
+    doctor_ids: Optional[List[int]] = Query(None, description="Repeatable"),
+    specialty: Optional[str] = Query(None),
+    day_start: time = Query(WORKING_DAY_START, description="HH:MM, UTC"),
+    day_end: time = Query(WORKING_DAY_END, description="HH:MM, UTC"),
+    step: int = Query(15, ge=5, le=180, description="Slot grid in minutes"),
+    db: Session = Depends(get_read_db),
+):
+    check_working_window(day_start, day_end)
+    # Active doctors matching the filters, each with its open slots
+    ids = get_bookable_doctor_ids(db, doctor_ids, specialty)
+    check_availability_doctors(ids)
+    slots = find_available_slots(db, ids, date, duration, day_start, day_end, step)
+    return availability_payload(ids, date, duration, slots)
+
+
+@router.post("/doctors/bulk", response_model=List[BulkItemResult])
+def post_doctors_bulk(
+    doctors: List[DoctorCreate] = Body(..., max_length=MAX_BULK_ITEMS),
     db: Session = Depends(get_db),
 ):
-    return get_appointments_by_date_and_doctor(db, date, doctor_id)
+    return create_doctors_bulk(db, doctors)
+
+
+@router.get("/appointments", response_model=List[AppointmentRead])
+def list_appointments_endpoint(
+    request: Request,
+    response: Response,
+    filters: tuple = Depends(appointment_range),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of a page"),
+    expand: frozenset = Depends(expand_param("patient", "doctor")),
+    db: Session = Depends(get_read_db),
+):
+    media_type = listing_media_type(request)
+    # A returned Response does not pick up headers set on `response`, so
+    # they are collected here for both paths
+    headers = {"Vary": "Accept"}
+    if expand:
+        # Embedded patients and doctors are not versioned by the schedule
+        # rollup, so expanded listings go out without validators
+        check_expandable(media_type)
+    else:
+        # The ETag is read before the rows: a booking landing in between
+        # makes it stale, which costs the client a full response, never a
+        # wrong 304.
+        etag = schedule_etag(db, *filters, variant=f"{request.url.query}|{media_type}")
+        if not_modified(request, etag):
+            return not_modified_response(etag)
+        headers["ETag"] = etag
+
+    # FAST_JSON and the compact formats encode column tuples straight to
+    # bytes, skipping per-row AppointmentRead validation; FAST_JSON output
+    # is byte-for-byte the response_model output.
+    raw = not expand and (
+        serialization.FAST_JSON or media_type != serialization.JSON_MEDIA_TYPE
+    )
+    if limit is None and cursor is None:
+        rows = get_appointments_in_range(db, *filters, columns=raw, expand=expand)
+    else:
+        # Keyset pagination over (start_time, id); the next page's cursor is
+        # returned in a header so the body keeps the plain list shape.
+        rows, next_key = get_appointments_page(
+            db,
+            *filters,
+            limit=limit or DEFAULT_PAGE_SIZE,
+            after=page_after(cursor),
+            columns=raw,
+            expand=expand,
+        )
+        if next_key is not None:
+            headers["X-Next-Cursor"] = encode_cursor(*next_key)
+
+    if expand:
+        return Response(
+            serialization.expanded_appointments_json(rows, expand),
+            media_type=media_type,
+            headers=headers,
+        )
+    if raw:
+        return Response(
+            serialization.encode_appointments(rows, media_type),
+            media_type=media_type,
+            headers=headers,
+        )
+    response.headers.update(headers)
+    return rows
+
+
+@router.get("/appointments/stream")
+def stream_appointments_endpoint(
+    filters: tuple = Depends(appointment_range),
+    db: Session = Depends(get_read_db),
+):
+    if serialization.FAST_JSON:
+        rows = stream_appointments(db, *filters, columns=True)
+        return StreamingResponse(
+            serialization.appointments_ndjson(rows),
+            media_type="application/x-ndjson",
+        )
+
+    # One AppointmentRead JSON object per line, produced as rows arrive
+    lines = (
+        AppointmentRead.model_validate(row).model_dump_json() + "\n"
+        for row in stream_appointments(db, *filters)
+    )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@router.get("/stats/appointments", response_model=List[DailyScheduleStats])
+def appointment_stats(
+    filters: tuple = Depends(stats_range), db: Session = Depends(get_read_db)
+):
+    # Per-(doctor, day) counts and booked minutes from the maintained rollup
+    return get_daily_summary(db, *filters)
 
 
-@app.post(
+@router.post(
     "/appointments", response_model=AppointmentRead, status_code=status.HTTP_201_CREATED
 )
 def create_appointment_endpoint(
@@ -86,15 +415,63 @@ def create_appointment_endpoint(
     try:
         return create_appointment(db, payload)
     except HTTPException as exc:
-        # propagate 409 for overlapping appointments
-        if exc.status_code == status.HTTP_409_CONFLICT:
-            raise exc
-        # otherwise raise 400 for other validation errors
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc.detail)
-        )
+        raise booking_error(exc)
+
+
+@router.post("/appointments/bulk", response_model=List[BulkItemResult])
+def create_appointments_bulk_endpoint(
+    payload: List[AppointmentCreate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: Session = Depends(get_db),
+):
+    # One result per submitted item, in order; conflicts do not fail the batch
+    return create_appointments_bulk(db, payload)
+
+
+@router.post(
+    "/appointments/recurring",
+    response_model=AppointmentSeriesResult,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_409_CONFLICT: {"model": AppointmentSeriesResult}},
+)
+def create_appointment_series_endpoint(
+    payload: AppointmentSeriesCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+):
+    # 409 carries the same per-occurrence report when nothing was booked
+    result = create_appointment_series(db, payload)
+    if not result["booked"]:
+        response.status_code = status.HTTP_409_CONFLICT
+    return result
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return {
+        "patients": patient_cache.stats(),
+        "doctors": doctor_cache.stats(),
+        "schedule_index": schedule_index.stats(),
+        "read_replicas": replicas.stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    # Prometheus text exposition format
+    body = metrics.render(
+        {"patients": patient_cache.stats(), "doctors": doctor_cache.stats()}
+    )
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
 
 
 @app.get("/health")
 async def health_check():
     return {"status": "UP"}
+
+
+if DB_MODE == "async":
+    from src.async_api import router as async_router
+
+    app.include_router(async_router)
+else:
+    app.include_router(router)
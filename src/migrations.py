@@ -0,0 +1,322 @@
+"""
+Creates or upgrades the database schema in place.
+
+    python -m src.migrations             # apply missing schema, then ANALYZE
+    python -m src.migrations --dry-run   # only report what is missing
+
+Installed, the same command is `patient-encounter-schema`. It connects to
+DATABASE_URL unless --url is given.
+
+Missing tables are created along with their indexes. Existing tables are
+only ever extended, never rebuilt or dropped, so the command is safe to
+run against a live database on every deploy. It adds missing indexes
+(matched by name), unique constraints (as unique indexes, which every
+backend can add without a rebuild) and columns that existing rows can do
+without. Changes that would need a table rebuild or a backfill, such as a
+NOT NULL column without a constant default, are reported as skipped, as is
+an index whose columns or expressions differ from the model's under the
+same name.
+Each change runs in its own transaction, so one failure (e.g. duplicate
+values under a new unique index) leaves the others applied.
+"""
+
+import argparse
+import logging
+import sys
+import warnings
+from typing import NamedTuple, Optional, Sequence
+
+from sqlalchemy import (
+    Column,
+    Engine,
+    Index,
+    MetaData,
+    Table,
+    UniqueConstraint,
+    inspect,
+    text,
+)
+from sqlalchemy.exc import SAWarning, SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+from src.models.model import Appointment, Base, DailyScheduleSummary
+from src.services.summary import rebuild_daily_summary
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaChange(NamedTuple):
+    kind: str  # "table", "column", "index", "unique" or "data"
+    table: str
+    name: str
+    # "missing" when planned, then "added", "skipped" or "failed"
+    status: str = "missing"
+    detail: str = ""
+
+    def __str__(self) -> str:
+        where = "" if self.kind == "table" else f" on {self.table}"
+        line = f"{self.status} {self.kind} {self.name}{where}"
+        return f"{line} ({self.detail})" if self.detail else line
+
+
+def _index_columns(engine: Engine, inspector, table: str) -> dict[str, tuple]:
+    """
+    The table's indexes by name, each with its key: column names in order,
+    None for each expression.
+    """
+    if engine.dialect.name == "sqlite":
+        # The inspector skips expression indexes on SQLite; sqlite_master
+        # lists them all and index_info gives their keys
+        quote = engine.dialect.identifier_preparer.quote
+        with engine.connect() as conn:
+            names = conn.scalars(
+                text(
+                    "SELECT name FROM sqlite_master"
+                    " WHERE type = 'index' AND tbl_name = :table"
+                ),
+                {"table": table},
+            ).all()
+            return {
+                name: tuple(
+                    row[2]
+                    for row in conn.exec_driver_sql(f"PRAGMA index_info({quote(name)})")
+                )
+                for name in names
+            }
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", SAWarning)
+        return {
+            ix["name"]: tuple(ix["column_names"]) for ix in inspector.get_indexes(table)
+        }
+
+
+def _index_key(index: Index) -> tuple:
+    return tuple(e.name if isinstance(e, Column) else None for e in index.expressions)
+
+
+def _describe_key(key: tuple) -> str:
+    return ", ".join("<expression>" if name is None else name for name in key)
+
+
+def _unique_column_sets(inspector, table: str) -> set[frozenset]:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", SAWarning)
+        found = {
+            frozenset(uq["column_names"])
+            for uq in inspector.get_unique_constraints(table)
+        }
+        found.update(
+            frozenset(ix["column_names"])
+            for ix in inspector.get_indexes(table)
+            if ix["unique"] and None not in ix["column_names"]
+        )
+    return found
+
+
+def _unique_sets(table: Table) -> list[tuple[str, ...]]:
+    # Includes the constraints Column(unique=True) generates
+    return [
+        tuple(c.name for c in constraint.columns)
+        for constraint in table.constraints
+        if isinstance(constraint, UniqueConstraint)
+    ]
+
+
+def _column_skip_reason(column: Column) -> Optional[str]:
+    """Why ADD COLUMN cannot add `column` to a table with rows, if it can't."""
+    if column.primary_key:
+        return "primary key column needs a table rebuild"
+    if column.nullable:
+        return None
+    default = column.server_default
+    if default is not None and isinstance(
+        getattr(default, "arg", None), (str, TextClause)
+    ):
+        return None
+    return "NOT NULL without a constant server default needs a backfill"
+
+
+def plan_upgrade(
+    engine: Engine, metadata: MetaData = Base.metadata
+) -> list[SchemaChange]:
+    """Lists what the database lacks compared to `metadata`, changing nothing."""
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    changes: list[SchemaChange] = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing:
+            changes.append(SchemaChange("table", table.name, table.name))
+            continue
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                reason = _column_skip_reason(column)
+                changes.append(
+                    SchemaChange(
+                        "column",
+                        table.name,
+                        column.name,
+                        "skipped" if reason else "missing",
+                        reason or "",
+                    )
+                )
+        indexes = _index_columns(engine, inspector, table.name)
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            if index.name not in indexes:
+                changes.append(SchemaChange("index", table.name, index.name))
+            elif indexes[index.name] != _index_key(index):
+                # Rebuilding a live index is left to the operator
+                changes.append(
+                    SchemaChange(
+                        "index",
+                        table.name,
+                        index.name,
+                        "skipped",
+                        f"has ({_describe_key(indexes[index.name])}), model has"
+                        f" ({_describe_key(_index_key(index))}); drop it to"
+                        " have it recreated",
+                    )
+                )
+        unique = _unique_column_sets(inspector, table.name)
+        for names in _unique_sets(table):
+            if frozenset(names) not in unique:
+                changes.append(
+                    SchemaChange(
+                        "unique", table.name, f"uq_{table.name}_{'_'.join(names)}"
+                    )
+                )
+    return changes
+
+
+def _apply(conn, metadata: MetaData, change: SchemaChange) -> None:
+    table = metadata.tables[change.table]
+    preparer = conn.dialect.identifier_preparer
+    if change.kind == "table":
+        table.create(conn)
+    elif change.kind == "column":
+        spec = conn.dialect.ddl_compiler(conn.dialect, None).get_column_specification(
+            table.c[change.name]
+        )
+        conn.execute(
+            text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {spec}")
+        )
+    elif change.kind == "index":
+        next(ix for ix in table.indexes if ix.name == change.name).create(conn)
+    elif change.kind == "unique":
+        columns = next(
+            names
+            for names in _unique_sets(table)
+            if change.name == f"uq_{table.name}_{'_'.join(names)}"
+        )
+        # Built as text: an Index() over table columns would attach itself
+        # to the shared metadata
+        conn.execute(
+            text(
+                f"CREATE UNIQUE INDEX {preparer.quote(change.name)}"
+                f" ON {preparer.format_table(table)}"
+                f" ({', '.join(preparer.quote(c) for c in columns)})"
+            )
+        )
+
+
+def analyze(engine: Engine) -> bool:
+    """Refreshes the query planner's statistics; False if not supported."""
+    dialect = engine.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        statement = "ANALYZE"
+    elif dialect in ("mysql", "mariadb"):
+        tables = ", ".join(
+            engine.dialect.identifier_preparer.quote(name)
+            for name in inspect(engine).get_table_names()
+        )
+        statement = f"ANALYZE TABLE {tables}"
+    else:
+        return False
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(statement))
+    return True
+
+
+def upgrade_schema(
+    engine: Engine, metadata: MetaData = Base.metadata, run_analyze: bool = True
+) -> list[SchemaChange]:
+    """
+    Applies plan_upgrade() and returns every planned change with its outcome.
+    A newly created schedule rollup is rebuilt from existing appointments.
+    Runs ANALYZE afterwards when anything was added.
+    """
+    results: list[SchemaChange] = []
+    for change in plan_upgrade(engine, metadata):
+        if change.status == "skipped":
+            results.append(change)
+            continue
+        try:
+            with engine.begin() as conn:
+                _apply(conn, metadata, change)
+        except SQLAlchemyError as exc:
+            logger.warning("Could not add %s: %s", change, exc)
+            # Only DBAPI errors wrap a driver exception; compile errors don't
+            detail = str(getattr(exc, "orig", None) or exc)
+            results.append(change._replace(status="failed", detail=detail))
+        else:
+            results.append(change._replace(status="added"))
+
+    created = {c.name for c in results if c.kind == "table" and c.status == "added"}
+    summary = DailyScheduleSummary.__tablename__
+    if summary in created and Appointment.__tablename__ not in created:
+        # A rollup added next to existing appointments starts out empty
+        with Session(engine) as db:
+            rows = rebuild_daily_summary(db)
+        results.append(
+            SchemaChange(
+                "data", summary, "rebuild_daily_summary", "added", f"{rows} rows"
+            )
+        )
+
+    if run_analyze and any(c.status == "added" for c in results):
+        analyze(engine)
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Create or upgrade the database schema"
+    )
+    parser.add_argument("--url", help="database URL (default: DATABASE_URL)")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="report missing schema without changing it",
+    )
+    parser.add_argument(
+        "--no-analyze", action="store_true", help="skip ANALYZE after adding schema"
+    )
+    parser.add_argument(
+        "--analyze", action="store_true", help="run ANALYZE even if nothing was added"
+    )
+    args = parser.parse_args(argv)
+
+    from src.database import build_engine, get_engine
+
+    engine = build_engine(args.url) if args.url else get_engine()
+    try:
+        if args.dry_run:
+            changes = plan_upgrade(engine)
+        else:
+            changes = upgrade_schema(engine, run_analyze=False)
+        for change in changes:
+            print(change)
+        if not changes:
+            print("schema is up to date")
+        added = any(c.status == "added" for c in changes)
+        if not args.dry_run and (args.analyze or (added and not args.no_analyze)):
+            if analyze(engine):
+                print("analyzed")
+    finally:
+        engine.dispose()
+    return 1 if any(c.status == "failed" for c in changes) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
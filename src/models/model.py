@@ -1,9 +1,11 @@
 from sqlalchemy import (
+    Date,
     DateTime,
     Boolean,
     String,
     Integer,
     ForeignKey,
+    Index,
 )
 from sqlalchemy.orm import (
     DeclarativeBase,
@@ -11,9 +13,9 @@ from sqlalchemy.orm import (
     mapped_column,
     relationship,
 )
-from sqlalchemy.sql import func
-from datetime import datetime
-from src.database import engine
+from sqlalchemy.sql import func, literal_column
+from datetime import date, datetime
+from typing import Optional
 
 
 class Base(DeclarativeBase):
@@ -31,7 +33,7 @@ class Patient(Base):
     fname: Mapped[str] = mapped_column(String(100), nullable=False)
     lname: Mapped[str] = mapped_column(String(100), nullable=False)
     email: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
-    ph_no: Mapped[int] = mapped_column(String(100))
+    ph_no: Mapped[Optional[str]] = mapped_column(String(100))
     age: Mapped[int] = mapped_column(nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -47,10 +49,39 @@ class Patient(Base):
 
     # One-to-many relationship: one patient -> many appointments
     appointments: Mapped[list["Appointment"]] = relationship(
-        back_populates="patient", cascade="all, delete-orphan"
+        back_populates="patient",
+        cascade="all, delete-orphan",
+        order_by="(Appointment.start_time, Appointment.id)",
     )
 
 
+# Characters ignored when comparing phone numbers, e.g. "+1 (555) 010-2030"
+PHONE_SEPARATORS = " -().+/"
+
+
+def normalized_phone(column):
+    """
+    SQL expression for `column` with PHONE_SEPARATORS removed. Separators are
+    rendered as literals, not bound parameters, so a query using this
+    expression matches the ix_patients_phone index expression exactly.
+    """
+    expr = column
+    for char in PHONE_SEPARATORS:
+        expr = func.replace(expr, literal_column(f"'{char}'"), literal_column("''"))
+    return expr
+
+
+# Front-desk search (queries.search_patients): case-insensitive name
+# prefixes in (last, first, id) order, and phone lookups without separators
+Index(
+    "ix_patients_name",
+    func.lower(Patient.lname),
+    func.lower(Patient.fname),
+    Patient.id,
+)
+Index("ix_patients_phone", normalized_phone(Patient.ph_no), Patient.id)
+
+
 class Doctor(Base):
     """
     Represents a doctor in the hospital.
@@ -68,7 +99,10 @@ class Doctor(Base):
         nullable=False,
     )
 
-    appointments: Mapped[list["Appointment"]] = relationship(back_populates="doctor")
+    appointments: Mapped[list["Appointment"]] = relationship(
+        back_populates="doctor",
+        order_by="(Appointment.start_time, Appointment.id)",
+    )
 
 
 class Appointment(Base):
@@ -77,6 +111,19 @@ class Appointment(Base):
     """
 
     __tablename__ = "umar_appointments_table"
+    __table_args__ = (
+        # Per-doctor range scans: overlap windows and doctor-filtered listings.
+        # Carrying duration makes the overlap lookup an index-only scan.
+        Index(
+            "ix_appointments_doctor_start_duration",
+            "doctor_id",
+            "start_time",
+            "duration",
+        ),
+        # Patient timelines, newest first (queries.get_patient_appointments).
+        # The trailing id orders ties for the keyset on every backend.
+        Index("ix_appointments_patient_start_id", "patient_id", "start_time", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     patient_id: Mapped[int] = mapped_column(ForeignKey("umar_patients_table.id"))
@@ -90,9 +137,29 @@ class Appointment(Base):
     doctor: Mapped[Doctor] = relationship(back_populates="appointments")
 
 
+class DailyScheduleSummary(Base):
+    """
+    Per-doctor, per-day (UTC) rollup of bookings, kept in step with the
+    appointments table by the booking paths in src.services.queries.
+    """
+
+    __tablename__ = "umar_daily_schedule_summary"
+
+    doctor_id: Mapped[int] = mapped_column(
+        ForeignKey("umar_doctors_table.id"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    appointments: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    booked_minutes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Bumped on every booking into the day; feeds listing ETags
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
+
 if __name__ == "__main__":
+    from src.database import get_engine
+
     try:
-        Base.metadata.create_all(engine)
+        Base.metadata.create_all(get_engine())
         print("Executed")
     except Exception as e:
         print(e)
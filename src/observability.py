@@ -0,0 +1,289 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from typing import Optional
+import logging
+import os
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Set METRICS_ENABLED=false to skip all per-request bookkeeping
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Requests slower than this (milliseconds) are logged with their SQL; unset disables
+SLOW_REQUEST_MS = os.getenv("SLOW_REQUEST_MS")
+
+# Level of the app's own `src.*` loggers when nothing else configures logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def configure_logging() -> None:
+    """
+    Gives the `src` loggers a stderr handler at LOG_LEVEL, formatted like
+    uvicorn's own lines. uvicorn only configures its own loggers, so the
+    startup INFO lines (engine settings, schedule index) would otherwise be
+    dropped. Leaves logging alone when the root logger or `src` already has
+    handlers, i.e. when the deployment configures logging itself.
+    """
+    app_logger = logging.getLogger("src")
+    if app_logger.handlers or logging.getLogger().handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(levelname)s:     %(name)s: %(message)s"))
+    app_logger.addHandler(handler)
+    app_logger.setLevel(LOG_LEVEL)
+    app_logger.propagate = False
+
+
+class Histogram:
+    """Fixed-bucket histogram in the shape Prometheus expects."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        # One slot per bucket plus the implicit +Inf bucket
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[int]:
+        total, out = 0, []
+        for n in self.counts:
+            total += n
+            out.append(total)
+        return out
+
+
+class RequestStats:
+    """SQL work done on behalf of one request."""
+
+    __slots__ = ("queries", "rows", "db_seconds", "statements")
+
+    def __init__(self, capture: bool):
+        self.queries = 0
+        self.rows = 0
+        self.db_seconds = 0.0
+        # (statement, seconds) pairs, only kept when the slow log is on
+        self.statements: Optional[list] = [] if capture else None
+
+
+# The stats object is shared (not copied) with threadpool workers and
+# greenlets, so their SQL is attributed to the request that spawned them.
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Metrics:
+    """Process-wide counters, rendered in the Prometheus text format."""
+
+    def __init__(self, enabled: bool, slow_request_ms: Optional[float]):
+        self.enabled = enabled
+        self.slow_request_ms = slow_request_ms
+        self._lock = Lock()
+        self._requests: dict[tuple, int] = {}
+        self._latency: dict[tuple, Histogram] = {}
+        self._sql: dict[tuple, list] = {}
+
+    def record(
+        self, method: str, route: str, status: int, seconds: float, stats: RequestStats
+    ) -> None:
+        key = (method, route)
+        with self._lock:
+            status_key = (method, route, status)
+            self._requests[status_key] = self._requests.get(status_key, 0) + 1
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = Histogram()
+            histogram.observe(seconds)
+            sql = self._sql.setdefault(key, [0, 0, 0.0])
+            sql[0] += stats.queries
+            sql[1] += stats.rows
+            sql[2] += stats.db_seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests.clear()
+            self._latency.clear()
+            self._sql.clear()
+
+    def render(self, caches: dict) -> str:
+        lines = []
+        with self._lock:
+            lines += [
+                "# HELP http_requests_total Requests served.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status), n in sorted(self._requests.items()):
+                labels = f'method="{method}",route="{route}",status="{status}"'
+                lines.append(f"http_requests_total{{{labels}}} {n}")
+
+            lines += [
+                "# HELP http_request_duration_seconds Request latency.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), histogram in sorted(self._latency.items()):
+                labels = f'method="{method}",route="{route}"'
+                bounds = [str(b) for b in LATENCY_BUCKETS] + ["+Inf"]
+                for le, n in zip(bounds, histogram.cumulative()):
+                    lines.append(
+                        f'http_request_duration_seconds_bucket{{{labels},le="{le}"}} {n}'
+                    )
+                lines.append(
+                    f"http_request_duration_seconds_sum{{{labels}}} {histogram.sum}"
+                )
+                lines.append(
+                    f"http_request_duration_seconds_count{{{labels}}} {histogram.count}"
+                )
+
+            for index, (name, help_text) in enumerate(
+                (
+                    ("db_queries_total", "SQL statements executed."),
+                    ("db_rows_total", "Rows fetched or affected."),
+                    ("db_seconds_total", "Time spent executing SQL."),
+                )
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (method, route), sql in sorted(self._sql.items()):
+                    labels = f'method="{method}",route="{route}"'
+                    lines.append(f"{name}{{{labels}}} {sql[index]}")
+
+        for name, kind, help_text in (
+            ("hits", "counter", "Read-through cache hits."),
+            ("misses", "counter", "Read-through cache misses."),
+            ("evictions", "counter", "Entries dropped for space or age."),
+            ("size", "gauge", "Entries currently cached."),
+        ):
+            metric = f"cache_{name}_total" if kind == "counter" else f"cache_{name}"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            for cache_name, stats in sorted(caches.items()):
+                lines.append(f'{metric}{{cache="{cache_name}"}} {stats[name]}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics(
+    enabled=METRICS_ENABLED,
+    slow_request_ms=float(SLOW_REQUEST_MS) if SLOW_REQUEST_MS else None,
+)
+
+
+class _CountingCursor:
+    """Wraps a DBAPI cursor and adds the rows it hands out to `stats.rows`."""
+
+    __slots__ = ("_cursor", "_stats")
+
+    def __init__(self, cursor, stats: RequestStats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats.queries += 1
+    stats.db_seconds += elapsed
+    if stats.statements is not None:
+        stats.statements.append((statement, elapsed))
+    if cursor.description is None:
+        # DML: rowcount is reliable; nothing will be fetched
+        stats.rows += max(cursor.rowcount, 0)
+    elif context is not None:
+        # Results are built from context.cursor after this hook returns
+        context.cursor = _CountingCursor(cursor, stats)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every request and attributing its SQL to the
+    matched route template (e.g. /patients/{id}) rather than the raw path.
+    """
+
+    def __init__(self, app, registry: Metrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        registry = self.registry
+        if scope["type"] != "http" or not registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(capture=registry.slow_request_ms is not None)
+        token = _current.set(stats)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            registry.record(scope["method"], path, status, elapsed, stats)
+            threshold = registry.slow_request_ms
+            if threshold is not None and elapsed * 1000 >= threshold:
+                _log_slow_request(scope["method"], scope["path"], elapsed, stats)
+
+
+def _log_slow_request(method: str, path: str, elapsed: float, stats: RequestStats):
+    statements = "\n".join(
+        f"  {seconds * 1000:.2f} ms  {' '.join(statement.split())}"
+        for statement, seconds in stats.statements or ()
+    )
+    logger.warning(
+        "Slow request %s %s: %.1f ms, %d queries, %d rows, %.1f ms in SQL\n%s",
+        method,
+        path,
+        elapsed * 1000,
+        stats.queries,
+        stats.rows,
+        stats.db_seconds * 1000,
+        statements,
+    )
@@ -0,0 +1,297 @@
+"""
+Read-replica routing.
+
+With REPLICA_DATABASE_URLS set (comma-separated), the read-only endpoints
+take their session from get_read_db / get_async_read_db instead of the
+primary's get_db / get_async_db, so tests overriding one need to override
+the other too. Each read goes to the next healthy replica, round robin.
+Writes, and every read while no replica is healthy, stay on the primary.
+
+A replica is checked with `SELECT 1` at most every REPLICA_HEALTH_INTERVAL
+seconds, on the first read routed to it after that interval. One that fails,
+or whose connection fails during a read, is skipped until its next check.
+
+Replicas lag the primary, so a client may not see its own write on the
+next read. READ_YOUR_WRITES_SECONDS > 0 opts into a window: a successful
+write sets a short-lived cookie, and the reads of a client presenting it
+go to the primary until the window has passed.
+"""
+
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+from typing import AsyncGenerator, Generator, Optional, Sequence
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.database import (
+    build_async_sessionmaker,
+    build_engine,
+    get_async_sessionmaker,
+    get_sessionmaker,
+    to_async_url,
+)
+
+logger = logging.getLogger(__name__)
+
+REPLICA_DATABASE_URLS = [
+    url.strip()
+    for url in os.getenv("REPLICA_DATABASE_URLS", "").split(",")
+    if url.strip()
+]
+# Seconds between health checks of each replica
+REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", "5"))
+# Seconds after a client's write during which its reads use the primary;
+# 0 disables the window
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "0"))
+READ_YOUR_WRITES_COOKIE = "last_write"
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class Replica:
+    """One replica URL; its engines are created on first use."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.healthy = True
+        self.checked_at: Optional[float] = None
+        self._engine: Optional[Engine] = None
+        self._sessionmaker: Optional[sessionmaker] = None
+        self._async_sessionmaker = None
+        self._async_engine = None
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    engine = build_engine(self.url)
+                    self._sessionmaker = sessionmaker(bind=engine)
+                    self._engine = engine
+        return self._engine
+
+    @property
+    def sessionmaker(self) -> sessionmaker:
+        self.engine
+        return self._sessionmaker
+
+    @property
+    def async_sessionmaker(self):
+        if self._async_sessionmaker is None:
+            factory = build_async_sessionmaker(to_async_url(self.url))
+            self._async_engine = factory.kw["bind"]
+            self._async_sessionmaker = factory
+        return self._async_sessionmaker
+
+    def dispose(self) -> None:
+        if self._engine is not None:
+            self._engine.dispose()
+
+    async def dispose_async(self) -> None:
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+
+
+class ReplicaSet:
+    """Round-robin over the healthy replicas of REPLICA_DATABASE_URLS."""
+
+    def __init__(
+        self,
+        urls: Sequence[str] = REPLICA_DATABASE_URLS,
+        health_interval: float = REPLICA_HEALTH_INTERVAL,
+        read_your_writes: float = READ_YOUR_WRITES_SECONDS,
+    ):
+        self.replicas = [Replica(url) for url in urls]
+        self.health_interval = health_interval
+        self.read_your_writes = read_your_writes
+        self._turn = itertools.count()
+        self.reads = {replica.url: 0 for replica in self.replicas}
+        self.primary_reads = 0
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def _rotation(self) -> list[Replica]:
+        start = next(self._turn) % len(self.replicas)
+        return self.replicas[start:] + self.replicas[:start]
+
+    def _due(self, replica: Replica, now: float) -> bool:
+        return replica.checked_at is None or (
+            now - replica.checked_at >= self.health_interval
+        )
+
+    def _record(self, replica: Replica, healthy: bool, error=None) -> None:
+        if healthy != replica.healthy:
+            if healthy:
+                logger.info("Replica %s is back", replica.url)
+            else:
+                logger.warning("Replica %s is down: %s", replica.url, error)
+        replica.healthy = healthy
+        replica.checked_at = time.monotonic()
+
+    def check(self, replica: Replica) -> bool:
+        try:
+            with replica.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except SQLAlchemyError as exc:
+            self._record(replica, False, exc)
+        else:
+            self._record(replica, True)
+        return replica.healthy
+
+    async def check_async(self, replica: Replica) -> bool:
+        try:
+            async with replica.async_sessionmaker() as db:
+                await db.execute(text("SELECT 1"))
+        except SQLAlchemyError as exc:
+            self._record(replica, False, exc)
+        else:
+            self._record(replica, True)
+        return replica.healthy
+
+    def mark_down(self, replica: Replica, error) -> None:
+        self._record(replica, False, error)
+
+    def pinned(self, request: Request) -> bool:
+        """Whether the client wrote within the read-your-writes window."""
+        if self.read_your_writes <= 0:
+            return False
+        try:
+            written = float(request.cookies[READ_YOUR_WRITES_COOKIE])
+        except (KeyError, ValueError):
+            return False
+        return time.time() - written < self.read_your_writes
+
+    def pick(self, request: Optional[Request] = None) -> Optional[Replica]:
+        """The replica for the next read, or None to read from the primary."""
+        if self.replicas and not (request is not None and self.pinned(request)):
+            now = time.monotonic()
+            for replica in self._rotation():
+                if self._due(replica, now):
+                    self.check(replica)
+                if replica.healthy:
+                    self.reads[replica.url] += 1
+                    return replica
+        self.primary_reads += 1
+        return None
+
+    async def pick_async(self, request: Optional[Request] = None) -> Optional[Replica]:
+        if self.replicas and not (request is not None and self.pinned(request)):
+            now = time.monotonic()
+            for replica in self._rotation():
+                if self._due(replica, now):
+                    await self.check_async(replica)
+                if replica.healthy:
+                    self.reads[replica.url] += 1
+                    return replica
+        self.primary_reads += 1
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "primary_reads": self.primary_reads,
+            "replicas": [
+                {
+                    "url": make_url(replica.url).render_as_string(hide_password=True),
+                    "healthy": replica.healthy,
+                    "reads": self.reads[replica.url],
+                }
+                for replica in self.replicas
+            ],
+        }
+
+    def dispose(self) -> None:
+        for replica in self.replicas:
+            replica.dispose()
+
+    async def dispose_async(self) -> None:
+        for replica in self.replicas:
+            await replica.dispose_async()
+
+
+replicas = ReplicaSet()
+
+
+def _lost(replica: Replica, exc: DBAPIError) -> None:
+    # A lost connection takes the replica out until its next check; query
+    # errors are the query's problem
+    if exc.connection_invalidated:
+        replicas.mark_down(replica, exc)
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Session for read-only endpoints: on the replica picked for the read, or
+    on the primary, as get_db's, when none is. Only that session is opened.
+    """
+    replica = replicas.pick(request)
+    session = replica.sessionmaker() if replica else get_sessionmaker()()
+    try:
+        yield session
+    except DBAPIError as exc:
+        if replica is not None:
+            _lost(replica, exc)
+        raise
+    finally:
+        session.close()
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator:
+    """The same for the async endpoints."""
+    replica = await replicas.pick_async(request)
+    factory = replica.async_sessionmaker if replica else get_async_sessionmaker()
+    async with factory() as session:
+        try:
+            yield session
+        except DBAPIError as exc:
+            if replica is not None:
+                _lost(replica, exc)
+            raise
+
+
+class ReadYourWritesMiddleware:
+    """
+    Stamps successful writes with the READ_YOUR_WRITES_COOKIE cookie that
+    pins the client's reads to the primary for the window. Passes everything
+    through untouched while the window is off or no replica is configured.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        window = replicas.read_your_writes
+        if (
+            scope["type"] != "http"
+            or window <= 0
+            or not replicas.replicas
+            or scope["method"] in READ_METHODS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = (
+                    f"{READ_YOUR_WRITES_COOKIE}={time.time():.3f}; "
+                    f"Max-Age={math.ceil(window)}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"set-cookie", cookie.encode("latin-1")),
+                    ],
+                }
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
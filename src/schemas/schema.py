@@ -7,8 +7,13 @@ from pydantic import (
     Field,
     constr,
 )
-from datetime import datetime, timezone
-from typing import Optional
+from datetime import date, datetime, timezone
+from typing import List, Literal, Optional
+
+# Appointment length bounds (minutes). The overlap checks only look back
+# MAX_APPOINTMENT_DURATION minutes, so every booking path must enforce it.
+MIN_APPOINTMENT_DURATION = 15
+MAX_APPOINTMENT_DURATION = 180
 
 
 class AppointmentCreate(BaseModel):
@@ -16,7 +21,7 @@ class AppointmentCreate(BaseModel):
     doctor_id: PositiveInt
     reason: Optional[str] = None
     start_time: datetime
-    duration: int = Field(ge=15, le=180)
+    duration: int = Field(ge=MIN_APPOINTMENT_DURATION, le=MAX_APPOINTMENT_DURATION)
 
     @field_validator("start_time")
     @classmethod
@@ -32,18 +37,95 @@ class AppointmentCreate(BaseModel):
         return self
 
 
+# Longest recurring series accepted in one request
+MAX_SERIES_OCCURRENCES = 366
+
+
+class AppointmentSeriesCreate(AppointmentCreate):
+    freq: Literal["daily", "weekly"]
+    interval: int = Field(1, ge=1, le=52)
+    count: Optional[int] = Field(None, ge=1, le=MAX_SERIES_OCCURRENCES)
+    until: Optional[date] = None
+    # 0 = Monday ... 6 = Sunday; weekly series only
+    weekdays: Optional[List[int]] = None
+    # Book the free occurrences and report the rest, instead of all-or-nothing
+    skip_conflicts: bool = False
+
+    @field_validator("weekdays")
+    @classmethod
+    def weekdays_must_be_valid(cls, value: Optional[List[int]]):
+        if value is not None and (not value or not all(0 <= d <= 6 for d in value)):
+            raise ValueError("weekdays must be a non-empty list of 0 (Mon) to 6 (Sun)")
+        return value
+
+    @model_validator(mode="after")
+    def series_must_be_bounded(self):
+        if (self.count is None) == (self.until is None):
+            raise ValueError("exactly one of count or until is required")
+        if self.weekdays is not None and self.freq != "weekly":
+            raise ValueError("weekdays only apply to weekly series")
+        return self
+
+
+class SeriesOccurrence(BaseModel):
+    index: int
+    start_time: datetime
+    # "available": free, but not booked because the series was rejected
+    status: Literal["created", "conflict", "available"]
+    id: Optional[PositiveInt] = None
+    detail: Optional[str] = None
+
+
+class AppointmentSeriesResult(BaseModel):
+    patient_id: PositiveInt
+    doctor_id: PositiveInt
+    duration: int
+    booked: int
+    conflicts: int
+    occurrences: List[SeriesOccurrence]
+
+
 class AppointmentRead(BaseModel):
     id: PositiveInt
     patient_id: PositiveInt
     doctor_id: PositiveInt
     reason: Optional[str]
     start_time: datetime
-    duration: int = Field(ge=15, le=180)
+    duration: int = Field(ge=MIN_APPOINTMENT_DURATION, le=MAX_APPOINTMENT_DURATION)
+
+    class Config:
+        from_attributes = True
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: Literal["created", "conflict", "duplicate"]
+    id: Optional[PositiveInt] = None
+    detail: Optional[str] = None
+
+
+class DailyScheduleStats(BaseModel):
+    doctor_id: PositiveInt
+    day: date
+    appointments: int
+    booked_minutes: int
 
     class Config:
         from_attributes = True
 
 
+class AvailabilitySlot(BaseModel):
+    start_time: datetime
+    end_time: datetime
+
+
+class DoctorAvailability(BaseModel):
+    doctor_id: PositiveInt
+    day: date
+    duration: int
+    slots: List[AvailabilitySlot]
+
+
 class PatientCreate(BaseModel):
     fname: str
     lname: str
@@ -66,10 +148,11 @@ class PatientRead(BaseModel):
         from_attributes = True
 
 
-"""
 class PatientReadWithAppointments(PatientRead):
+    # The most recent appointments, oldest first; appointments_next pages
+    # back through any older ones
     appointments: List[AppointmentRead] = []
-"""
+    appointments_next: Optional[str] = None
 
 
 class DoctorCreate(BaseModel):
@@ -89,7 +172,13 @@ class DoctorRead(BaseModel):
         from_attributes = True
 
 
-"""
 class DoctorReadWithAppointments(DoctorRead):
+    # The most recent appointments, oldest first; the full schedule is paged
+    # through /appointments?doctor_id=
     appointments: List[AppointmentRead] = []
-"""
+
+
+class AppointmentReadExpanded(AppointmentRead):
+    # Present only when requested through ?expand=
+    patient: Optional[PatientRead] = None
+    doctor: Optional[DoctorRead] = None
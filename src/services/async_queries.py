@@ -0,0 +1,294 @@
+"""
+Async counterparts of src.services.queries for DB_MODE=async.
+
+Each function drives the synchronous implementation through
+AsyncSession.run_sync, so SQL and business rules live in one place while
+database I/O goes through the async driver without blocking the event loop.
+Retry back-off uses asyncio.sleep instead of time.sleep.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.models.model import Patient, Doctor, Appointment
+from src.services import queries, summary
+from src.services.cache import JSONEntry, doctor_cache, patient_cache
+from src.services.group_commit import AsyncGroupCommitter
+from datetime import date, datetime
+from datetime import time as time_of_day
+from typing import AsyncIterator, Optional, List, Sequence
+import asyncio
+
+
+async def create_patient(db: AsyncSession, patient_data) -> Patient:
+    row = patient_data.model_dump()
+    if patient_writes.enabled:
+        return await patient_writes.submit(db, row)
+    return await db.run_sync(queries.insert_patient, row)
+
+
+async def get_patient(db: AsyncSession, patient_id: int) -> Patient | None:
+    return await db.get(Patient, patient_id)
+
+
+async def get_patient_json(db: AsyncSession, patient_id: int) -> JSONEntry | None:
+    entry = patient_cache.get(patient_id)
+    if entry is None:
+        entry = await db.run_sync(queries.load_patient_json, patient_id)
+        if entry is not None:
+            patient_cache.set(patient_id, entry)
+    return entry
+
+
+async def load_patient_expanded_json(
+    db: AsyncSession, patient_id: int
+) -> JSONEntry | None:
+    return await db.run_sync(queries.load_patient_expanded_json, patient_id)
+
+
+async def search_patients(
+    db: AsyncSession, limit: int = 20, after: Optional[tuple] = None, **search
+) -> tuple[List[Patient], Optional[tuple]]:
+    return await db.run_sync(
+        queries.search_patients, **search, limit=limit, after=after
+    )
+
+
+async def create_patients_bulk(db: AsyncSession, items) -> list[dict]:
+    return await db.run_sync(queries.create_patients_bulk, items)
+
+
+async def create_doctor(db: AsyncSession, doctor_data) -> Doctor:
+    row = doctor_data.model_dump()
+    if doctor_writes.enabled:
+        return await doctor_writes.submit(db, row)
+    (doctor,) = await db.run_sync(queries.insert_doctors, [row])
+    return doctor
+
+
+async def get_doctor(db: AsyncSession, doctor_id: int) -> Doctor | None:
+    return await db.get(Doctor, doctor_id)
+
+
+async def get_doctor_json(db: AsyncSession, doctor_id: int) -> JSONEntry | None:
+    entry = doctor_cache.get(doctor_id)
+    if entry is None:
+        entry = await db.run_sync(queries.load_doctor_json, doctor_id)
+        if entry is not None:
+            doctor_cache.set(doctor_id, entry)
+    return entry
+
+
+async def load_doctor_expanded_json(
+    db: AsyncSession, doctor_id: int
+) -> JSONEntry | None:
+    return await db.run_sync(queries.load_doctor_expanded_json, doctor_id)
+
+
+async def create_doctors_bulk(db: AsyncSession, items) -> list[dict]:
+    return await db.run_sync(queries.create_doctors_bulk, items)
+
+
+async def _with_booking_retries(db: AsyncSession, book, *args):
+    for attempt in range(1, queries.BOOKING_ATTEMPTS + 1):
+        try:
+            return await db.run_sync(book, *args)
+        except queries.RETRYABLE_BOOKING_ERRORS as exc:
+            if not queries.is_retryable_booking_error(exc):
+                raise
+            await db.rollback()
+            if attempt == queries.BOOKING_ATTEMPTS:
+                raise queries.booking_retries_exhausted(exc)
+            await asyncio.sleep(queries.BOOKING_RETRY_BACKOFF * attempt)
+
+
+async def create_appointment(db: AsyncSession, appointment_data) -> Appointment:
+    row = queries.appointment_row(appointment_data)
+    if appointment_writes.enabled:
+        return await appointment_writes.submit(db, row)
+    return await _with_booking_retries(db, queries.book_appointment, row)
+
+
+async def _insert_patients(db: AsyncSession, rows: list[dict]) -> list:
+    return await db.run_sync(queries.insert_patients, rows)
+
+
+async def _insert_doctors(db: AsyncSession, rows: list[dict]) -> list:
+    return await db.run_sync(queries.insert_doctors, rows)
+
+
+async def _book_appointments(db: AsyncSession, rows: list[dict]) -> list:
+    results = await _with_booking_retries(db, queries.book_appointments_bulk, rows)
+    return queries.booking_outcomes(rows, results)
+
+
+# Group commit (GROUP_COMMIT_WINDOW_MS) for the single-row creates above
+patient_writes = AsyncGroupCommitter(_insert_patients)
+doctor_writes = AsyncGroupCommitter(_insert_doctors)
+appointment_writes = AsyncGroupCommitter(_book_appointments)
+
+
+async def create_appointments_bulk(db: AsyncSession, items) -> list[dict]:
+    rows = [queries.appointment_row(item) for item in items]
+    if not rows:
+        return []
+    return await _with_booking_retries(db, queries.book_appointments_bulk, rows)
+
+
+async def create_appointment_series(db: AsyncSession, series) -> dict:
+    occurrences = await _with_booking_retries(
+        db,
+        queries.book_appointment_series,
+        queries.series_rows(series),
+        series.skip_conflicts,
+    )
+    return queries.series_report(series, occurrences)
+
+
+async def get_daily_summary(
+    db: AsyncSession,
+    start_date: date,
+    end_date: date,
+    doctor_ids: Optional[Sequence[int]] = None,
+) -> list:
+    return await db.run_sync(
+        summary.get_daily_summary, start_date, end_date, doctor_ids
+    )
+
+
+async def schedule_etag(
+    db: AsyncSession,
+    start_date: date,
+    end_date: date,
+    doctor_ids: Optional[Sequence[int]] = None,
+    variant: str = "",
+) -> str:
+    return await db.run_sync(
+        summary.schedule_etag, start_date, end_date, doctor_ids, variant
+    )
+
+
+async def find_available_slots(
+    db: AsyncSession,
+    doctor_ids,
+    target_date: date,
+    duration: int,
+    day_start: time_of_day,
+    day_end: time_of_day,
+    step: int,
+) -> dict[int, list[tuple[datetime, datetime]]]:
+    return await db.run_sync(
+        queries.find_available_slots,
+        doctor_ids,
+        target_date,
+        duration,
+        day_start,
+        day_end,
+        step,
+    )
+
+
+async def get_bookable_doctor_ids(
+    db: AsyncSession,
+    doctor_ids: Optional[Sequence[int]] = None,
+    specialty: Optional[str] = None,
+) -> List[int]:
+    return await db.run_sync(queries.get_bookable_doctor_ids, doctor_ids, specialty)
+
+
+async def get_appointments_by_date(
+    db: AsyncSession, target_date: date
+) -> List[Appointment]:
+    return await db.run_sync(queries.get_appointments_by_date, target_date)
+
+
+async def get_appointments_by_date_and_doctor(
+    db: AsyncSession,
+    target_date: date,
+    doctor_id: Optional[int] = None,
+) -> List[Appointment]:
+    return await db.run_sync(
+        queries.get_appointments_by_date_and_doctor, target_date, doctor_id
+    )
+
+
+async def get_appointments_in_range(
+    db: AsyncSession,
+    start_date: date,
+    end_date: date,
+    doctor_ids: Optional[Sequence[int]] = None,
+    columns: bool = False,
+    expand: frozenset = frozenset(),
+) -> List[Appointment]:
+    return await db.run_sync(
+        queries.get_appointments_in_range,
+        start_date,
+        end_date,
+        doctor_ids,
+        columns,
+        expand,
+    )
+
+
+async def get_appointments_page(
+    db: AsyncSession,
+    start_date: date,
+    end_date: date,
+    doctor_ids: Optional[Sequence[int]] = None,
+    limit: int = 100,
+    after: Optional[tuple[datetime, int]] = None,
+    columns: bool = False,
+    expand: frozenset = frozenset(),
+) -> tuple[List[Appointment], Optional[tuple[datetime, int]]]:
+    return await db.run_sync(
+        queries.get_appointments_page,
+        start_date,
+        end_date,
+        doctor_ids,
+        limit,
+        after,
+        columns,
+        expand,
+    )
+
+
+async def get_patient_appointments(
+    db: AsyncSession,
+    patient_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 100,
+    before: Optional[tuple[datetime, int]] = None,
+    columns: bool = False,
+) -> tuple[List[Appointment], Optional[tuple[datetime, int]]]:
+    return await db.run_sync(
+        queries.get_patient_appointments,
+        patient_id,
+        start_date,
+        end_date,
+        limit,
+        before,
+        columns,
+    )
+
+
+async def stream_appointments(
+    db: AsyncSession,
+    start_date: date,
+    end_date: date,
+    doctor_ids: Optional[Sequence[int]] = None,
+    batch_size: int = 1000,
+    columns: bool = False,
+) -> AsyncIterator:
+    """
+    Async variant of queries.stream_appointments over AsyncSession.stream.
+    With columns=True it yields lists of up to batch_size row tuples.
+    """
+    stmt = queries.stream_appointments_statement(
+        start_date, end_date, doctor_ids, batch_size
+    )
+    result = await db.stream(stmt)
+    if columns:
+        async for batch in result.partitions():
+            yield batch
+        return
+    async for row in result.mappings():
+        yield row
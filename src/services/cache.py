@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from datetime import datetime
+from hashlib import blake2b
+from threading import Lock
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+import os
+import time
+
+
+class JSONEntry(NamedTuple):
+    """A serialized read model with its HTTP validators."""
+
+    body: bytes
+    etag: str
+    last_modified: datetime
+
+
+def json_entry(body: bytes, last_modified: Optional[datetime] = None) -> JSONEntry:
+    """
+    Wraps a serialized body with a strong ETag derived from its bytes. The
+    read models embed their timestamps, so the tag changes whenever
+    updated_at does, as well as on any other change to the payload.
+    """
+    return JSONEntry(
+        body, f'"{blake2b(body, digest_size=12).hexdigest()}"', last_modified
+    )
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries also expire after `ttl` seconds.
+
+    Thread-safe; a maxsize of 0 disables caching. Keeps hit, miss and
+    eviction counters for monitoring.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._data[key]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(
+        self, key: Hashable, load: Callable[[], Optional[Any]]
+    ) -> Optional[Any]:
+        """Returns the cached value, or calls load() and caches a non-None result."""
+        value = self.get(key)
+        if value is None:
+            value = load()
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Serialized PatientRead/DoctorRead JSON (JSONEntry) keyed by id. Doctors rarely change,
+# so they live longer; patients get a short TTL as a safety net for writes
+# made outside this process.
+patient_cache = TTLCache(
+    maxsize=int(os.getenv("PATIENT_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("PATIENT_CACHE_TTL", "30")),
+)
+doctor_cache = TTLCache(
+    maxsize=int(os.getenv("DOCTOR_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("DOCTOR_CACHE_TTL", "300")),
+)
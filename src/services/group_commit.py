@@ -0,0 +1,151 @@
+"""
+Group commit for single-row creates.
+
+With GROUP_COMMIT_WINDOW_MS set, concurrent POST /patients, /doctors and
+/appointments requests are coalesced: the first request to arrive opens a
+batch and waits up to the window for others to join, then writes the whole
+batch in one transaction, one commit and (on SQLite) one fsync. Every
+caller still gets its own result: its new row, or its own error (a
+duplicate email, an overlapping appointment) exactly as if it had been
+written alone, in arrival order.
+
+The window adds up to that much latency to a lone request, so it only pays
+off when commits, not CPU, bound write throughput.
+"""
+
+import asyncio
+import os
+import threading
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session
+
+# Milliseconds a batch stays open for more requests; 0 disables batching
+GROUP_COMMIT_WINDOW_MS = float(os.getenv("GROUP_COMMIT_WINDOW_MS", "0"))
+# A full batch is written at once instead of waiting out the window
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "64"))
+
+# run_batch(db, items) writes and commits items, returning one outcome per
+# item: the caller's result, or an exception to raise in that caller
+BatchRunner = Callable[[Session, list], list]
+
+
+class _Batch:
+    def __init__(self, full, done):
+        self.items: list = []
+        self.outcomes: list = []
+        self.full = full
+        self.done = done
+
+
+def _outcome(batch: _Batch, index: int) -> Any:
+    outcome = batch.outcomes[index]
+    if isinstance(outcome, BaseException):
+        raise outcome
+    return outcome
+
+
+class _Committer:
+    def __init__(
+        self,
+        run_batch: BatchRunner,
+        window_ms: float = GROUP_COMMIT_WINDOW_MS,
+        max_batch: int = GROUP_COMMIT_MAX_BATCH,
+    ):
+        self.run_batch = run_batch
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._open: _Batch | None = None
+        self.batches = 0
+        self.items = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def _join(self, item, new_batch) -> tuple[_Batch, int, bool]:
+        """Adds item to the open batch, opening one (as leader) if needed."""
+        batch = self._open
+        leader = batch is None
+        if leader:
+            batch = self._open = new_batch()
+        batch.items.append(item)
+        if len(batch.items) >= self.max_batch:
+            self._open = None
+            batch.full.set()
+        return batch, len(batch.items) - 1, leader
+
+    def _close(self, batch: _Batch) -> None:
+        if self._open is batch:
+            self._open = None
+        self.batches += 1
+        self.items += len(batch.items)
+
+    def _failed(self, batch: _Batch, exc: Exception) -> None:
+        # The transaction as a whole failed: every caller sees the error
+        batch.outcomes = [exc] * len(batch.items)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch": self.items / self.batches if self.batches else 0.0,
+        }
+
+
+class GroupCommitter(_Committer):
+    """Coalesces blocking callers, e.g. sync endpoints on the threadpool."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+
+    def submit(self, db: Session, item) -> Any:
+        """
+        Writes item as part of a batch and returns its outcome. The leader
+        runs the batch on its own session `db`; the others only wait.
+        """
+        with self._lock:
+            batch, index, leader = self._join(
+                item, lambda: _Batch(threading.Event(), threading.Event())
+            )
+        if not leader:
+            batch.done.wait()
+            return _outcome(batch, index)
+
+        batch.full.wait(self.window)
+        with self._lock:
+            self._close(batch)
+        try:
+            batch.outcomes = self.run_batch(db, batch.items)
+        except Exception as exc:
+            self._failed(batch, exc)
+        finally:
+            batch.done.set()
+        return _outcome(batch, index)
+
+
+class AsyncGroupCommitter(_Committer):
+    """The same for coroutines; run_batch is then a coroutine function too."""
+
+    async def submit(self, db, item) -> Any:
+        # No lock needed: the event loop switches tasks only at awaits
+        batch, index, leader = self._join(
+            item, lambda: _Batch(asyncio.Event(), asyncio.Event())
+        )
+        if not leader:
+            await batch.done.wait()
+            return _outcome(batch, index)
+
+        try:
+            await asyncio.wait_for(batch.full.wait(), self.window)
+        except asyncio.TimeoutError:
+            pass
+        self._close(batch)
+        try:
+            batch.outcomes = await self.run_batch(db, batch.items)
+        except Exception as exc:
+            self._failed(batch, exc)
+        finally:
+            batch.done.set()
+        return _outcome(batch, index)
@@ -1,59 +1,830 @@
-from sqlalchemy.orm import Session
-from src.models.model import Patient, Doctor, Appointment
-from sqlalchemy import select, and_
-from datetime import date
-from typing import Optional, List
-from src.services.utils import has_overlapping_appointment, day_bounds_utc
+from sqlalchemy.orm import Session, joinedload
+from src.models.model import Patient, Doctor, Appointment, normalized_phone
+from src.schemas.schema import (
+    MAX_SERIES_OCCURRENCES,
+    AppointmentCreate,
+    DoctorRead,
+    DoctorReadWithAppointments,
+    PatientRead,
+    PatientReadWithAppointments,
+)
+from src.services.group_commit import GroupCommitter
+from src.services.cache import JSONEntry, doctor_cache, json_entry, patient_cache
+from src.services.schedule_index import schedule_index
+from src.services.serialization import APPOINTMENT_FIELDS
+from src.services.summary import record_bookings
+from sqlalchemy import func, select, and_, insert, or_, tuple_
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from datetime import time as time_of_day
+from typing import Iterator, Optional, List, Sequence
+from src.services.utils import (
+    IN_CLAUSE_CHUNK,
+    MAX_APPOINTMENT_DURATION,
+    IntervalSet,
+    appointment_interval,
+    as_utc,
+    bookable_slots,
+    day_bounds_utc,
+    encode_cursor,
+    epoch_us,
+    expand_recurrence,
+    from_epoch_us,
+    has_overlapping_appointment,
+    normalize_phone,
+    overlapping_spans,
+)
 from fastapi import HTTPException, status
+import time
+
+# Attempts made when a booking transaction hits a database lock timeout.
+BOOKING_ATTEMPTS = 5
+BOOKING_RETRY_BACKOFF = 0.05  # seconds, multiplied by the attempt number
+# Attempts made when a bulk insert races a concurrent unique-key insert.
+BULK_INSERT_ATTEMPTS = 3
+# Appointments embedded by ?expand=appointments: the most recent ones only.
+EXPANDED_APPOINTMENTS_LIMIT = 100
 
 
 def create_patient(db: Session, patient_data) -> Patient:
-    patient = Patient(**patient_data.model_dump())
-    db.add(patient)
+    row = patient_data.model_dump()
+    if patient_writes.enabled:
+        return patient_writes.submit(db, row)
+    return insert_patient(db, row)
+
+
+def insert_patient(db: Session, row: dict) -> Patient:
+    """Inserts and commits one patient; a taken email raises IntegrityError."""
+    (patient,) = _insert_returning(db, Patient, [row])
     db.commit()
-    db.refresh(patient)
+    patient_cache.invalidate(patient.id)
     return patient
 
 
+def insert_patients(db: Session, rows: list[dict]) -> list:
+    """
+    Group-commit runner for create_patient: one Patient per row, or a 400
+    for an email already registered or taken earlier in the batch.
+    """
+    for attempt in range(1, BULK_INSERT_ATTEMPTS + 1):
+        try:
+            results, accepted = _check_patient_emails(db, rows)
+            patients = _insert_returning(db, Patient, [rows[i] for i in accepted])
+            db.commit()
+            break
+        except IntegrityError as exc:
+            # Raced a concurrent registration, as in create_patients_bulk
+            db.rollback()
+            if not is_email_conflict(exc) or attempt == BULK_INSERT_ATTEMPTS:
+                raise
+    outcomes = dict(zip(accepted, patients))
+    for patient in patients:
+        patient_cache.invalidate(patient.id)
+    return [
+        outcomes.get(r["index"])
+        or HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=r["detail"])
+        for r in results
+    ]
+
+
 def get_patient(db: Session, patient_id: int) -> Patient | None:
     return db.get(Patient, patient_id)
 
 
+def get_patient_json(db: Session, patient_id: int) -> JSONEntry | None:
+    """PatientRead JSON for the patient, served from patient_cache when warm."""
+    return patient_cache.get_or_load(
+        patient_id, lambda: load_patient_json(db, patient_id)
+    )
+
+
+def load_patient_json(db: Session, patient_id: int) -> JSONEntry | None:
+    patient = get_patient(db, patient_id)
+    if patient is None:
+        return None
+    body = PatientRead.model_validate(patient).model_dump_json().encode()
+    return json_entry(body, as_utc(patient.updated_at))
+
+
+def load_patient_expanded_json(db: Session, patient_id: int) -> JSONEntry | None:
+    """
+    PatientReadWithAppointments JSON with the patient's most recent
+    EXPANDED_APPOINTMENTS_LIMIT appointments and, when there are older ones,
+    the URL of the timeline page that continues from them. Not cached, as
+    any booking would invalidate it, and without Last-Modified, which
+    updated_at does not track for bookings.
+    """
+    patient = get_patient(db, patient_id)
+    if patient is None:
+        return None
+    rows, next_key = get_patient_appointments(
+        db, patient_id, limit=EXPANDED_APPOINTMENTS_LIMIT
+    )
+    next_url = None
+    if next_key is not None:
+        cursor = encode_cursor(*next_key)
+        next_url = f"/patients/{patient_id}/appointments?cursor={cursor}"
+    body = PatientReadWithAppointments.model_validate(
+        {
+            **PatientRead.model_validate(patient).model_dump(),
+            "appointments": rows[::-1],
+            "appointments_next": next_url,
+        },
+        from_attributes=True,
+    ).model_dump_json()
+    return json_entry(body.encode())
+
+
+def _recent_doctor_appointments(db: Session, doctor_id: int) -> List[Appointment]:
+    # Walks the (doctor_id, start_time) index back from the newest entry
+    rows = db.scalars(
+        select(Appointment)
+        .where(Appointment.doctor_id == doctor_id)
+        .order_by(Appointment.start_time.desc(), Appointment.id.desc())
+        .limit(EXPANDED_APPOINTMENTS_LIMIT)
+    ).all()
+    return rows[::-1]
+
+
+def _prefix_range(expr, prefix: str) -> list:
+    # A range rather than LIKE 'prefix%' so the bound is sargable on every
+    # backend; both sides are lower()ed by the database, so they fold alike
+    return [expr >= func.lower(prefix), expr < func.lower(prefix + "\U0010ffff")]
+
+
+def search_patients(
+    db: Session,
+    last_name: Optional[str] = None,
+    first_name: Optional[str] = None,
+    email: Optional[str] = None,
+    phone: Optional[str] = None,
+    limit: int = 20,
+    after: Optional[tuple] = None,
+) -> tuple[List[Patient], Optional[tuple]]:
+    """
+    Finds patients by exact email, phone number (separators ignored) or
+    case-insensitive last name prefix, optionally narrowed by a first name
+    prefix. Exactly one of last_name/email/phone is expected.
+
+    Name matches come in (last, first, id) order and the others by id, each
+    straight off an index, so a page costs `limit` index entries however
+    many patients match. Returns the page and the key to resume after
+    (None on the last page).
+    """
+    stmt = _patient_search_query(last_name, first_name, email, phone, after)
+    rows = db.execute(stmt.limit(limit + 1)).all()
+    patients = [row[0] for row in rows[:limit]]
+    if len(rows) <= limit:
+        return patients, None
+    # Keys as the database computed them, so lower() folding matches
+    return patients, tuple(rows[limit - 1][1:])
+
+
+def _patient_search_query(
+    last_name: Optional[str],
+    first_name: Optional[str],
+    email: Optional[str],
+    phone: Optional[str],
+    after: Optional[tuple],
+):
+    """SELECT (Patient, *sort key) in sort key order for search_patients."""
+    if email is not None:
+        key = (Patient.id,)
+        conditions = [Patient.email == email]
+    elif phone is not None:
+        key = (Patient.id,)
+        conditions = [normalized_phone(Patient.ph_no) == normalize_phone(phone)]
+    else:
+        last, first = func.lower(Patient.lname), func.lower(Patient.fname)
+        key = (last, first, Patient.id)
+        conditions = _prefix_range(last, last_name)
+        if first_name:
+            conditions += _prefix_range(first, first_name)
+    if after is not None:
+        if len(after) != len(key):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+        # The leading bound on its own keeps the index range tight
+        conditions += [key[0] >= after[0], tuple_(*key) > tuple_(*after)]
+    return select(Patient, *key).where(*conditions).order_by(*key)
+
+
+def create_patients_bulk(db: Session, items) -> list[dict]:
+    """
+    Inserts a roster of patients in one transaction.
+
+    Emails already registered, or repeated earlier in the batch, are reported
+    as duplicates instead of failing the batch. Returns one result dict per
+    item, in order.
+    """
+    rows = [item.model_dump() for item in items]
+    for attempt in range(1, BULK_INSERT_ATTEMPTS + 1):
+        try:
+            return _insert_patients_bulk(db, rows)
+        except IntegrityError as exc:
+            db.rollback()
+            if not is_email_conflict(exc):
+                # Retrying cannot fix any other constraint the rows break
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Patient data violates a database constraint",
+                )
+            # A concurrent request registered one of the emails after our
+            # pre-check; the next pass sees it and reports the duplicate.
+            if attempt == BULK_INSERT_ATTEMPTS:
+                raise
+
+
+def is_email_conflict(exc: IntegrityError) -> bool:
+    """Whether exc violates the unique constraint on patient emails."""
+    orig = getattr(exc, "orig", None) or exc
+    message = str(orig).lower()
+    code = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    # SQLite: "UNIQUE constraint failed: <table>.email"; PostgreSQL: 23505
+    # naming the constraint; MySQL: "Duplicate entry ... for key 'email'"
+    unique = code == "23505" or "unique" in message or "duplicate" in message
+    return unique and "email" in message
+
+
+def _insert_patients_bulk(db: Session, rows: list[dict]) -> list[dict]:
+    results, accepted = _check_patient_emails(db, rows)
+    ids = _insert_returning_ids(db, Patient, [rows[i] for i in accepted])
+    for i, patient_id in zip(accepted, ids):
+        results[i]["id"] = patient_id
+        patient_cache.invalidate(patient_id)
+    return results
+
+
+def _check_patient_emails(db: Session, rows: list[dict]) -> tuple[list, list]:
+    """
+    Per-row results, with emails already registered or repeated earlier in
+    rows marked "duplicate", and the indexes of the rows to insert.
+    """
+    emails = sorted({row["email"] for row in rows})
+    taken = set()
+    for lo in range(0, len(emails), IN_CLAUSE_CHUNK):
+        chunk = emails[lo : lo + IN_CLAUSE_CHUNK]
+        taken.update(db.scalars(select(Patient.email).where(Patient.email.in_(chunk))))
+
+    results: list[dict] = []
+    accepted: list[int] = []
+    for index, row in enumerate(rows):
+        if row["email"] in taken:
+            results.append(
+                {
+                    "index": index,
+                    "status": "duplicate",
+                    "detail": "Patient with this email already exists",
+                }
+            )
+            continue
+        taken.add(row["email"])
+        accepted.append(index)
+        results.append({"index": index, "status": "created"})
+    return results, accepted
+
+
+def _insert_returning(db: Session, model, rows: list[dict]) -> list:
+    """
+    Inserts rows without committing and returns them as transient `model`
+    instances carrying every column, server defaults included. This uses
+    INSERT ... RETURNING where the dialect has it, in place of the SELECT a
+    refresh() after commit would cost; elsewhere each row is read back by
+    primary key.
+    """
+    if not rows:
+        return []
+    table = model.__table__
+    if db.get_bind().dialect.insert_returning:
+        result = db.execute(
+            insert(table).returning(*table.c, sort_by_parameter_order=True), rows
+        )
+        return [model(**row._mapping) for row in result]
+    return [
+        model(**db.execute(select(table).where(table.c.id == pk)).one()._mapping)
+        for pk in _insert_ids(db, model, rows)
+    ]
+
+
+def _insert_ids(db: Session, model, rows: list[dict]) -> list[int]:
+    """
+    Inserts rows without committing and returns their ids in row order:
+    from one multi-row INSERT ... RETURNING where the dialect has it,
+    elsewhere from one INSERT per row.
+    """
+    table = model.__table__
+    if db.get_bind().dialect.insert_returning:
+        return db.scalars(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+        ).all()
+    return [db.execute(insert(table), row).inserted_primary_key[0] for row in rows]
+
+
+def _insert_returning_ids(db: Session, model, rows: list[dict]) -> list[int]:
+    """Inserts rows as _insert_ids does and commits."""
+    if not rows:
+        db.rollback()
+        return []
+    ids = _insert_ids(db, model, rows)
+    db.commit()
+    return ids
+
+
 def create_doctor(db: Session, doctor_data) -> Doctor:
-    doctor = Doctor(**doctor_data.model_dump())
-    db.add(doctor)
+    row = doctor_data.model_dump()
+    if doctor_writes.enabled:
+        return doctor_writes.submit(db, row)
+    return insert_doctors(db, [row])[0]
+
+
+def insert_doctors(db: Session, rows: list[dict]) -> list[Doctor]:
+    """Inserts and commits doctors; also create_doctor's group-commit runner."""
+    doctors = _insert_returning(db, Doctor, rows)
     db.commit()
-    db.refresh(doctor)
-    return doctor
+    for doctor in doctors:
+        doctor_cache.invalidate(doctor.id)
+    return doctors
 
 
 def get_doctor(db: Session, doctor_id: int) -> Doctor | None:
     return db.get(Doctor, doctor_id)
 
 
-def create_appointment(db: Session, appointment_data) -> Appointment:
-    # overlap protection
-    if has_overlapping_appointment(
-        db,
-        appointment_data.doctor_id,
-        appointment_data.start_time,
-        appointment_data.duration,
-    ):
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Doctor already has an overlapping appointment",
-        )
+def get_doctor_json(db: Session, doctor_id: int) -> JSONEntry | None:
+    """DoctorRead JSON for the doctor, served from doctor_cache when warm."""
+    return doctor_cache.get_or_load(doctor_id, lambda: load_doctor_json(db, doctor_id))
+
+
+def load_doctor_json(db: Session, doctor_id: int) -> JSONEntry | None:
+    doctor = get_doctor(db, doctor_id)
+    if doctor is None:
+        return None
+    body = DoctorRead.model_validate(doctor).model_dump_json().encode()
+    # Doctors have no updated_at; the API never modifies them after creation
+    return json_entry(body, as_utc(doctor.created_at))
+
+
+def load_doctor_expanded_json(db: Session, doctor_id: int) -> JSONEntry | None:
+    """
+    DoctorReadWithAppointments JSON with the doctor's most recent
+    EXPANDED_APPOINTMENTS_LIMIT appointments, as load_patient_expanded_json.
+    """
+    doctor = get_doctor(db, doctor_id)
+    if doctor is None:
+        return None
+    body = DoctorReadWithAppointments.model_validate(
+        {
+            **DoctorRead.model_validate(doctor).model_dump(),
+            "appointments": _recent_doctor_appointments(db, doctor_id),
+        },
+        from_attributes=True,
+    ).model_dump_json()
+    return json_entry(body.encode())
+
+
+def create_doctors_bulk(db: Session, items) -> list[dict]:
+    """Inserts a roster of doctors in one transaction; one result per item."""
+    ids = _insert_returning_ids(db, Doctor, [item.model_dump() for item in items])
+    for doctor_id in ids:
+        doctor_cache.invalidate(doctor_id)
+    return [
+        {"index": index, "status": "created", "id": doctor_id}
+        for index, doctor_id in enumerate(ids)
+    ]
+
+
+def lock_doctor_schedules(db: Session, doctor_ids) -> None:
+    """
+    Serializes bookings per doctor by row-locking the doctors involved.
 
+    On dialects with SELECT ... FOR UPDATE (PostgreSQL, MySQL) concurrent
+    bookings for the same doctor queue here while other doctors proceed.
+    SQLite ignores the clause; its single-writer lock plus the post-insert
+    re-check in create_appointment gives the same guarantee there.
+    """
+    stmt = select(Doctor.id).order_by(Doctor.id).with_for_update()
+    # Ascending chunks keep the lock order the same for every transaction
+    ids = sorted(set(doctor_ids))
+    for lo in range(0, len(ids), IN_CLAUSE_CHUNK):
+        chunk = ids[lo : lo + IN_CLAUSE_CHUNK]
+        db.execute(stmt.where(Doctor.id.in_(chunk))).all()
+
+
+def _overlap_conflict() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Doctor already has an overlapping appointment",
+    )
+
+
+def appointment_row(appointment_data) -> dict:
     # Ensure DB non-null constraint for 'reason' is satisfied
     data = appointment_data.model_dump()
     if data.get("reason") is None:
         data["reason"] = ""
+    # Store UTC so range predicates compare like with like on every dialect
+    data["start_time"] = as_utc(data["start_time"])
+    return data
+
+
+class _ScheduleChanged(Exception):
+    """A concurrent writer booked into a window this transaction planned for."""
+
+
+# Lock and serialization failures: SQLite SQLITE_BUSY / SQLITE_LOCKED,
+# PostgreSQL serialization_failure / deadlock_detected, MySQL lock wait
+# timeout / deadlock
+SQLITE_LOCK_CODES = {5, 6}
+PG_RETRY_SQLSTATES = {"40001", "40P01"}
+MYSQL_RETRY_CODES = {1205, 1213}
+# Failures that may make a booking transaction worth retrying from scratch
+RETRYABLE_BOOKING_ERRORS = (DBAPIError, _ScheduleChanged)
+
+
+def is_retryable_booking_error(exc: Exception) -> bool:
+    """
+    Whether a fresh transaction could succeed where `exc` failed. Other
+    database errors (missing tables, I/O errors, lost connections) would
+    fail again, so they are not worth BOOKING_ATTEMPTS rollbacks.
+    """
+    if isinstance(exc, _ScheduleChanged):
+        return True
+    if not isinstance(exc, DBAPIError):
+        return False
+    orig = exc.orig
+    code = getattr(orig, "sqlite_errorcode", None)
+    if code is not None:
+        # Extended result codes keep the primary code in the low byte
+        return code & 0xFF in SQLITE_LOCK_CODES
+    sqlstate = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    if sqlstate is not None:
+        return sqlstate in PG_RETRY_SQLSTATES
+    if orig is not None and orig.args and orig.args[0] in MYSQL_RETRY_CODES:
+        return True
+    message = str(orig).lower()
+    return "database is locked" in message or "database table is locked" in message
+
+
+def booking_retries_exhausted(exc: Exception) -> Exception:
+    if isinstance(exc, _ScheduleChanged):
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Doctor schedule changed during booking; retry",
+        )
+    return exc
+
+
+def _with_booking_retries(db: Session, book, *args):
+    for attempt in range(1, BOOKING_ATTEMPTS + 1):
+        try:
+            return book(db, *args)
+        except RETRYABLE_BOOKING_ERRORS as exc:
+            # Lock timeouts under heavy contention: start over with a fresh
+            # transaction rather than failing the request outright.
+            if not is_retryable_booking_error(exc):
+                raise
+            db.rollback()
+            if attempt == BOOKING_ATTEMPTS:
+                raise booking_retries_exhausted(exc)
+            time.sleep(BOOKING_RETRY_BACKOFF * attempt)
+
+
+def create_appointment(db: Session, appointment_data) -> Appointment:
+    row = appointment_row(appointment_data)
+    if appointment_writes.enabled:
+        return appointment_writes.submit(db, row)
+    return _with_booking_retries(db, book_appointment, row)
+
+
+def book_appointments(db: Session, rows: list[dict]) -> list:
+    """
+    Group-commit runner for create_appointment: the batch is booked like a
+    bulk request, so each row gets an Appointment, or the 409 it would have
+    got on its own, in arrival order.
+    """
+    return booking_outcomes(
+        rows, _with_booking_retries(db, book_appointments_bulk, rows)
+    )
+
+
+def booking_outcomes(rows: list[dict], results: list[dict]) -> list:
+    """book_appointments_bulk results as Appointments or 409 errors."""
+    return [
+        (
+            Appointment(id=result["id"], **row)
+            if result["status"] == "created"
+            else _overlap_conflict()
+        )
+        for row, result in zip(rows, results)
+    ]
+
+
+def book_appointment(db: Session, data: dict) -> Appointment:
+    doctor_id, start_time, duration = (
+        data["doctor_id"],
+        data["start_time"],
+        data["duration"],
+    )
+    lock_doctor_schedules(db, [doctor_id])
+
+    # overlap protection; a warm schedule index answers without a query
+    conflict = schedule_index.overlaps(doctor_id, start_time, duration)
+    if conflict is None:
+        conflict = has_overlapping_appointment(db, doctor_id, start_time, duration)
+    if conflict:
+        db.rollback()
+        raise _overlap_conflict()
+
+    # The row is known but for its id, so the inserted key is all that
+    # comes back; no refresh() SELECT after the commit
+    (appointment_id,) = db.execute(
+        insert(Appointment.__table__), data
+    ).inserted_primary_key
+
+    # The insert holds the write lock now, so any booking that raced past the
+    # check above has either committed (and is visible here) or is waiting
+    # on us. Re-checking closes the check-then-insert window.
+    if has_overlapping_appointment(
+        db, doctor_id, start_time, duration, exclude_id=appointment_id
+    ):
+        db.rollback()
+        if schedule_index.ready:
+            # The index missed a booking made elsewhere; pull in the window
+            end_time = start_time + timedelta(minutes=duration)
+            schedule_index.add_schedules(
+                load_doctor_schedules(db, [doctor_id], start_time, end_time)
+            )
+        raise _overlap_conflict()
 
-    appointment = Appointment(**data)
-    db.add(appointment)
+    record_bookings(db, [data])
     db.commit()
-    db.refresh(appointment)
-    return appointment
+    schedule_index.add(doctor_id, start_time, duration)
+    return Appointment(id=appointment_id, **data)
+
+
+def load_doctor_schedules(
+    db: Session,
+    doctor_ids,
+    window_start: datetime,
+    window_end: datetime,
+    exclude_ids=(),
+) -> dict[int, IntervalSet]:
+    """
+    Fetches the booked intervals touching [window_start, window_end) for
+    several doctors in one indexed query.
+    """
+    stmt = select(
+        Appointment.id,
+        Appointment.doctor_id,
+        Appointment.start_time,
+        Appointment.duration,
+    ).where(
+        Appointment.start_time
+        > window_start - timedelta(minutes=MAX_APPOINTMENT_DURATION),
+        Appointment.start_time < window_end,
+    )
+    intervals = defaultdict(list)
+    excluded = set(exclude_ids)
+    ids = sorted(set(doctor_ids))
+    for lo in range(0, len(ids), IN_CLAUSE_CHUNK):
+        chunk = ids[lo : lo + IN_CLAUSE_CHUNK]
+        rows = db.execute(stmt.where(Appointment.doctor_id.in_(chunk)))
+        for appt_id, doctor_id, start_time, duration in rows:
+            if appt_id not in excluded:
+                intervals[doctor_id].append(appointment_interval(start_time, duration))
+    return {
+        doctor_id: IntervalSet.from_intervals(intervals[doctor_id])
+        for doctor_id in doctor_ids
+    }
+
+
+def find_available_slots(
+    db: Session,
+    doctor_ids,
+    target_date: date,
+    duration: int,
+    day_start: time_of_day,
+    day_end: time_of_day,
+    step: int,
+) -> dict[int, list[tuple[datetime, datetime]]]:
+    """
+    Free slots of `duration` minutes between day_start and day_end (UTC) on
+    target_date for each doctor, on a `step`-minute grid. Booked intervals for
+    all doctors come from one query; gaps are found with a sorted sweep. Slots
+    that have already started are omitted.
+    """
+    window_start = datetime.combine(target_date, day_start, tzinfo=timezone.utc)
+    window_end = datetime.combine(target_date, day_end, tzinfo=timezone.utc)
+    schedules = load_doctor_schedules(db, doctor_ids, window_start, window_end)
+
+    lo, hi = epoch_us(window_start), epoch_us(window_end)
+    now = epoch_us(datetime.now(timezone.utc))
+    minute = 60_000_000
+    return {
+        doctor_id: [
+            (from_epoch_us(start), from_epoch_us(end))
+            for start, end in bookable_slots(
+                schedules[doctor_id], lo, hi, duration * minute, step * minute
+            )
+            if start > now
+        ]
+        for doctor_id in doctor_ids
+    }
+
+
+def get_bookable_doctor_ids(
+    db: Session,
+    doctor_ids: Optional[Sequence[int]] = None,
+    specialty: Optional[str] = None,
+) -> List[int]:
+    """Active doctors, optionally narrowed to ids and/or a specialty."""
+    stmt = select(Doctor.id).where(Doctor.active.is_(True)).order_by(Doctor.id)
+    if specialty is not None:
+        stmt = stmt.where(Doctor.specialty == specialty)
+    if not doctor_ids:
+        return db.scalars(stmt).all()
+    ids = sorted(set(doctor_ids))
+    found = []
+    for lo in range(0, len(ids), IN_CLAUSE_CHUNK):
+        chunk = ids[lo : lo + IN_CLAUSE_CHUNK]
+        found.extend(db.scalars(stmt.where(Doctor.id.in_(chunk))))
+    return found
+
+
+def create_appointments_bulk(db: Session, items) -> list[dict]:
+    """
+    Books a batch of appointments in one transaction.
+
+    Items are accepted in request order, exactly as if each had been POSTed
+    on its own: an item conflicting with an existing appointment or with an
+    earlier accepted item is reported and skipped. Returns one result dict
+    per item.
+    """
+    rows = [appointment_row(item) for item in items]
+    if not rows:
+        return []
+    return _with_booking_retries(db, book_appointments_bulk, rows)
+
+
+def book_appointments_bulk(db: Session, rows: list[dict]) -> list[dict]:
+    spans = [appointment_interval(r["start_time"], r["duration"]) for r in rows]
+    doctor_ids = {r["doctor_id"] for r in rows}
+    window_start = min(r["start_time"] for r in rows)
+    window_end = from_epoch_us(max(end for _, end in spans))
+
+    lock_doctor_schedules(db, doctor_ids)
+    schedules = load_doctor_schedules(db, doctor_ids, window_start, window_end)
+
+    results: list[dict] = []
+    accepted: list[int] = []
+    for index, (row, (start, end)) in enumerate(zip(rows, spans)):
+        schedule = schedules[row["doctor_id"]]
+        if schedule.overlaps(start, end):
+            results.append(
+                {
+                    "index": index,
+                    "status": "conflict",
+                    "detail": "Doctor already has an overlapping appointment",
+                }
+            )
+            continue
+        schedule.add(start, end)
+        accepted.append(index)
+        results.append({"index": index, "status": "created"})
+
+    if not accepted:
+        db.rollback()
+        return results
+
+    ids = _insert_bookings(db, rows, spans, accepted, window_start, window_end)
+    for i, appt_id in zip(accepted, ids):
+        results[i]["id"] = appt_id
+    return results
+
+
+def _insert_bookings(
+    db: Session,
+    rows: list[dict],
+    spans: list[tuple[int, int]],
+    accepted: list[int],
+    window_start: datetime,
+    window_end: datetime,
+) -> list[int]:
+    """
+    Inserts rows[i] for i in accepted, re-checks them and commits; returns
+    the new ids in `accepted` order.
+    """
+    # insertmanyvalues batches these into multi-row INSERT ... RETURNING
+    ids = _insert_ids(db, Appointment, [rows[i] for i in accepted])
+
+    # Same post-insert re-check as book_appointment, for the whole batch
+    doctor_ids = {rows[i]["doctor_id"] for i in accepted}
+    others = load_doctor_schedules(
+        db, doctor_ids, window_start, window_end, exclude_ids=ids
+    )
+    if any(others[rows[i]["doctor_id"]].overlaps(*spans[i]) for i in accepted):
+        raise _ScheduleChanged()
+
+    record_bookings(db, [rows[i] for i in accepted])
+    db.commit()
+    for i in accepted:
+        schedule_index.add(
+            rows[i]["doctor_id"], rows[i]["start_time"], rows[i]["duration"]
+        )
+    return ids
+
+
+def create_appointment_series(db: Session, series) -> dict:
+    """
+    Books every occurrence of a recurring series in one transaction.
+
+    Occurrences are expanded up front, then checked against the doctor's
+    bookings with one query over the series window and one sorted sweep.
+    By default the series is all-or-nothing: if any occurrence conflicts,
+    nothing is booked and the report marks the rest "available". With
+    skip_conflicts the free occurrences are booked and the others reported.
+    """
+    occurrences = _with_booking_retries(
+        db, book_appointment_series, series_rows(series), series.skip_conflicts
+    )
+    return series_report(series, occurrences)
+
+
+def series_rows(series) -> list[dict]:
+    """Expands a series into appointment rows; 422 if it is empty or too long."""
+    try:
+        starts = expand_recurrence(
+            series.start_time,
+            series.freq,
+            series.interval,
+            count=series.count,
+            until=series.until,
+            weekdays=series.weekdays,
+            max_occurrences=MAX_SERIES_OCCURRENCES,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=str(exc)
+        )
+    if not starts:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="series has no occurrences",
+        )
+    row = appointment_row(series)
+    row = {k: row[k] for k in AppointmentCreate.model_fields}
+    return [{**row, "start_time": start} for start in starts]
+
+
+def series_report(series, occurrences: list[dict]) -> dict:
+    return {
+        "patient_id": series.patient_id,
+        "doctor_id": series.doctor_id,
+        "duration": series.duration,
+        "booked": sum(o["status"] == "created" for o in occurrences),
+        "conflicts": sum(o["status"] == "conflict" for o in occurrences),
+        "occurrences": occurrences,
+    }
+
+
+def book_appointment_series(
+    db: Session, rows: list[dict], skip_conflicts: bool
+) -> list[dict]:
+    """rows are one doctor's occurrences, sorted by start_time."""
+    doctor_id = rows[0]["doctor_id"]
+    spans = [appointment_interval(r["start_time"], r["duration"]) for r in rows]
+    window_start = rows[0]["start_time"]
+    window_end = from_epoch_us(spans[-1][1])
+
+    lock_doctor_schedules(db, [doctor_id])
+    schedule = load_doctor_schedules(db, [doctor_id], window_start, window_end)[
+        doctor_id
+    ]
+    conflicts = overlapping_spans(schedule, spans)
+
+    occurrences = [
+        {"index": index, "start_time": row["start_time"], "status": "created"}
+        for index, row in enumerate(rows)
+    ]
+    for occurrence, conflict in zip(occurrences, conflicts):
+        if conflict:
+            occurrence["status"] = "conflict"
+            occurrence["detail"] = "Doctor already has an overlapping appointment"
+    accepted = [i for i, conflict in enumerate(conflicts) if not conflict]
+
+    if not accepted or (len(accepted) < len(rows) and not skip_conflicts):
+        db.rollback()
+        for i in accepted:
+            occurrences[i]["status"] = "available"
+        return occurrences
+
+    ids = _insert_bookings(db, rows, spans, accepted, window_start, window_end)
+    for i, appt_id in zip(accepted, ids):
+        occurrences[i]["id"] = appt_id
+    return occurrences
 
 
 def get_appointments_by_date(
@@ -70,21 +841,199 @@ def get_appointments_by_date(
     return db.execute(stmt).scalars().all()
 
 
+def _appointments_in_range(
+    start_date: date,
+    end_date: date,
+    doctor_ids: Optional[Sequence[int]] = None,
+):
+    """Filter for appointments starting on start_date..end_date (inclusive)."""
+    start, _ = day_bounds_utc(start_date)
+    _, end = day_bounds_utc(end_date)
+
+    conditions = [
+        Appointment.start_time >= start,
+        Appointment.start_time < end,
+    ]
+
+    # Doctor filters are served by the (doctor_id, start_time, ...) index as
+    # one range scan per doctor; without them the start_time index is used.
+    if doctor_ids:
+        conditions.append(Appointment.doctor_id.in_(sorted(set(doctor_ids))))
+
+    return and_(*conditions)
+
+
+def _after_keyset(after: tuple[datetime, int]):
+    """Rows strictly after (start_time, id) in listing order."""
+    start_time, appt_id = after
+    return and_(
+        # The plain range bound keeps the predicate sargable for the index
+        Appointment.start_time >= start_time,
+        or_(Appointment.start_time > start_time, Appointment.id > appt_id),
+    )
+
+
 def get_appointments_by_date_and_doctor(
     db: Session,
     target_date: date,
     doctor_id: Optional[int] = None,
 ) -> List[Appointment]:
-    start, end = day_bounds_utc(target_date)
+    doctor_ids = [doctor_id] if doctor_id is not None else None
+    return get_appointments_in_range(db, target_date, target_date, doctor_ids)
 
-    conditions = [
-        Appointment.start_time >= start,
-        Appointment.start_time < end,
-    ]
 
-    if doctor_id is not None:
-        conditions.append(Appointment.doctor_id == doctor_id)
+def _appointment_read_columns():
+    """AppointmentRead's columns, in field order, for tuple-returning queries."""
+    return [getattr(Appointment, name) for name in APPOINTMENT_FIELDS]
 
-    stmt = select(Appointment).where(and_(*conditions))
 
-    return db.execute(stmt).scalars().all()
+def _expand_options(expand) -> list:
+    # Many-to-one, so a join adds columns but never rows: the listing stays
+    # one query however many patients and doctors it embeds.
+    relationships = {"patient": Appointment.patient, "doctor": Appointment.doctor}
+    return [joinedload(relationships[name], innerjoin=True) for name in sorted(expand)]
+
+
+def get_appointments_in_range(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    doctor_ids: Optional[Sequence[int]] = None,
+    columns: bool = False,
+    expand: frozenset = frozenset(),
+) -> List[Appointment]:
+    """
+    Appointments starting on start_date..end_date. With columns=True rows are
+    plain APPOINTMENT_FIELDS tuples instead of ORM objects. `expand` names
+    relationships ("patient", "doctor") to load in the same query.
+    """
+    stmt = (
+        select(*_appointment_read_columns() if columns else (Appointment,))
+        .where(_appointments_in_range(start_date, end_date, doctor_ids))
+        .order_by(Appointment.start_time, Appointment.id)
+        .options(*_expand_options(expand))
+    )
+
+    result = db.execute(stmt)
+    return result.all() if columns else result.scalars().all()
+
+
+def get_appointments_page(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    doctor_ids: Optional[Sequence[int]] = None,
+    limit: int = 100,
+    after: Optional[tuple[datetime, int]] = None,
+    columns: bool = False,
+    expand: frozenset = frozenset(),
+) -> tuple[List[Appointment], Optional[tuple[datetime, int]]]:
+    """
+    Returns up to `limit` appointments ordered by (start_time, id), starting
+    after the `after` key, plus the key to resume from (None on the last page).
+    columns=True and `expand` work as in get_appointments_in_range.
+    """
+    conditions = [_appointments_in_range(start_date, end_date, doctor_ids)]
+    if after is not None:
+        conditions.append(_after_keyset(after))
+
+    stmt = (
+        select(*_appointment_read_columns() if columns else (Appointment,))
+        .where(*conditions)
+        .order_by(Appointment.start_time, Appointment.id)
+        .limit(limit + 1)
+        .options(*_expand_options(expand))
+    )
+    result = db.execute(stmt)
+    rows = result.all() if columns else result.scalars().all()
+
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], (last.start_time, last.id)
+
+
+def get_patient_appointments(
+    db: Session,
+    patient_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 100,
+    before: Optional[tuple[datetime, int]] = None,
+    columns: bool = False,
+) -> tuple[List[Appointment], Optional[tuple[datetime, int]]]:
+    """
+    A page of the patient's appointments, newest first by (start_time, id),
+    optionally limited to those starting on start_date..end_date. Resumes
+    before the `before` key and returns the key for the next (older) page,
+    or None on the last one.
+
+    The (patient_id, start_time, id) index is walked backwards from the newest
+    entry, so a page costs `limit` index entries however long the
+    patient's history is.
+    """
+    conditions = [Appointment.patient_id == patient_id]
+    if start_date is not None:
+        conditions.append(Appointment.start_time >= day_bounds_utc(start_date)[0])
+    if end_date is not None:
+        conditions.append(Appointment.start_time < day_bounds_utc(end_date)[1])
+    if before is not None:
+        start_time, appt_id = before
+        conditions += [
+            # The plain range bound keeps the predicate sargable for the index
+            Appointment.start_time <= start_time,
+            or_(Appointment.start_time < start_time, Appointment.id < appt_id),
+        ]
+
+    stmt = (
+        select(*_appointment_read_columns() if columns else (Appointment,))
+        .where(*conditions)
+        .order_by(Appointment.start_time.desc(), Appointment.id.desc())
+        .limit(limit + 1)
+    )
+    result = db.execute(stmt)
+    rows = result.all() if columns else result.scalars().all()
+
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], (last.start_time, last.id)
+
+
+def stream_appointments(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    doctor_ids: Optional[Sequence[int]] = None,
+    batch_size: int = 1000,
+    columns: bool = False,
+) -> Iterator[RowMapping]:
+    """
+    Yields appointment rows as mappings (APPOINTMENT_FIELDS tuples with
+    columns=True), fetched in batches through a server-side cursor where the
+    driver supports one. Plain column rows skip the ORM identity map, so
+    memory stays bounded by batch_size.
+    """
+    stmt = stream_appointments_statement(start_date, end_date, doctor_ids, batch_size)
+    result = db.execute(stmt)
+    yield from (result if columns else result.mappings())
+
+
+def stream_appointments_statement(
+    start_date: date,
+    end_date: date,
+    doctor_ids: Optional[Sequence[int]] = None,
+    batch_size: int = 1000,
+):
+    return (
+        select(*_appointment_read_columns())
+        .where(_appointments_in_range(start_date, end_date, doctor_ids))
+        .order_by(Appointment.start_time, Appointment.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+
+# Group commit (GROUP_COMMIT_WINDOW_MS) for the single-row creates above
+patient_writes = GroupCommitter(insert_patients)
+doctor_writes = GroupCommitter(insert_doctors)
+appointment_writes = GroupCommitter(book_appointments)
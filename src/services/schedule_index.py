@@ -0,0 +1,136 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from src.models.model import Appointment
+from src.services.utils import (
+    MAX_APPOINTMENT_DURATION,
+    IntervalSet,
+    appointment_interval,
+)
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Optional
+import os
+import sys
+
+# Opt-in: keep every doctor's upcoming bookings in memory and answer the
+# pre-insert overlap check from there instead of the database.
+SCHEDULE_INDEX = os.getenv("SCHEDULE_INDEX", "false").lower() in ("1", "true", "yes")
+
+
+class ScheduleIndex:
+    """
+    Per-doctor IntervalSets of booked time, for O(log n) conflict checks.
+
+    The index is a pre-check only. Bookings still run the post-insert SQL
+    re-check before committing, so a stale index (e.g. another process
+    booked since warm-up) can cost a 409 from the database but never a
+    double booking. Appointments are never removed by the API, so an interval
+    found here is a definite conflict.
+
+    Only appointments still running at warm-up are loaded: new bookings must
+    start in the future, so nothing earlier can conflict with them.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.ready = False
+        self._schedules: dict[int, IntervalSet] = {}
+        self._lock = Lock()
+        self.checks = 0
+        self.conflicts = 0
+
+    def warm(self, db: Session, batch_size: int = 10_000) -> int:
+        """Loads upcoming appointments from the database; returns their count."""
+        since = datetime.now(timezone.utc) - timedelta(minutes=MAX_APPOINTMENT_DURATION)
+        stmt = (
+            select(Appointment.doctor_id, Appointment.start_time, Appointment.duration)
+            .where(Appointment.start_time > since)
+            .execution_options(yield_per=batch_size)
+        )
+        intervals = defaultdict(list)
+        count = 0
+        for doctor_id, start_time, duration in db.execute(stmt):
+            intervals[doctor_id].append(appointment_interval(start_time, duration))
+            count += 1
+        schedules = {
+            doctor_id: IntervalSet.from_intervals(spans)
+            for doctor_id, spans in intervals.items()
+        }
+        with self._lock:
+            self._schedules = schedules
+            self.ready = True
+        return count
+
+    def reset(self) -> None:
+        with self._lock:
+            self._schedules = {}
+            self.ready = False
+            self.checks = self.conflicts = 0
+
+    def overlaps(
+        self, doctor_id: int, start_time: datetime, duration: int
+    ) -> Optional[bool]:
+        """
+        Whether the doctor is booked during the interval, or None when the
+        index is disabled or not warmed yet and the caller must ask the DB.
+        """
+        if not self.ready:
+            return None
+        start, end = appointment_interval(start_time, duration)
+        with self._lock:
+            schedule = self._schedules.get(doctor_id)
+            found = schedule is not None and schedule.overlaps(start, end)
+            self.checks += 1
+            self.conflicts += found
+        return found
+
+    def add(self, doctor_id: int, start_time: datetime, duration: int) -> None:
+        """Records a committed booking."""
+        if not self.ready:
+            return
+        start, end = appointment_interval(start_time, duration)
+        with self._lock:
+            schedule = self._schedules.get(doctor_id)
+            if schedule is None:
+                schedule = self._schedules[doctor_id] = IntervalSet()
+            schedule.union(start, end)
+
+    def add_schedules(self, schedules: dict[int, IntervalSet]) -> None:
+        """Merges intervals read from the database, e.g. after a stale check."""
+        if not self.ready:
+            return
+        with self._lock:
+            for doctor_id, found in schedules.items():
+                schedule = self._schedules.get(doctor_id)
+                if schedule is None:
+                    schedule = self._schedules[doctor_id] = IntervalSet()
+                for start, end in zip(found.starts, found.ends):
+                    schedule.union(start, end)
+
+    def memory_bytes(self) -> int:
+        """Approximate heap footprint: the dict, the sets and their arrays."""
+        with self._lock:
+            total = sys.getsizeof(self._schedules)
+            for schedule in self._schedules.values():
+                total += sys.getsizeof(schedule)
+                total += sys.getsizeof(schedule.starts) + sys.getsizeof(schedule.ends)
+            return total
+
+    def stats(self) -> dict:
+        with self._lock:
+            doctors = len(self._schedules)
+            intervals = sum(len(s) for s in self._schedules.values())
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "doctors": doctors,
+            "intervals": intervals,
+            "memory_bytes": self.memory_bytes(),
+            "checks": self.checks,
+            "conflicts": self.conflicts,
+        }
+
+
+schedule_index = ScheduleIndex(enabled=SCHEDULE_INDEX)
@@ -0,0 +1,157 @@
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Iterable, Iterator, List
+import json
+import os
+
+from pydantic import TypeAdapter
+
+from src.schemas.schema import AppointmentRead, AppointmentReadExpanded
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional: pip install msgpack
+    msgpack = None
+
+# Opt-in: serve appointment listings from column tuples encoded straight to
+# JSON bytes instead of validating every row through AppointmentRead. The
+# bytes are identical to the response_model output.
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() in ("1", "true", "yes")
+
+# AppointmentRead's fields in declaration order; queries select these columns
+# so each row tuple lines up with the keys.
+APPOINTMENT_FIELDS = tuple(AppointmentRead.model_fields)
+
+
+def _isoformat(value: datetime) -> str:
+    # Pydantic renders a zero UTC offset as "Z"
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return _isoformat(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    """Compact UTF-8 JSON, formatted exactly like FastAPI's JSONResponse."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        obj, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def appointments_json(rows: Iterable[tuple]) -> bytes:
+    """A JSON array of AppointmentRead objects from APPOINTMENT_FIELDS rows."""
+    fields = APPOINTMENT_FIELDS
+    return dumps([dict(zip(fields, row)) for row in rows])
+
+
+def appointments_ndjson(
+    rows: Iterable[tuple], chunk_size: int = 1000
+) -> Iterator[bytes]:
+    """
+    NDJSON lines for APPOINTMENT_FIELDS rows, joined into chunks so a
+    streaming response sends (and hops threads) once per chunk, not per row.
+    """
+    fields = APPOINTMENT_FIELDS
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        yield b"".join(dumps(dict(zip(fields, row))) + b"\n" for row in chunk)
+
+
+# Listing representations selectable through Accept on GET /appointments
+JSON_MEDIA_TYPE = "application/json"
+COLUMNS_MEDIA_TYPE = "application/vnd.columns+json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_ALIASES = (
+    "application/msgpack",
+    "application/x-msgpack",
+    "application/vnd.msgpack",
+)
+
+
+def listing_media_types() -> tuple[str, ...]:
+    """Media types GET /appointments can produce, in server preference order."""
+    types = (JSON_MEDIA_TYPE, COLUMNS_MEDIA_TYPE)
+    return types + (MSGPACK_MEDIA_TYPE,) if msgpack is not None else types
+
+
+def appointments_columns(rows: Iterable[tuple]) -> dict:
+    """
+    Arrays-of-columns shape for APPOINTMENT_FIELDS rows: field names once,
+    then one array per field, so keys are not repeated per row.
+    """
+    rows = list(rows)
+    columns = [list(column) for column in zip(*rows)] if rows else []
+    return {
+        "fields": list(APPOINTMENT_FIELDS),
+        "columns": columns or [[] for _ in APPOINTMENT_FIELDS],
+    }
+
+
+def appointments_columns_json(rows: Iterable[tuple]) -> bytes:
+    return dumps(appointments_columns(rows))
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+
+
+def _timestamp(value: datetime):
+    # Naive values (SQLite) are UTC. Building the Timestamp from the epoch
+    # offset is noticeably faster than msgpack's own datetime conversion.
+    delta = value - (_NAIVE_EPOCH if value.tzinfo is None else _EPOCH)
+    return msgpack.Timestamp(
+        delta.days * 86_400 + delta.seconds, delta.microseconds * 1000
+    )
+
+
+def appointments_msgpack(rows: Iterable[tuple]) -> bytes:
+    """
+    The columnar shape as MessagePack; start_time values use the standard
+    timestamp extension type.
+    """
+    payload = appointments_columns(rows)
+    index = APPOINTMENT_FIELDS.index("start_time")
+    payload["columns"][index] = [_timestamp(v) for v in payload["columns"][index]]
+    return msgpack.packb(payload)
+
+
+def encode_appointments(rows: Iterable[tuple], media_type: str) -> bytes:
+    """Encodes APPOINTMENT_FIELDS rows as one of listing_media_types()."""
+    if media_type == COLUMNS_MEDIA_TYPE:
+        return appointments_columns_json(rows)
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return appointments_msgpack(rows)
+    return appointments_json(rows)
+
+
+_expanded_list = TypeAdapter(List[AppointmentReadExpanded])
+
+
+def expanded_appointments_json(appointments: Iterable, expand: frozenset) -> bytes:
+    """
+    A JSON array of AppointmentRead objects with the relationships named in
+    `expand` ("patient", "doctor") embedded; relations not asked for are
+    left out rather than sent as null.
+    """
+    items = [
+        {
+            **{field: getattr(appt, field) for field in APPOINTMENT_FIELDS},
+            **{name: getattr(appt, name) for name in expand},
+        }
+        for appt in appointments
+    ]
+    return _expanded_list.dump_json(
+        _expanded_list.validate_python(items, from_attributes=True),
+        exclude_unset=True,
+    )
@@ -0,0 +1,204 @@
+"""
+Maintenance and reads for the DailyScheduleSummary rollup.
+
+Booking paths call record_bookings inside their transaction, so the rollup
+commits (or rolls back) together with the appointments it counts. Run
+
+    python -m src.services.summary
+
+to rebuild it from the appointments table, e.g. after loading data behind
+the API's back.
+"""
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from src.models.model import Appointment, DailyScheduleSummary
+from src.services.utils import IN_CLAUSE_CHUNK, as_utc
+
+from collections import defaultdict
+from datetime import date
+from hashlib import blake2b
+from typing import Optional, Sequence
+
+_summary = DailyScheduleSummary.__table__
+
+
+def record_bookings(db: Session, rows: Sequence[dict]) -> None:
+    """
+    Adds freshly inserted appointment rows to the rollup.
+
+    Callers hold the doctors' schedule lock (lock_doctor_schedules), so no
+    other transaction can create the same (doctor, day) row concurrently and
+    update-or-insert is race free without a dialect-specific upsert.
+    """
+    totals = defaultdict(lambda: [0, 0])
+    for row in rows:
+        key = (row["doctor_id"], as_utc(row["start_time"]).date())
+        totals[key][0] += 1
+        totals[key][1] += row["duration"]
+    if not totals:
+        return
+
+    doctor_ids = sorted({doctor_id for doctor_id, _ in totals})
+    days = sorted({day for _, day in totals})
+    # The two IN lists share one statement's bind-parameter budget
+    size = IN_CLAUSE_CHUNK // 2
+    existing = set()
+    for d_lo in range(0, len(doctor_ids), size):
+        for day_lo in range(0, len(days), size):
+            existing.update(
+                db.execute(
+                    select(_summary.c.doctor_id, _summary.c.day).where(
+                        _summary.c.doctor_id.in_(doctor_ids[d_lo : d_lo + size]),
+                        _summary.c.day.in_(days[day_lo : day_lo + size]),
+                    )
+                ).all()
+            )
+    params = [
+        {"k_doctor": d, "k_day": day, "k_count": count, "k_minutes": minutes}
+        for (d, day), (count, minutes) in totals.items()
+    ]
+    updates = [p for p in params if (p["k_doctor"], p["k_day"]) in existing]
+    inserts = [
+        {
+            "doctor_id": p["k_doctor"],
+            "day": p["k_day"],
+            "appointments": p["k_count"],
+            "booked_minutes": p["k_minutes"],
+            "version": 1,
+        }
+        for p in params
+        if (p["k_doctor"], p["k_day"]) not in existing
+    ]
+    if updates:
+        db.execute(
+            update(_summary)
+            .where(
+                _summary.c.doctor_id == bindparam("k_doctor"),
+                _summary.c.day == bindparam("k_day"),
+            )
+            .values(
+                appointments=_summary.c.appointments + bindparam("k_count"),
+                booked_minutes=_summary.c.booked_minutes + bindparam("k_minutes"),
+                version=_summary.c.version + 1,
+            ),
+            updates,
+        )
+    if inserts:
+        db.execute(insert(_summary), inserts)
+
+
+def get_daily_summary(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    doctor_ids: Optional[Sequence[int]] = None,
+) -> list[Row]:
+    """
+    Rollup rows (doctor_id, day, appointments, booked_minutes) for
+    start_date..end_date inclusive, by day then doctor.
+    """
+    stmt = (
+        select(
+            _summary.c.doctor_id,
+            _summary.c.day,
+            _summary.c.appointments,
+            _summary.c.booked_minutes,
+        )
+        .where(_summary.c.day >= start_date, _summary.c.day <= end_date)
+        .order_by(_summary.c.day, _summary.c.doctor_id)
+    )
+    if doctor_ids:
+        stmt = stmt.where(_summary.c.doctor_id.in_(sorted(set(doctor_ids))))
+    return db.execute(stmt).all()
+
+
+def schedule_etag(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    doctor_ids: Optional[Sequence[int]] = None,
+    variant: str = "",
+) -> str:
+    """
+    Strong ETag for an appointment listing over start_date..end_date.
+
+    Every booking bumps its (doctor, day) version in the same transaction,
+    so the listing is unchanged while these rows are. Counts are hashed in
+    too because a rebuild restarts versions at 1. `variant` distinguishes
+    listings of the same days, e.g. the query string of a page.
+    """
+    stmt = (
+        select(
+            _summary.c.doctor_id,
+            _summary.c.day,
+            _summary.c.version,
+            _summary.c.appointments,
+            _summary.c.booked_minutes,
+        )
+        .where(_summary.c.day >= start_date, _summary.c.day <= end_date)
+        .order_by(_summary.c.day, _summary.c.doctor_id)
+    )
+    if doctor_ids:
+        stmt = stmt.where(_summary.c.doctor_id.in_(sorted(set(doctor_ids))))
+    digest = blake2b(variant.encode(), digest_size=12)
+    for row in db.execute(stmt):
+        digest.update(repr(tuple(row)).encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def rebuild_daily_summary(db: Session, batch_size: int = 10_000) -> int:
+    """
+    Recomputes the rollup from the appointments table in one transaction;
+    returns the number of (doctor, day) rows written.
+
+    Appointments stream in (doctor_id, start_time) order, which the
+    doctor/start index serves without a sort, so each (doctor, day) group is
+    contiguous and memory stays at one batch of output rows.
+    """
+    db.execute(delete(DailyScheduleSummary))
+    stmt = (
+        select(Appointment.doctor_id, Appointment.start_time, Appointment.duration)
+        .order_by(Appointment.doctor_id, Appointment.start_time)
+        .execution_options(yield_per=batch_size)
+    )
+    pending: list[dict] = []
+    written = 0
+    current = None
+    for doctor_id, start_time, duration in db.execute(stmt):
+        key = (doctor_id, as_utc(start_time).date())
+        if key != current:
+            if len(pending) >= batch_size:
+                db.execute(insert(_summary), pending)
+                written += len(pending)
+                pending = []
+            current = key
+            pending.append(
+                {
+                    "doctor_id": doctor_id,
+                    "day": key[1],
+                    "appointments": 0,
+                    "booked_minutes": 0,
+                    "version": 1,
+                }
+            )
+        pending[-1]["appointments"] += 1
+        pending[-1]["booked_minutes"] += duration
+    if pending:
+        db.execute(insert(_summary), pending)
+        written += len(pending)
+    db.commit()
+    return written
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.database import get_sessionmaker
+
+    parser = argparse.ArgumentParser(description="Rebuild the daily schedule rollup")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+    with get_sessionmaker()() as session:
+        print(f"{rebuild_daily_summary(session, args.batch_size)} rows rebuilt")
@@ -1,14 +1,28 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from src.models.model import Appointment
+from src.models.model import PHONE_SEPARATORS, Appointment
+from src.schemas.schema import MAX_APPOINTMENT_DURATION
 
+import base64
+import binascii
+import json
+from array import array
+from bisect import bisect_left, bisect_right
 from datetime import datetime, date, timedelta, timezone
 
+# Values per IN (...) list; stays under every dialect's bind-parameter limit.
+IN_CLAUSE_CHUNK = 500
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
 
 def has_overlapping_appointment(
     db: Session,
     doctor_id: int,
     start_time: datetime,
     duration: int,
+    exclude_id: int | None = None,
 ) -> bool:
     """
     Checks if a doctor has an overlapping appointment.
@@ -18,6 +32,7 @@ def has_overlapping_appointment(
         doctor_id: int
         start_time: datetime (aware)
         duration: int (minutes)
+        exclude_id: appointment id to ignore (the row being booked)
 
     Returns:
         True if there is a conflicting appointment, False otherwise.
@@ -28,27 +43,24 @@ def has_overlapping_appointment(
     start_time_utc = start_time.astimezone(timezone.utc)
     end_time_utc = start_time_utc + timedelta(minutes=duration)
 
-    # Fetch all appointments for the doctor and check overlaps in Python.
-    # Doing comparison in Python avoids issues with DB timezone/storage behavior.
-    appointments = (
-        db.query(Appointment).filter(Appointment.doctor_id == doctor_id).all()
+    # Only appointments starting inside the candidate window can overlap: an
+    # existing row starting before start_time - MAX_APPOINTMENT_DURATION has
+    # already ended. The (doctor_id, start_time) index turns this into a range
+    # scan over a handful of rows instead of the doctor's whole history.
+    window_start = start_time_utc - timedelta(minutes=MAX_APPOINTMENT_DURATION)
+    stmt = select(Appointment.start_time, Appointment.duration).where(
+        Appointment.doctor_id == doctor_id,
+        Appointment.start_time > window_start,
+        Appointment.start_time < end_time_utc,
     )
+    if exclude_id is not None:
+        stmt = stmt.where(Appointment.id != exclude_id)
 
-    # Check for overlap
-    for appt in appointments:
-        raw_start = appt.start_time
-        # Make existing_start timezone-aware (assume UTC if missing)
-        if raw_start.tzinfo is None or raw_start.tzinfo.utcoffset(raw_start) is None:
-            existing_start = raw_start.replace(tzinfo=timezone.utc)
-        else:
-            existing_start = raw_start.astimezone(timezone.utc)
-
-        existing_end = existing_start + timedelta(minutes=appt.duration)
-
-        # Debug output for tracing overlap checks during tests
-        print(
-            f"[overlap-check] appt_id={getattr(appt, 'id', None)} existing_start={existing_start.isoformat()} existing_end={existing_end.isoformat()} new_start={start_time_utc.isoformat()} new_end={end_time_utc.isoformat()}"
-        )
+    # The exact end-time comparison runs in Python on the candidates, which
+    # avoids dialect-specific interval arithmetic in SQL.
+    for raw_start, existing_duration in db.execute(stmt):
+        existing_start = as_utc(raw_start)
+        existing_end = existing_start + timedelta(minutes=existing_duration)
 
         # Overlap condition
         if existing_start < end_time_utc and existing_end > start_time_utc:
@@ -57,9 +69,238 @@ def has_overlapping_appointment(
     return False
 
 
+def as_utc(value: datetime) -> datetime:
+    """
+    Returns value as an aware UTC datetime.
+
+    SQLite hands back naive datetimes; those are stored in UTC, so they are
+    tagged rather than converted.
+    """
+    if value.tzinfo is None or value.tzinfo.utcoffset(value) is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
 def day_bounds_utc(target_date: date) -> tuple[datetime, datetime]:
     start = datetime.combine(target_date, datetime.min.time()).replace(
         tzinfo=timezone.utc
     )
     end = start + timedelta(days=1)
     return start, end
+
+
+def epoch_us(value: datetime) -> int:
+    """Converts a datetime (naive values are taken as UTC) to epoch microseconds."""
+    return (as_utc(value) - _EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(value: int) -> datetime:
+    return _EPOCH + value * _MICROSECOND
+
+
+def encode_cursor(start_time: datetime, appointment_id: int) -> str:
+    """Opaque, URL-safe pagination cursor for a (start_time, id) keyset."""
+    raw = f"{epoch_us(start_time)}:{appointment_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError for malformed input."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        micros, appointment_id = raw.decode().split(":")
+        return from_epoch_us(int(micros)), int(appointment_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+def encode_search_cursor(key: tuple) -> str:
+    """Opaque, URL-safe cursor for a search keyset of strings and ints."""
+    raw = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> tuple:
+    """Inverse of encode_search_cursor; raises ValueError for malformed input."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("invalid cursor") from exc
+    if not isinstance(key, list) or not all(isinstance(v, (str, int)) for v in key):
+        raise ValueError("invalid cursor")
+    return tuple(key)
+
+
+def normalize_phone(value: str) -> str:
+    """A phone number as ix_patients_phone stores it (see normalized_phone)."""
+    return "".join(char for char in value if char not in PHONE_SEPARATORS)
+
+
+def appointment_interval(start_time: datetime, duration: int) -> tuple[int, int]:
+    """Returns the half-open [start, end) span of an appointment in epoch us."""
+    start = epoch_us(start_time)
+    return start, start + duration * 60_000_000
+
+
+class IntervalSet:
+    """
+    Disjoint half-open [start, end) intervals kept sorted in parallel arrays.
+
+    Bounds are epoch microseconds (see epoch_us) so the arrays stay compact
+    and bisect compares plain integers.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self) -> None:
+        self.starts = array("q")
+        self.ends = array("q")
+
+    @classmethod
+    def from_intervals(cls, intervals) -> "IntervalSet":
+        """Builds a set from arbitrary intervals, merging overlaps in one sweep."""
+        result = cls()
+        starts, ends = result.starts, result.ends
+        for start, end in sorted(intervals):
+            if ends and start < ends[-1]:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        return result
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlaps(self, start: int, end: int) -> bool:
+        # Intervals [0, i) start before `end`; being disjoint and sorted, the
+        # last of them also ends last, so it is the only one worth checking.
+        i = bisect_left(self.starts, end)
+        return i > 0 and self.ends[i - 1] > start
+
+    def add(self, start: int, end: int) -> None:
+        """Inserts an interval; callers check overlaps() first."""
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+
+    def union(self, start: int, end: int) -> None:
+        """Adds an interval, merging it with any it overlaps or touches."""
+        starts, ends = self.starts, self.ends
+        i = bisect_left(ends, start)  # first interval ending at or after start
+        j = bisect_right(starts, end)  # past the last one starting by end
+        if i < j:
+            start = min(start, starts[i])
+            end = max(end, ends[j - 1])
+            del starts[i:j]
+            del ends[i:j]
+        starts.insert(i, start)
+        ends.insert(i, end)
+
+    def gaps(self, lo: int, hi: int):
+        """Yields the free sub-intervals of [lo, hi) in order (a sorted sweep)."""
+        i = bisect_right(self.ends, lo)  # first interval still running at lo
+        cursor = lo
+        while i < len(self.starts) and self.starts[i] < hi:
+            if self.starts[i] > cursor:
+                yield cursor, self.starts[i]
+            cursor = max(cursor, self.ends[i])
+            i += 1
+        if cursor < hi:
+            yield cursor, hi
+
+
+def bookable_slots(
+    schedule: IntervalSet, lo: int, hi: int, length: int, step: int
+) -> list[tuple[int, int]]:
+    """
+    Slots of `length` inside [lo, hi) that avoid the schedule, with starts on
+    a `step` grid anchored at lo. All values are epoch microseconds.
+    """
+    slots = []
+    for gap_start, gap_end in schedule.gaps(lo, hi):
+        # Round up to the next grid point
+        start = lo + -(-(gap_start - lo) // step) * step
+        while start + length <= gap_end:
+            slots.append((start, start + length))
+            start += step
+    return slots
+
+
+def expand_recurrence(
+    start_time: datetime,
+    freq: str,
+    interval: int = 1,
+    count: int | None = None,
+    until: date | None = None,
+    weekdays=None,
+    max_occurrences: int | None = None,
+) -> list[datetime]:
+    """
+    Occurrences of an RRULE-like series, in order, starting at start_time.
+
+    freq is "daily" or "weekly"; interval counts days or weeks between
+    periods. Weekly series may name weekdays (0 = Monday), RRULE BYDAY style:
+    periods then run Monday to Sunday from start_time's week, and days before
+    start_time in that first week are skipped. The series stops after `count`
+    occurrences or at the end of the `until` day (UTC), whichever is given.
+
+    Every occurrence is computed directly from its period number rather than
+    by stepping from the previous one, so the whole series is one pass.
+    Offsets are whole days in UTC, which keeps the UTC time of day fixed.
+    Raises ValueError when the series has more than max_occurrences.
+    """
+    start = epoch_us(start_time)
+    day = 86_400_000_000
+    if freq == "weekly":
+        step = 7 * interval * day
+        if weekdays:
+            anchor = start - start_time.astimezone(timezone.utc).weekday() * day
+            offsets = [wd * day for wd in sorted(set(weekdays))]
+        else:
+            anchor, offsets = start, [0]
+    elif freq == "daily":
+        step = interval * day
+        anchor, offsets = start, [0]
+    else:
+        raise ValueError(f"unsupported freq {freq!r}")
+
+    if count is not None:
+        # The first period may lose offsets to start_time; one spare covers it
+        periods = -(-count // len(offsets)) + 1
+        limit = None
+    elif until is not None:
+        limit = epoch_us(day_bounds_utc(until)[1])
+        periods = max(0, (limit - anchor) // step + 1)
+    else:
+        raise ValueError("either count or until is required")
+    if max_occurrences is not None:
+        # Every period after the first yields an occurrence, so this many
+        # periods is enough to tell that the series is too long
+        periods = min(periods, max_occurrences + 2)
+
+    occurrences = [
+        at
+        for at in (anchor + p * step + off for p in range(periods) for off in offsets)
+        if at >= start and (limit is None or at < limit)
+    ]
+    if count is not None:
+        occurrences = occurrences[:count]
+    if max_occurrences is not None and len(occurrences) > max_occurrences:
+        raise ValueError(f"series exceeds {max_occurrences} occurrences")
+    return [from_epoch_us(at) for at in occurrences]
+
+
+def overlapping_spans(schedule: IntervalSet, spans) -> list[bool]:
+    """
+    Flags each of `spans` (sorted by start, non-overlapping) that overlaps
+    the schedule, in one merge-style sweep over both.
+    """
+    flags = []
+    i, n = 0, len(schedule)
+    for start, end in spans:
+        while i < n and schedule.ends[i] <= start:
+            i += 1
+        flags.append(i < n and schedule.starts[i] < end)
+    return flags
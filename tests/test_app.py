@@ -2,11 +2,13 @@ import pytest
 from fastapi.testclient import TestClient
 from datetime import datetime, timedelta, timezone
 
+from src.dependencies import MAX_BULK_ITEMS
 from src.main import app
 from src.models.model import Base
 from src.database import engine, SessionLocal
 from src.services import queries as service
 from src.schemas.schema import PatientCreate, DoctorCreate, AppointmentCreate
+from src.services.utils import expand_recurrence
 
 # Ensure a clean DB for these API tests
 Base.metadata.drop_all(bind=engine)
@@ -261,3 +263,897 @@ def test_appointment_service_create(db):
     assert appt.id is not None
     assert appt.doctor_id == doctor.id
     assert appt.patient_id == patient.id
+
+
+def _seed_patient_and_doctor(db):
+    patient = service.create_patient(
+        db,
+        PatientCreate(
+            fname="Over", lname="Lap", email="overlap@example.com", ph_no="1", age=33
+        ),
+    )
+    doctor = service.create_doctor(
+        db, DoctorCreate(full_name="Dr. Window", specialty="Cardiology")
+    )
+    return patient, doctor
+
+
+def test_overlap_check_uses_bounded_window(db):
+    from src.schemas.schema import MAX_APPOINTMENT_DURATION as longest
+    from src.services.utils import has_overlapping_appointment
+
+    patient, doctor = _seed_patient_and_doctor(db)
+    start = (datetime.now(timezone.utc) + timedelta(days=1)).replace(microsecond=0)
+    # A maximum-length appointment must still be found from near its end
+    service.create_appointment(
+        db,
+        AppointmentCreate(
+            patient_id=patient.id,
+            doctor_id=doctor.id,
+            start_time=start,
+            duration=longest,
+        ),
+    )
+
+    assert has_overlapping_appointment(
+        db, doctor.id, start + timedelta(minutes=longest - 10), 15
+    )
+    # Back-to-back slots do not overlap
+    assert not has_overlapping_appointment(
+        db, doctor.id, start + timedelta(minutes=longest), 30
+    )
+    assert not has_overlapping_appointment(
+        db, doctor.id, start - timedelta(minutes=30), 30
+    )
+    # Other doctors are unaffected
+    assert not has_overlapping_appointment(db, doctor.id + 1, start, 30)
+
+
+def test_overlap_check_normalizes_offsets(db):
+    from src.services.utils import has_overlapping_appointment
+
+    patient, doctor = _seed_patient_and_doctor(db)
+    plus_five = timezone(timedelta(hours=5))
+    start = (datetime.now(plus_five) + timedelta(days=1)).replace(microsecond=0)
+    service.create_appointment(
+        db,
+        AppointmentCreate(
+            patient_id=patient.id, doctor_id=doctor.id, start_time=start, duration=60
+        ),
+    )
+
+    same_instant_utc = start.astimezone(timezone.utc)
+    assert has_overlapping_appointment(db, doctor.id, same_instant_utc, 15)
+    assert not has_overlapping_appointment(
+        db, doctor.id, same_instant_utc + timedelta(hours=1), 15
+    )
+
+
+def test_bulk_create_appointments_reports_per_item():
+    patient = client.post(
+        "/patients",
+        json={
+            "fname": "Bulk",
+            "lname": "Import",
+            "email": "bulk@example.com",
+            "ph_no": "5550001111",
+            "age": 52,
+        },
+    ).json()
+    doctor = client.post(
+        "/doctors", json={"full_name": "Dr. Batch", "specialty": "Radiology"}
+    ).json()
+    base = (datetime.now(timezone.utc) + timedelta(days=2)).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    )
+
+    existing = client.post(
+        "/appointments",
+        json={
+            "patient_id": patient["id"],
+            "doctor_id": doctor["id"],
+            "start_time": base.isoformat(),
+            "duration": 60,
+        },
+    )
+    assert existing.status_code == 201
+
+    def item(offset_minutes, duration):
+        return {
+            "patient_id": patient["id"],
+            "doctor_id": doctor["id"],
+            "start_time": (base + timedelta(minutes=offset_minutes)).isoformat(),
+            "duration": duration,
+        }
+
+    resp = client.post(
+        "/appointments/bulk",
+        json=[
+            item(30, 30),  # clashes with the existing appointment
+            item(60, 30),  # starts as the existing one ends
+            item(75, 30),  # clashes with the previous item
+            item(90, 45),
+        ],
+    )
+    assert resp.status_code == 200
+    results = resp.json()
+    assert [r["status"] for r in results] == [
+        "conflict",
+        "created",
+        "conflict",
+        "created",
+    ]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert results[0]["id"] is None
+    created_ids = {r["id"] for r in results if r["status"] == "created"}
+
+    listed = client.get(
+        f"/appointments?date={base.date().isoformat()}&doctor_id={doctor['id']}"
+    ).json()
+    assert created_ids < {a["id"] for a in listed}
+
+
+def test_expand_recurrence_weekly_weekdays():
+    # Wednesday 2030-01-02; Mon/Wed/Fri every other week, Monday skipped at first
+    start = datetime(2030, 1, 2, 9, 0, tzinfo=timezone.utc)
+    days = [
+        d.date().isoformat()
+        for d in expand_recurrence(start, "weekly", 2, count=5, weekdays=[4, 0, 2])
+    ]
+    assert days == [
+        "2030-01-02",
+        "2030-01-04",
+        "2030-01-14",
+        "2030-01-16",
+        "2030-01-18",
+    ]
+    daily = expand_recurrence(start, "daily", 3, until=datetime(2030, 1, 8).date())
+    assert [d.day for d in daily] == [2, 5, 8]
+    assert all(d.hour == 9 for d in daily)
+    with pytest.raises(ValueError):
+        expand_recurrence(
+            start, "daily", until=datetime(2031, 1, 8).date(), max_occurrences=10
+        )
+
+
+def test_recurring_series_is_all_or_nothing():
+    patient = client.post(
+        "/patients",
+        json={
+            "fname": "Series",
+            "lname": "Plan",
+            "email": "series@example.com",
+            "age": 61,
+        },
+    ).json()
+    doctor = client.post(
+        "/doctors", json={"full_name": "Dr. Weekly", "specialty": "Physio"}
+    ).json()
+    base = (datetime.now(timezone.utc) + timedelta(days=3)).replace(
+        hour=10, minute=0, second=0, microsecond=0
+    )
+    existing = client.post(
+        "/appointments",
+        json={
+            "patient_id": patient["id"],
+            "doctor_id": doctor["id"],
+            "start_time": (base + timedelta(days=7, minutes=30)).isoformat(),
+            "duration": 30,
+        },
+    )
+    assert existing.status_code == 201
+
+    series = {
+        "patient_id": patient["id"],
+        "doctor_id": doctor["id"],
+        "reason": "physio",
+        "start_time": base.isoformat(),
+        "duration": 45,
+        "freq": "weekly",
+        "count": 4,
+    }
+    resp = client.post("/appointments/recurring", json=series)
+    assert resp.status_code == 409
+    body = resp.json()
+    assert (body["booked"], body["conflicts"]) == (0, 1)
+    assert [o["status"] for o in body["occurrences"]] == [
+        "available",
+        "conflict",
+        "available",
+        "available",
+    ]
+    listed = client.get(
+        f"/appointments?date={base.date().isoformat()}&doctor_id={doctor['id']}"
+    ).json()
+    assert listed == []
+
+    resp = client.post(
+        "/appointments/recurring", json={**series, "skip_conflicts": True}
+    )
+    assert resp.status_code == 201
+    body = resp.json()
+    assert body["booked"] == 3
+    assert [o["status"] for o in body["occurrences"]] == [
+        "created",
+        "conflict",
+        "created",
+        "created",
+    ]
+    third = body["occurrences"][2]
+    listed = client.get(
+        f"/appointments?date={third['start_time'][:10]}&doctor_id={doctor['id']}"
+    ).json()
+    assert [(a["id"], a["reason"]) for a in listed] == [(third["id"], "physio")]
+
+    # Every occurrence now clashes with the series itself
+    resp = client.post(
+        "/appointments/recurring", json={**series, "skip_conflicts": True}
+    )
+    assert resp.status_code == 409
+    assert resp.json()["conflicts"] == 4
+
+
+def test_recurring_series_validation():
+    base = datetime.now(timezone.utc) + timedelta(days=1)
+    series = {
+        "patient_id": 1,
+        "doctor_id": 1,
+        "start_time": base.isoformat(),
+        "duration": 30,
+        "freq": "daily",
+    }
+    assert client.post("/appointments/recurring", json=series).status_code == 422
+    both = {
+        **series,
+        "count": 3,
+        "until": (base + timedelta(days=5)).date().isoformat(),
+    }
+    assert client.post("/appointments/recurring", json=both).status_code == 422
+    weekdays = {**series, "count": 3, "weekdays": [0]}
+    assert client.post("/appointments/recurring", json=weekdays).status_code == 422
+    too_long = {**series, "until": (base + timedelta(days=800)).date().isoformat()}
+    assert client.post("/appointments/recurring", json=too_long).status_code == 422
+
+
+def test_bulk_create_patients_reports_duplicates():
+    client.post(
+        "/patients",
+        json={
+            "fname": "Roster",
+            "lname": "Existing",
+            "email": "roster.existing@example.com",
+            "ph_no": "5550002222",
+            "age": 61,
+        },
+    )
+
+    def patient(email):
+        return {"fname": "Roster", "lname": "New", "email": email, "age": 20}
+
+    resp = client.post(
+        "/patients/bulk",
+        json=[
+            patient("roster.a@example.com"),
+            patient("roster.existing@example.com"),
+            patient("roster.b@example.com"),
+            patient("roster.a@example.com"),
+        ],
+    )
+    assert resp.status_code == 200
+    results = resp.json()
+    assert [r["status"] for r in results] == [
+        "created",
+        "duplicate",
+        "created",
+        "duplicate",
+    ]
+
+    fetched = client.get(f"/patients/{results[2]['id']}")
+    assert fetched.status_code == 200
+    assert fetched.json()["email"] == "roster.b@example.com"
+    assert fetched.json()["ph_no"] is None
+
+
+def test_bulk_create_doctors():
+    resp = client.post(
+        "/doctors/bulk",
+        json=[
+            {"full_name": "Dr. One", "specialty": "Oncology"},
+            {"full_name": "Dr. Two", "specialty": "Pediatrics", "active": False},
+        ],
+    )
+    assert resp.status_code == 200
+    results = resp.json()
+    assert [r["status"] for r in results] == ["created", "created"]
+    second = client.get(f"/doctors/{results[1]['id']}").json()
+    assert second["full_name"] == "Dr. Two"
+    assert second["active"] is False
+
+    oversized = [{"full_name": "Dr. Many", "specialty": "Bulk"}] * (MAX_BULK_ITEMS + 1)
+    assert client.post("/doctors/bulk", json=oversized).status_code == 422
+
+
+def _book_day(day_offset: int, doctors: int = 2, per_doctor: int = 4):
+    """Books back-to-back slots for fresh doctors; returns (date, doctor ids)."""
+    patient = client.post(
+        "/patients",
+        json={
+            "fname": "Page",
+            "lname": "Walker",
+            "email": f"page{day_offset}@example.com",
+            "age": 47,
+        },
+    ).json()
+    doctor_ids = [
+        r["id"]
+        for r in client.post(
+            "/doctors/bulk",
+            json=[
+                {"full_name": f"Dr. Page {i}", "specialty": "Paging"}
+                for i in range(doctors)
+            ],
+        ).json()
+    ]
+    day = (datetime.now(timezone.utc) + timedelta(days=day_offset)).replace(
+        hour=8, minute=0, second=0, microsecond=0
+    )
+    # Doctors share start times so the id tie-breaker is exercised
+    items = [
+        {
+            "patient_id": patient["id"],
+            "doctor_id": doctor_id,
+            "start_time": (day + timedelta(minutes=30 * slot)).isoformat(),
+            "duration": 30,
+        }
+        for slot in range(per_doctor)
+        for doctor_id in doctor_ids
+    ]
+    results = client.post("/appointments/bulk", json=items).json()
+    assert all(r["status"] == "created" for r in results)
+    return day.date().isoformat(), doctor_ids
+
+
+def test_bulk_inserts_without_returning(monkeypatch):
+    # Dialects, or SQLite builds, without RETURNING insert row by row
+    from sqlalchemy import event
+
+    monkeypatch.setattr(engine.dialect, "insert_returning", False)
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        day, doctor_ids = _book_day(day_offset=43, doctors=2, per_doctor=3)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert not any("RETURNING" in statement for statement in statements)
+    listed = client.get(f"/appointments?date={day}").json()
+    assert sorted(a["doctor_id"] for a in listed) == sorted(doctor_ids * 3)
+    assert client.get(f"/doctors/{doctor_ids[1]}").json()["full_name"] == ("Dr. Page 1")
+
+
+def test_list_appointments_keyset_pagination():
+    day, _ = _book_day(day_offset=20)
+    full = client.get(f"/appointments?date={day}").json()
+    assert len(full) == 8
+
+    pages, cursor = [], None
+    while True:
+        url = f"/appointments?date={day}&limit=3"
+        if cursor:
+            url += f"&cursor={cursor}"
+        resp = client.get(url)
+        assert resp.status_code == 200
+        pages.append(resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert [len(p) for p in pages] == [3, 3, 2]
+    assert [a["id"] for p in pages for a in p] == [a["id"] for a in full]
+
+
+def test_list_appointments_rejects_bad_cursor():
+    today = datetime.now(timezone.utc).date().isoformat()
+    resp = client.get(f"/appointments?date={today}&cursor=not-a-cursor")
+    assert resp.status_code == 400
+
+
+def test_stream_appointments_ndjson():
+    import json
+
+    day, doctor_ids = _book_day(day_offset=21)
+    resp = client.get(f"/appointments/stream?date={day}&doctor_id={doctor_ids[0]}")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert len(rows) == 4
+    assert {r["doctor_id"] for r in rows} == {doctor_ids[0]}
+    assert (
+        rows == client.get(f"/appointments?date={day}&doctor_id={doctor_ids[0]}").json()
+    )
+
+
+@pytest.mark.parametrize("day_offset,encoder", [(22, "orjson"), (23, "json")])
+def test_fast_json_matches_response_model(monkeypatch, day_offset, encoder):
+    from src.services import serialization
+
+    day, doctor_ids = _book_day(day_offset=day_offset)
+    urls = [
+        f"/appointments?date={day}",
+        f"/appointments?date={day}&limit=3",
+        f"/appointments?date={day}&doctor_ids={doctor_ids[1]}",
+        f"/appointments/stream?date={day}",
+    ]
+    expected = [client.get(url) for url in urls]
+
+    monkeypatch.setattr(serialization, "FAST_JSON", True)
+    if encoder == "json":
+        monkeypatch.setattr(serialization, "orjson", None)
+    for url, before in zip(urls, expected):
+        after = client.get(url)
+        assert after.content == before.content
+        assert after.headers.get("X-Next-Cursor") == before.headers.get("X-Next-Cursor")
+        assert after.headers["content-type"] == before.headers["content-type"]
+
+
+def test_conditional_get_patient_and_doctor():
+    patient = client.post(
+        "/patients",
+        json={"fname": "Poll", "lname": "Er", "email": "poll@example.com", "age": 33},
+    ).json()
+    doctor = client.post(
+        "/doctors", json={"full_name": "Dr. Poll", "specialty": "General"}
+    ).json()
+    for path in (f"/patients/{patient['id']}", f"/doctors/{doctor['id']}"):
+        first = client.get(path)
+        etag, modified = first.headers["etag"], first.headers["last-modified"]
+        assert first.status_code == 200 and etag.startswith('"')
+
+        cached = client.get(path, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+        weak = client.get(path, headers={"If-None-Match": f'"x", W/{etag}'})
+        assert weak.status_code == 304
+        assert (
+            client.get(path, headers={"If-Modified-Since": modified}).status_code == 304
+        )
+
+        assert client.get(path, headers={"If-None-Match": '"x"'}).status_code == 200
+        stale = client.get(
+            path, headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}
+        )
+        assert stale.status_code == 200
+        # If-None-Match wins over If-Modified-Since
+        both = client.get(
+            path, headers={"If-None-Match": '"x"', "If-Modified-Since": modified}
+        )
+        assert both.status_code == 200
+
+
+def test_appointment_listing_etag_tracks_bookings():
+    day, doctor_ids = _book_day(24, doctors=2, per_doctor=2)
+    url = f"/appointments?date={day}&doctor_id={doctor_ids[0]}"
+    first = client.get(url)
+    etag = first.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    # Pages of the same day have their own tags
+    assert client.get(url + "&limit=1").headers["etag"] != etag
+
+    # A booking for another doctor leaves this doctor's listing alone
+    start = datetime.fromisoformat(first.json()[-1]["start_time"]).replace(
+        tzinfo=timezone.utc
+    )
+    other = {
+        "patient_id": first.json()[0]["patient_id"],
+        "doctor_id": doctor_ids[1],
+        "start_time": (start + timedelta(hours=2)).isoformat(),
+        "duration": 30,
+    }
+    assert client.post("/appointments", json=other).status_code == 201
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    own = {**other, "doctor_id": doctor_ids[0]}
+    assert client.post("/appointments", json=own).status_code == 201
+    resp = client.get(url, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+    assert len(resp.json()) == 3
+
+
+def test_list_appointments_date_range_and_doctor_ids():
+    first_day, doctors_a = _book_day(day_offset=30, doctors=3, per_doctor=2)
+    second_day, doctors_b = _book_day(day_offset=31, doctors=2, per_doctor=2)
+
+    resp = client.get(
+        f"/appointments?start_date={first_day}&end_date={second_day}"
+        f"&doctor_ids={doctors_a[0]}&doctor_ids={doctors_a[2]}"
+        f"&doctor_ids={doctors_b[1]}"
+    )
+    assert resp.status_code == 200
+    rows = resp.json()
+    assert len(rows) == 6
+    assert {r["doctor_id"] for r in rows} == {doctors_a[0], doctors_a[2], doctors_b[1]}
+    starts = [(r["start_time"], r["id"]) for r in rows]
+    assert starts == sorted(starts)
+
+    # A single doctor_id still works and combines with doctor_ids
+    resp = client.get(
+        f"/appointments?start_date={first_day}&end_date={second_day}"
+        f"&doctor_id={doctors_b[0]}"
+    )
+    assert {r["doctor_id"] for r in resp.json()} == {doctors_b[0]}
+
+
+def test_list_appointments_range_validation():
+    assert client.get("/appointments").status_code == 422
+    assert (
+        client.get(
+            "/appointments?start_date=2030-01-10&end_date=2030-01-09"
+        ).status_code
+        == 422
+    )
+    assert (
+        client.get(
+            "/appointments?start_date=2030-01-01&end_date=2030-03-01"
+        ).status_code
+        == 422
+    )
+    assert (
+        client.get("/appointments?date=2030-01-01&start_date=2030-01-01").status_code
+        == 422
+    )
+
+
+def test_doctor_range_query_uses_index(db):
+    from sqlalchemy import select, text
+
+    from src.models.model import Appointment
+    from src.services.queries import _appointments_in_range
+
+    stmt = select(Appointment).where(
+        _appointments_in_range(
+            datetime(2030, 1, 1).date(), datetime(2030, 1, 7).date(), [1, 2, 3]
+        )
+    )
+    compiled = stmt.compile(db.bind, compile_kwargs={"literal_binds": True})
+    plan = " ".join(
+        row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    )
+    assert "ix_appointments_doctor_start_duration" in plan
+    assert "SCAN" not in plan.replace("SCAN CONSTANT", "")
+
+
+def test_doctor_availability_lists_free_slots():
+    patient = client.post(
+        "/patients",
+        json={
+            "fname": "Slot",
+            "lname": "Seeker",
+            "email": "slot@example.com",
+            "age": 38,
+        },
+    ).json()
+    doctors = client.post(
+        "/doctors/bulk",
+        json=[
+            {"full_name": "Dr. Free", "specialty": "Availability"},
+            {"full_name": "Dr. Busy", "specialty": "Availability"},
+            {"full_name": "Dr. Away", "specialty": "Availability", "active": False},
+        ],
+    ).json()
+    free_id, busy_id, away_id = (d["id"] for d in doctors)
+    day = (datetime.now(timezone.utc) + timedelta(days=5)).date()
+    ten = datetime(day.year, day.month, day.day, 10, tzinfo=timezone.utc)
+    client.post(
+        "/appointments",
+        json={
+            "patient_id": patient["id"],
+            "doctor_id": busy_id,
+            "start_time": ten.isoformat(),
+            "duration": 60,
+        },
+    )
+
+    resp = client.get(
+        f"/doctors/{busy_id}/availability?date={day.isoformat()}"
+        "&duration=30&step=30&day_start=09:00&day_end=12:00"
+    )
+    assert resp.status_code == 200
+    starts = [s["start_time"][11:16] for s in resp.json()["slots"]]
+    assert starts == ["09:00", "09:30", "11:00", "11:30"]
+
+    resp = client.get(
+        f"/availability?date={day.isoformat()}&duration=60&step=60"
+        "&specialty=Availability&day_start=09:00&day_end=12:00"
+    )
+    by_doctor = {a["doctor_id"]: len(a["slots"]) for a in resp.json()}
+    assert by_doctor == {free_id: 3, busy_id: 2}
+
+    away = client.get(f"/doctors/{away_id}/availability?date={day.isoformat()}")
+    assert away.json()["slots"] == []
+    assert client.get(f"/doctors/999999/availability?date={day}").status_code == 404
+
+
+def test_availability_search_is_capped_and_chunked(monkeypatch):
+    doctors = client.post(
+        "/doctors/bulk",
+        json=[{"full_name": f"Dr. {i}", "specialty": "Capped"} for i in range(3)],
+    ).json()
+    ids = [d["id"] for d in doctors]
+    day = (datetime.now(timezone.utc) + timedelta(days=6)).date()
+    query = f"/availability?date={day}&specialty=Capped"
+
+    # Id filters spanning several IN lists find every doctor
+    monkeypatch.setattr(service, "IN_CLAUSE_CHUNK", 2)
+    resp = client.get(query + "".join(f"&doctor_ids={i}" for i in ids))
+    assert [a["doctor_id"] for a in resp.json()] == ids
+
+    monkeypatch.setattr("src.dependencies.MAX_AVAILABILITY_DOCTORS", 2)
+    resp = client.get(query)
+    assert resp.status_code == 422
+    assert "narrow the search" in resp.json()["detail"]
+
+
+def _count_queries(fn):
+    from sqlalchemy import event
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return result, len(statements)
+
+
+def test_expanded_listing_query_count_is_constant():
+    small_day, _ = _book_day(day_offset=40, doctors=1, per_doctor=1)
+    large_day, large_doctors = _book_day(day_offset=41, doctors=6, per_doctor=8)
+
+    small, small_queries = _count_queries(
+        lambda: client.get(f"/appointments?date={small_day}&expand=patient,doctor")
+    )
+    large, large_queries = _count_queries(
+        lambda: client.get(f"/appointments?date={large_day}&expand=patient,doctor")
+    )
+    assert len(small.json()) == 1 and len(large.json()) == 48
+    assert small_queries == large_queries == 1
+
+    plain = client.get(f"/appointments?date={large_day}").json()
+    for row, expanded in zip(plain, large.json()):
+        assert expanded["patient"]["id"] == row["patient_id"]
+        assert expanded["doctor"]["id"] == row["doctor_id"]
+        assert {k: expanded[k] for k in row} == row
+    assert "etag" not in large.headers
+
+    only_doctor = client.get(f"/appointments?date={large_day}&expand=doctor").json()
+    assert "patient" not in only_doctor[0]
+    assert only_doctor[0]["doctor"]["full_name"].startswith("Dr. Page")
+
+    paged = client.get(f"/appointments?date={large_day}&expand=patient&limit=5")
+    assert len(paged.json()) == 5 and "x-next-cursor" in paged.headers
+
+    assert client.get(f"/appointments?date={large_day}&expand=nurse").status_code == 422
+    assert (
+        client.get(
+            f"/appointments?date={large_day}&expand=doctor",
+            headers={"Accept": "application/vnd.columns+json"},
+        ).status_code
+        == 406
+    )
+
+    doctor, doctor_queries = _count_queries(
+        lambda: client.get(f"/doctors/{large_doctors[0]}?expand=appointments")
+    )
+    assert doctor_queries == 2
+    appointments = doctor.json()["appointments"]
+    assert [a["start_time"] for a in appointments] == sorted(
+        a["start_time"] for a in appointments
+    )
+    assert len(appointments) == 8
+    assert "appointments" not in client.get(f"/doctors/{large_doctors[0]}").json()
+
+    patient_id = plain[0]["patient_id"]
+    patient = client.get(f"/patients/{patient_id}?expand=appointments").json()
+    assert len(patient["appointments"]) == 48
+    assert patient["appointments_next"] is None
+
+
+def test_expanded_appointments_are_capped(monkeypatch):
+    _, doctors = _book_day(day_offset=42, doctors=1, per_doctor=8)
+    monkeypatch.setattr(service, "EXPANDED_APPOINTMENTS_LIMIT", 3)
+
+    doctor = client.get(f"/doctors/{doctors[0]}?expand=appointments").json()
+    starts = [a["start_time"] for a in doctor["appointments"]]
+    assert len(starts) == 3 and starts == sorted(starts)
+
+    patient_id = doctor["appointments"][0]["patient_id"]
+    patient = client.get(f"/patients/{patient_id}?expand=appointments").json()
+    embedded = patient["appointments"]
+    assert len(embedded) == 3
+    # The link continues the timeline just before the oldest embedded entry
+    older = client.get(patient["appointments_next"]).json()
+    assert older and older[0]["start_time"] < embedded[0]["start_time"]
+
+
+def test_patient_search_by_name_email_and_phone():
+    roster = [
+        ("Ada", "Searchwell", "(555) 010-2030"),
+        ("bob", "searchwell", "555-010-2031"),
+        ("Cy", "Searchwell", None),
+        ("Dee", "Searchmore", "5550102030"),
+        ("Eve", "Seashore", None),
+    ]
+    resp = client.post(
+        "/patients/bulk",
+        json=[
+            {
+                "fname": fname,
+                "lname": lname,
+                "email": f"{fname.lower()}.search@example.com",
+                "ph_no": phone,
+                "age": 40,
+            }
+            for fname, lname, phone in roster
+        ],
+    )
+    assert all(r["status"] == "created" for r in resp.json())
+
+    names = client.get("/patients/search?last_name=SEARCH").json()
+    assert [p["fname"] for p in names] == ["Dee", "Ada", "bob", "Cy"]
+    narrowed = client.get("/patients/search?last_name=searchw&first_name=B").json()
+    assert [p["fname"] for p in narrowed] == ["bob"]
+
+    pages, cursor = [], None
+    while True:
+        url = "/patients/search?last_name=sea&limit=2"
+        resp = client.get(url + (f"&cursor={cursor}" if cursor else ""))
+        pages.append([p["fname"] for p in resp.json()])
+        cursor = resp.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert pages == [["Dee", "Ada"], ["bob", "Cy"], ["Eve"]]
+
+    by_email = client.get("/patients/search?email=cy.search@example.com").json()
+    assert [p["fname"] for p in by_email] == ["Cy"]
+    by_phone = client.get("/patients/search", params={"phone": "555.010.2030"}).json()
+    assert [p["fname"] for p in by_phone] == ["Ada", "Dee"]
+
+    assert client.get("/patients/search").status_code == 422
+    assert client.get("/patients/search?first_name=Ada").status_code == 422
+    assert client.get("/patients/search?phone=--").status_code == 422
+    assert client.get("/patients/search?email=a@b.c&last_name=Sea").status_code == 422
+    assert client.get("/patients/search?email=x@y.z&cursor=!!").status_code == 400
+
+
+@pytest.mark.parametrize(
+    "search, index",
+    [
+        ({"last_name": "sm"}, "ix_patients_name"),
+        ({"last_name": "sm", "first_name": "j"}, "ix_patients_name"),
+        ({"phone": "555 010"}, "ix_patients_phone"),
+        ({"email": "a@example.com"}, "sqlite_autoindex_umar_patients_table"),
+    ],
+)
+def test_patient_search_uses_index(db, search, index):
+    from sqlalchemy import text
+
+    from src.services.queries import _patient_search_query
+
+    search = {
+        "last_name": None,
+        "first_name": None,
+        "email": None,
+        "phone": None,
+        **search,
+    }
+    after = ("sm", "j", 7) if search["last_name"] else (7,)
+    for stmt in (
+        _patient_search_query(**search, after=None),
+        _patient_search_query(**search, after=after),
+    ):
+        compiled = stmt.limit(21).compile(
+            db.bind, compile_kwargs={"literal_binds": True}
+        )
+        plan = " ".join(
+            row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+        )
+        # Served from the index in result order: no table scan, no sort
+        assert index in plan
+        assert "SCAN" not in plan
+        assert "TEMP B-TREE" not in plan
+
+
+def test_patient_appointment_timeline():
+    patient = client.post(
+        "/patients",
+        json={"fname": "Tim", "lname": "Line", "email": "tim@example.com", "age": 61},
+    ).json()
+    doctors = client.post(
+        "/doctors/bulk",
+        json=[{"full_name": f"Dr. Time {i}", "specialty": "Chronic"} for i in range(2)],
+    ).json()
+    base = (datetime.now(timezone.utc) + timedelta(days=50)).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    )
+    # Two same-time visits per day exercise the id tie-breaker
+    items = [
+        {
+            "patient_id": patient["id"],
+            "doctor_id": doctor["id"],
+            "start_time": (base + timedelta(days=day)).isoformat(),
+            "duration": 30,
+        }
+        for day in range(5)
+        for doctor in doctors
+    ]
+    created = client.post("/appointments/bulk", json=items).json()
+    assert all(r["status"] == "created" for r in created)
+
+    url = f"/patients/{patient['id']}/appointments"
+    full = client.get(url).json()
+    keys = [(a["start_time"], a["id"]) for a in full]
+    assert len(full) == 10 and keys == sorted(keys, reverse=True)
+
+    pages, cursor = [], None
+    while True:
+        resp = client.get(url, params={"limit": 3, "cursor": cursor})
+        pages.append(resp.json())
+        cursor = resp.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert [len(p) for p in pages] == [3, 3, 3, 1]
+    assert [a for page in pages for a in page] == full
+
+    day1 = (base + timedelta(days=1)).date().isoformat()
+    day2 = (base + timedelta(days=2)).date().isoformat()
+    ranged = client.get(url, params={"start_date": day1, "end_date": day2}).json()
+    assert [a["start_time"][:10] for a in ranged] == [day2, day2, day1, day1]
+    assert (
+        client.get(url, params={"start_date": day2, "end_date": day1}).status_code
+        == 422
+    )
+
+    empty = client.get(url, params={"end_date": "2000-01-01"})
+    assert (empty.status_code, empty.json()) == (200, [])
+    assert client.get("/patients/99999/appointments").status_code == 404
+
+
+def test_patient_timeline_uses_index(db):
+    from sqlalchemy import event
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.bind, "before_cursor_execute", capture)
+    try:
+        service.get_patient_appointments(
+            db, 1, datetime(2030, 1, 1).date(), None, limit=20
+        )
+        service.get_patient_appointments(
+            db, 1, None, None, limit=20, before=(datetime(2030, 1, 1), 10)
+        )
+    finally:
+        event.remove(db.bind, "before_cursor_execute", capture)
+    assert len(statements) == 2
+    for statement, parameters in statements:
+        plan = " ".join(
+            row[-1]
+            for row in db.connection().exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+        )
+        # Walked backwards along the index: no scan, no sort
+        assert "ix_appointments_patient_start_id" in plan
+        assert "SCAN" not in plan
+        assert "TEMP B-TREE" not in plan
@@ -0,0 +1,150 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.async_api import router
+from src.database import get_async_db, to_async_url
+from src.replicas import get_async_read_db
+from src.models.model import Base
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    url = f"sqlite:///{tmp_path_factory.mktemp('async') / 'async.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+
+    async_engine = create_async_engine(to_async_url(url))
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+    # Entering the context keeps one event loop for the pooled connections
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_to_async_url_maps_drivers():
+    assert str(to_async_url("sqlite:///./test.db")) == "sqlite+aiosqlite:///./test.db"
+    assert to_async_url("postgresql://u@h/db").drivername == "postgresql+asyncpg"
+
+
+def test_async_patient_and_doctor_round_trip(client):
+    patient = client.post(
+        "/patients",
+        json={"fname": "Async", "lname": "Io", "email": "async@example.com", "age": 29},
+    )
+    assert patient.status_code == 201
+    fetched = client.get(f"/patients/{patient.json()['id']}")
+    assert fetched.json()["email"] == "async@example.com"
+    revalidated = client.get(
+        f"/patients/{patient.json()['id']}",
+        headers={"If-None-Match": fetched.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+    found = client.get("/patients/search?last_name=i&first_name=async").json()
+    assert [p["id"] for p in found] == [patient.json()["id"]]
+    assert client.get(f"/patients/{patient.json()['id']}/appointments").json() == []
+    assert client.get("/patients/9999/appointments").status_code == 404
+
+    duplicate = client.post(
+        "/patients",
+        json={"fname": "Async", "lname": "Io", "email": "async@example.com", "age": 29},
+    )
+    assert duplicate.status_code == 400
+
+    doctor = client.post("/doctors", json={"full_name": "Dr. Loop", "specialty": "Io"})
+    assert client.get(f"/doctors/{doctor.json()['id']}").json() == doctor.json()
+    assert client.get("/doctors/9999").status_code == 404
+
+
+def test_async_booking_listing_and_stream(client):
+    patient = client.post(
+        "/patients",
+        json={
+            "fname": "Async",
+            "lname": "Booker",
+            "email": "ab@example.com",
+            "age": 41,
+        },
+    ).json()
+    doctor = client.post(
+        "/doctors", json={"full_name": "Dr. Await", "specialty": "Io"}
+    ).json()
+    start = (datetime.now(timezone.utc) + timedelta(days=3)).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    )
+    body = {
+        "patient_id": patient["id"],
+        "doctor_id": doctor["id"],
+        "start_time": start.isoformat(),
+        "duration": 60,
+    }
+    assert client.post("/appointments", json=body).status_code == 201
+    assert client.post("/appointments", json=body).status_code == 409
+
+    day = start.date().isoformat()
+    listing = client.get(f"/appointments?date={day}&doctor_id={doctor['id']}")
+    listed = listing.json()
+    assert len(listed) == 1
+    assert (
+        client.get(
+            f"/appointments?date={day}&doctor_id={doctor['id']}",
+            headers={"If-None-Match": listing.headers["etag"]},
+        ).status_code
+        == 304
+    )
+    streamed = client.get(f"/appointments/stream?date={day}")
+    assert [json.loads(line) for line in streamed.text.splitlines()] == listed
+    expanded = client.get(f"/appointments?date={day}&expand=patient,doctor").json()
+    assert expanded[0]["doctor"]["id"] == doctor["id"]
+    assert expanded[0]["patient"]["id"] == listed[0]["patient_id"]
+    embedded = client.get(f"/doctors/{doctor['id']}?expand=appointments").json()
+    assert embedded["appointments"] == listed
+
+    availability = client.get(
+        f"/doctors/{doctor['id']}/availability?date={day}"
+        "&duration=60&step=60&day_start=09:00&day_end=11:00"
+    ).json()
+    assert [s["start_time"][11:16] for s in availability["slots"]] == ["10:00"]
+
+    series = {**body, "freq": "daily", "count": 3}
+    resp = client.post("/appointments/recurring", json=series)
+    assert resp.status_code == 409
+    assert [o["status"] for o in resp.json()["occurrences"]] == [
+        "conflict",
+        "available",
+        "available",
+    ]
+    resp = client.post(
+        "/appointments/recurring", json={**series, "skip_conflicts": True}
+    )
+    assert (resp.status_code, resp.json()["booked"]) == (201, 2)
+
+
+def test_async_fast_json_matches_response_model(client, monkeypatch):
+    from src.services import serialization
+
+    day = (datetime.now(timezone.utc) + timedelta(days=3)).date().isoformat()
+    urls = [
+        f"/appointments?date={day}",
+        f"/appointments?date={day}&limit=1",
+        f"/appointments/stream?date={day}",
+    ]
+    expected = [client.get(url).content for url in urls]
+    assert expected[0] != b"[]"
+
+    monkeypatch.setattr(serialization, "FAST_JSON", True)
+    assert [client.get(url).content for url in urls] == expected
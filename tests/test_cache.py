@@ -0,0 +1,75 @@
+from fastapi.testclient import TestClient
+
+from src.database import engine
+from src.main import app
+from src.models.model import Base
+from src.services.cache import TTLCache, doctor_cache
+
+Base.metadata.create_all(bind=engine)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_and_counters():
+    cache = TTLCache(maxsize=2, ttl=60, clock=FakeClock())
+    cache.set(1, b"one")
+    cache.set(2, b"two")
+    assert cache.get(1) == b"one"  # 1 becomes most recently used
+    cache.set(3, b"three")  # evicts 2
+
+    assert cache.get(2) is None
+    assert cache.get(3) == b"three"
+    assert cache.stats() == {
+        "size": 2,
+        "maxsize": 2,
+        "hits": 2,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("k", b"v")
+    clock.now = 4.9
+    assert cache.get("k") == b"v"
+    clock.now = 5.0
+    assert cache.get("k") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_get_or_load_skips_none_and_zero_size_disables():
+    cache = TTLCache(maxsize=10, ttl=5)
+    assert cache.get_or_load("missing", lambda: None) is None
+    assert cache.get_or_load("missing", lambda: b"late") == b"late"
+    assert cache.get_or_load("missing", lambda: b"ignored") == b"late"
+
+    disabled = TTLCache(maxsize=0, ttl=5)
+    disabled.set("k", b"v")
+    assert disabled.get("k") is None
+
+
+def test_doctor_reads_are_served_from_cache():
+    client = TestClient(app)
+    doctor = client.post(
+        "/doctors", json={"full_name": "Dr. Cached", "specialty": "Memory"}
+    ).json()
+
+    before = doctor_cache.stats()
+    first = client.get(f"/doctors/{doctor['id']}")
+    second = client.get(f"/doctors/{doctor['id']}")
+    after = doctor_cache.stats()
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json() == doctor
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
+    stats = client.get("/cache/stats").json()
+    assert stats["doctors"]["hits"] == after["hits"]
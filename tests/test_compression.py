@@ -0,0 +1,139 @@
+import gzip
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.compression import negotiate_encoding
+from src.database import get_db
+from src.main import app
+from src.replicas import get_read_db
+from src.models.model import Base, Doctor, Patient
+from src.schemas.schema import AppointmentCreate
+from src.services import queries as service
+
+
+def test_negotiate_encoding(monkeypatch):
+    monkeypatch.setattr("src.compression.brotli", None)
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("br") is None
+    assert negotiate_encoding("*") == "gzip"
+    assert negotiate_encoding("gzip;q=0, *;q=1") is None
+    assert negotiate_encoding("identity") is None
+
+    monkeypatch.setattr("src.compression.brotli", object())
+    assert negotiate_encoding("gzip, br") == "br"
+    assert negotiate_encoding("gzip, br;q=0.5") == "gzip"
+
+
+@pytest.fixture
+def client(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'compression.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(Patient(fname="Z", lname="Ip", email="z@example.com", age=30))
+        db.add_all(Doctor(full_name=f"Dr. {i}", specialty="Zip") for i in range(3))
+        db.commit()
+        base = (datetime.now(timezone.utc) + timedelta(days=2)).replace(
+            hour=8, minute=0, second=0, microsecond=0
+        )
+        service.create_appointments_bulk(
+            db,
+            [
+                AppointmentCreate(
+                    patient_id=1,
+                    doctor_id=1 + i % 3,
+                    reason="check-up",
+                    start_time=base + timedelta(minutes=30 * (i // 3)),
+                    duration=30,
+                )
+                for i in range(60)
+            ],
+        )
+
+    def override_get_db():
+        with Session() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    try:
+        yield TestClient(app), base.date().isoformat()
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_read_db, None)
+        engine.dispose()
+
+
+def test_large_responses_are_gzipped(client):
+    client, day = client
+    plain = client.get(
+        f"/appointments?date={day}", headers={"Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in plain.headers
+
+    resp = client.get(f"/appointments?date={day}", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["vary"] == "Accept, Accept-Encoding"
+    assert resp.json() == plain.json()
+    assert int(resp.headers["content-length"]) < len(plain.content) / 4
+    # The compressed variant carries a weak tag that still revalidates
+    assert resp.headers["etag"] == "W/" + plain.headers["etag"]
+    cached = client.get(
+        f"/appointments?date={day}",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": resp.headers["etag"]},
+    )
+    assert cached.status_code == 304
+    assert "content-encoding" not in cached.headers
+
+    # Below the threshold nothing changes
+    small = client.get("/doctors/1", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_streamed_responses_are_compressed_incrementally(client):
+    client, day = client
+    with client.stream(
+        "GET", f"/appointments/stream?date={day}", headers={"Accept-Encoding": "gzip"}
+    ) as resp:
+        assert resp.headers["content-encoding"] == "gzip"
+        assert "content-length" not in resp.headers
+        raw = b"".join(resp.iter_raw())
+    assert len(gzip.decompress(raw).splitlines()) == 60
+
+
+def test_listing_formats_follow_accept(client):
+    client, day = client
+    url = f"/appointments?date={day}"
+    rows = client.get(url).json()
+    fields = list(rows[0])
+
+    columns = client.get(url, headers={"Accept": "application/vnd.columns+json"})
+    assert columns.headers["content-type"] == "application/vnd.columns+json"
+    body = columns.json()
+    assert body["fields"] == fields
+    assert [dict(zip(fields, row)) for row in zip(*body["columns"])] == rows
+
+    assert client.get(url, headers={"Accept": "text/csv"}).status_code == 406
+    assert client.get(url, headers={"Accept": "*/*"}).json() == rows
+
+    msgpack = pytest.importorskip("msgpack")
+    packed = client.get(url, headers={"Accept": "application/x-msgpack"})
+    assert packed.headers["content-type"] == "application/msgpack"
+    body = msgpack.unpackb(packed.content, timestamp=3)
+    assert body["fields"] == fields
+    assert body["columns"][0] == [r["id"] for r in rows]
+    starts = body["columns"][fields.index("start_time")]
+    assert starts[0] == datetime.fromisoformat(rows[0]["start_time"]).replace(
+        tzinfo=timezone.utc
+    )
+
+    # Each representation has its own tag
+    assert len({r.headers["etag"] for r in (columns, packed)}) == 2
+    preferred = client.get(
+        url, headers={"Accept": "application/json;q=0.5, application/msgpack"}
+    )
+    assert preferred.headers["content-type"] == "application/msgpack"
@@ -0,0 +1,148 @@
+import random
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from src.database import build_engine
+from src.models.model import Appointment, Base, Doctor, Patient
+from src.schemas.schema import AppointmentCreate, PatientCreate
+from src.services import queries as service
+from src.services.schedule_index import schedule_index
+from src.services.utils import as_utc
+
+
+def _overlaps(rows) -> int:
+    """Counts overlapping neighbours per doctor in (doctor_id, start, duration)."""
+    count = 0
+    last_end = {}
+    for doctor_id, start, duration in sorted(rows):
+        start = as_utc(start)
+        if doctor_id in last_end and start < last_end[doctor_id]:
+            count += 1
+        end = start + timedelta(minutes=duration)
+        last_end[doctor_id] = max(end, last_end.get(doctor_id, end))
+    return count
+
+
+@pytest.mark.parametrize(
+    "profile,indexed", [("default", False), ("tuned", False), ("default", True)]
+)
+def test_concurrent_bookings_never_double_book(tmp_path, profile, indexed):
+    engine = build_engine(f"sqlite:///{tmp_path / 'race.db'}", profile=profile)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(Patient(fname="R", lname="C", email="r@example.com", ph_no="1", age=9))
+        db.add_all(Doctor(full_name=f"Dr. {i}", specialty="Race") for i in range(3))
+        db.commit()
+        if indexed:
+            schedule_index.warm(db)
+
+    base = (datetime.now(timezone.utc) + timedelta(days=1)).replace(
+        minute=0, second=0, microsecond=0
+    )
+    threads, attempts = 8, 60
+    outcomes = {"created": 0, "conflict": 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        barrier.wait()
+        with Session() as db:
+            for _ in range(attempts):
+                # Start times on a 15 minute grid with 30-60 minute durations
+                # keep almost every request in conflict with another thread.
+                payload = AppointmentCreate(
+                    patient_id=1,
+                    doctor_id=rng.randint(1, 3),
+                    start_time=base + timedelta(minutes=15 * rng.randrange(16)),
+                    duration=rng.choice([30, 45, 60]),
+                )
+                try:
+                    service.create_appointment(db, payload)
+                    key = "created"
+                except HTTPException as exc:
+                    assert exc.status_code == 409
+                    key = "conflict"
+                with lock:
+                    outcomes[key] += 1
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    with Session() as db:
+        rows = db.execute(
+            select(Appointment.doctor_id, Appointment.start_time, Appointment.duration)
+        ).all()
+    engine.dispose()
+    schedule_index.reset()
+
+    assert outcomes["created"] + outcomes["conflict"] == threads * attempts
+    assert outcomes["created"] == len(rows)
+    assert outcomes["conflict"] > 0
+    assert _overlaps(rows) == 0
+
+
+def test_only_lock_failures_are_retried(monkeypatch):
+    monkeypatch.setattr(service, "BOOKING_RETRY_BACKOFF", 0)
+    calls = []
+
+    class FakeSession:
+        def rollback(self):
+            pass
+
+    def failing(message):
+        def book(db, row):
+            calls.append(row)
+            raise OperationalError("INSERT ...", {}, sqlite3.OperationalError(message))
+
+        return book
+
+    with pytest.raises(OperationalError):
+        service._with_booking_retries(FakeSession(), failing("database is locked"), 1)
+    assert len(calls) == service.BOOKING_ATTEMPTS
+
+    calls.clear()
+    with pytest.raises(OperationalError):
+        service._with_booking_retries(FakeSession(), failing("no such table: x"), 1)
+    assert len(calls) == 1
+
+
+def test_bulk_patients_retry_only_email_conflicts(monkeypatch):
+    calls = []
+
+    class FakeSession:
+        def rollback(self):
+            pass
+
+    def failing(message):
+        def insert(db, rows):
+            calls.append(rows)
+            raise IntegrityError("INSERT ...", {}, sqlite3.IntegrityError(message))
+
+        return insert
+
+    items = [PatientCreate(fname="B", lname="Ulk", email="b@example.com", age=30)]
+    taken = "UNIQUE constraint failed: umar_patients_table.email"
+    monkeypatch.setattr(service, "_insert_patients_bulk", failing(taken))
+    with pytest.raises(IntegrityError):
+        service.create_patients_bulk(FakeSession(), items)
+    assert len(calls) == service.BULK_INSERT_ATTEMPTS
+
+    calls.clear()
+    other = "NOT NULL constraint failed: umar_patients_table.age"
+    monkeypatch.setattr(service, "_insert_patients_bulk", failing(other))
+    with pytest.raises(HTTPException) as exc_info:
+        service.create_patients_bulk(FakeSession(), items)
+    assert exc_info.value.status_code == 400
+    assert len(calls) == 1
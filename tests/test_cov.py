@@ -11,6 +11,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import Session
 from sqlalchemy.engine.base import Engine
 from src.database import SessionLocal
+from src.replicas import get_read_db
 
 # ----------------------------
 # Setup Test DB
@@ -27,6 +28,7 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 
 # Create tables once for tests
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import text
+
+from src import database
+from src.database import build_engine, engine_settings
+
+
+def test_pool_options_follow_environment(monkeypatch):
+    monkeypatch.setattr(database, "DB_POOL_SIZE", "7")
+    monkeypatch.setattr(database, "DB_MAX_OVERFLOW", "3")
+    monkeypatch.setattr(database, "DB_POOL_RECYCLE", "1800")
+    monkeypatch.setattr(database, "DB_POOL_PRE_PING", True)
+
+    assert database.pool_options() == {
+        "pool_pre_ping": True,
+        "pool_size": 7,
+        "max_overflow": 3,
+        "pool_recycle": 1800,
+    }
+
+
+def test_tuned_sqlite_profile_sets_pragmas(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'tuned.db'}", profile="tuned")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        # synchronous=NORMAL
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+    settings = engine_settings(engine, "tuned")
+    assert settings["pool"] == "QueuePool"
+    assert (settings["size"], settings["max_overflow"]) == (5, 10)
+    assert (settings["pre_ping"], settings["recycle"]) == (False, -1)
+    assert settings["pragmas"]["journal_mode"] == "WAL"
+    engine.dispose()
+
+
+def test_unknown_sqlite_profile_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        build_engine(f"sqlite:///{tmp_path / 'x.db'}", profile="turbo")
+
+
+def test_engine_is_created_at_startup_not_import(tmp_path):
+    script = (
+        "from fastapi.testclient import TestClient\n"
+        "import src.main\n"
+        "from src import database\n"
+        "assert database._engine is None\n"
+        "with TestClient(src.main.app) as client:\n"
+        "    assert database._engine is not None\n"
+        "    assert client.get('/health').status_code == 200\n"
+        "assert database.engine is database.get_engine()\n"
+        "assert database.SessionLocal is database.get_sessionmaker()\n"
+    )
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'lazy.db'}"}
+    done = subprocess.run(
+        [sys.executable, "-c", script], env=env, capture_output=True, text=True
+    )
+    assert done.returncode == 0, done.stderr
+    # Nothing printed on import any more
+    assert done.stdout == ""
+    # With logging left unconfigured, as under uvicorn, settings still show
+    assert "src.database: Database engine settings" in done.stderr
+
+
+def test_async_engine_is_disposed(tmp_path, monkeypatch):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'async.db'}"
+    monkeypatch.setattr(
+        database, "_async_sessionmaker", database.build_async_sessionmaker(url)
+    )
+
+    async def scenario():
+        async with database.get_async_sessionmaker()() as db:
+            await db.execute(text("SELECT 1"))
+        pool = database.get_async_sessionmaker().kw["bind"].pool
+        assert pool.checkedin() == 1
+        await database.dispose_async_engine()
+        return database.get_async_sessionmaker().kw["bind"].pool.checkedin()
+
+    assert asyncio.run(scenario()) == 0
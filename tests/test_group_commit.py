@@ -0,0 +1,161 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database import build_engine, to_async_url
+from src.models.model import Appointment, Base, Doctor, Patient
+from src.schemas.schema import AppointmentCreate, DoctorCreate, PatientCreate
+from src.services import async_queries
+from src.services import queries as service
+from src.services.group_commit import AsyncGroupCommitter, GroupCommitter
+
+
+@pytest.fixture
+def Session(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'group.db'}")
+    Base.metadata.create_all(engine)
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+    factory = sessionmaker(bind=engine)
+    factory.commits = commits
+    yield factory
+    engine.dispose()
+
+
+def _patient(i: int, email: str | None = None) -> PatientCreate:
+    return PatientCreate(
+        fname="Group",
+        lname=f"Commit{i}",
+        email=email or f"group{i}@example.com",
+        age=30,
+    )
+
+
+def _concurrently(Session, create, payloads) -> list:
+    """Runs create(db, payload) for every payload at once; results or errors."""
+    barrier = threading.Barrier(len(payloads))
+
+    def call(payload):
+        barrier.wait()
+        with Session() as db:
+            try:
+                return create(db, payload)
+            except HTTPException as exc:
+                return exc
+
+    with ThreadPoolExecutor(len(payloads)) as pool:
+        return list(pool.map(call, payloads))
+
+
+def _batched(monkeypatch, name: str, size: int) -> GroupCommitter:
+    committer = GroupCommitter(
+        getattr(service, name).run_batch, window_ms=1000, max_batch=size
+    )
+    monkeypatch.setattr(service, name, committer)
+    return committer
+
+
+def test_concurrent_creates_share_one_commit(Session, monkeypatch):
+    patients = _batched(monkeypatch, "patient_writes", 6)
+    payloads = [_patient(i) for i in range(5)] + [_patient(9, "group1@example.com")]
+    results = _concurrently(Session, service.create_patient, payloads)
+
+    assert patients.stats() == {"batches": 1, "items": 6, "mean_batch": 6.0}
+    assert len(Session.commits) == 1
+    created = [r for r in results if isinstance(r, Patient)]
+    errors = [r for r in results if isinstance(r, HTTPException)]
+    # Each caller gets its own id; the second claim on an email its own 400
+    assert len({p.id for p in created}) == 5
+    assert [e.status_code for e in errors] == [400]
+    assert all(p.created_at is not None for p in created)
+    with Session() as db:
+        assert db.scalar(select(func.count()).select_from(Patient)) == 5
+
+    doctors = _batched(monkeypatch, "doctor_writes", 3)
+    results = _concurrently(
+        Session,
+        service.create_doctor,
+        [DoctorCreate(full_name=f"Dr. G{i}", specialty="Batch") for i in range(3)],
+    )
+    assert doctors.stats()["batches"] == 1
+    assert all(d.active and d.id for d in results)
+
+
+def test_batched_bookings_conflict_per_caller(Session, monkeypatch):
+    with Session() as db:
+        db.add(Patient(fname="B", lname="K", email="b@example.com", age=40))
+        db.add_all(Doctor(full_name=f"Dr. {i}", specialty="Batch") for i in range(2))
+        db.commit()
+    base = (datetime.now(timezone.utc) + timedelta(days=3)).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    )
+    # Both doctor 1 requests want 09:00; only the first to arrive gets it
+    payloads = [
+        AppointmentCreate(
+            patient_id=1, doctor_id=doctor_id, start_time=base, duration=30
+        )
+        for doctor_id in (1, 1, 2, 2)
+    ]
+    appointments = _batched(monkeypatch, "appointment_writes", 4)
+    results = _concurrently(Session, service.create_appointment, payloads)
+
+    assert appointments.stats()["batches"] == 1
+    statuses = [getattr(r, "status_code", 201) for r in results]
+    assert sorted(statuses) == [201, 201, 409, 409]
+    booked = {r.doctor_id: r.id for r in results if isinstance(r, Appointment)}
+    with Session() as db:
+        rows = db.execute(select(Appointment.doctor_id, Appointment.id)).all()
+    assert dict(rows) == booked
+
+
+def test_window_closes_a_partial_batch():
+    seen = []
+
+    def run_batch(db, items):
+        seen.append(list(items))
+        return [ValueError("bad") if item < 0 else item * 10 for item in items]
+
+    committer = GroupCommitter(run_batch, window_ms=20, max_batch=100)
+    assert committer.submit(None, 4) == 40
+    with pytest.raises(ValueError):
+        committer.submit(None, -1)
+    assert seen == [[4], [-1]]
+    assert not GroupCommitter(run_batch, window_ms=0).enabled
+
+
+def test_async_group_commit(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'async_group.db'}"
+    engine = build_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    async def scenario():
+        async_engine = create_async_engine(to_async_url(url))
+        AsyncSession = async_sessionmaker(async_engine, expire_on_commit=False)
+        committer = AsyncGroupCommitter(
+            async_queries.patient_writes.run_batch, window_ms=1000, max_batch=4
+        )
+        monkeypatch.setattr(async_queries, "patient_writes", committer)
+
+        async def create(payload):
+            async with AsyncSession() as db:
+                try:
+                    return await async_queries.create_patient(db, payload)
+                except HTTPException as exc:
+                    return exc
+
+        payloads = [_patient(i) for i in range(3)] + [_patient(7, "group0@example.com")]
+        results = await asyncio.gather(*(create(p) for p in payloads))
+        await async_engine.dispose()
+        return committer, results
+
+    committer, results = asyncio.run(scenario())
+    assert committer.stats()["batches"] == 1
+    assert [type(r) for r in results] == [Patient, Patient, Patient, HTTPException]
@@ -0,0 +1,133 @@
+from sqlalchemy import select, text
+from sqlalchemy.exc import CompileError
+from sqlalchemy.orm import Session
+
+from src import migrations
+from src.database import build_engine
+from src.migrations import main, plan_upgrade, upgrade_schema
+from src.models.model import DailyScheduleSummary
+
+# An early schema: no phone column or unique email, no doctor `active`, only
+# the start_time index and the old two-column patient index on appointments
+# and no schedule rollup
+LEGACY_SCHEMA = [
+    "CREATE TABLE umar_patients_table (id INTEGER PRIMARY KEY,"
+    " fname VARCHAR(100) NOT NULL, lname VARCHAR(100) NOT NULL,"
+    " email VARCHAR(100) NOT NULL, age INTEGER NOT NULL,"
+    " created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,"
+    " updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL)",
+    "CREATE TABLE umar_doctors_table (id INTEGER PRIMARY KEY,"
+    " full_name VARCHAR(100) NOT NULL, specialty VARCHAR(100) NOT NULL,"
+    " created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL)",
+    "CREATE TABLE umar_appointments_table (id INTEGER PRIMARY KEY,"
+    " patient_id INTEGER REFERENCES umar_patients_table (id),"
+    " doctor_id INTEGER REFERENCES umar_doctors_table (id),"
+    " reason VARCHAR(200), start_time DATETIME NOT NULL,"
+    " duration INTEGER NOT NULL)",
+    "CREATE INDEX ix_umar_appointments_table_start_time"
+    " ON umar_appointments_table (start_time)",
+    "CREATE INDEX ix_appointments_patient_start"
+    " ON umar_appointments_table (patient_id, start_time)",
+    "INSERT INTO umar_patients_table (fname, lname, email, age)"
+    " VALUES ('Old', 'Row', 'old@example.com', 50)",
+    "INSERT INTO umar_doctors_table (full_name, specialty) VALUES ('Dr. Old', 'GP')",
+    "INSERT INTO umar_appointments_table"
+    " (patient_id, doctor_id, reason, start_time, duration) VALUES"
+    " (1, 1, 'a', '2030-01-07 09:00:00.000000', 30),"
+    " (1, 1, 'b', '2030-01-07 10:00:00.000000', 15)",
+]
+
+
+def test_upgrade_adds_missing_schema_in_place(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.execute(text(statement))
+
+    planned = plan_upgrade(engine)
+    changes = upgrade_schema(engine)
+    assert [c.name for c in planned] == [c.name for c in changes[: len(planned)]]
+    added = {(c.kind, c.name) for c in changes if c.status == "added"}
+    assert added == {
+        ("column", "ph_no"),
+        ("index", "ix_patients_name"),
+        ("index", "ix_patients_phone"),
+        ("unique", "uq_umar_patients_table_email"),
+        ("index", "ix_appointments_doctor_start_duration"),
+        ("index", "ix_appointments_patient_start_id"),
+        ("table", "umar_daily_schedule_summary"),
+        ("data", "rebuild_daily_summary"),
+    }
+    skipped = [c for c in changes if c.status == "skipped"]
+    assert [(c.table, c.name) for c in skipped] == [("umar_doctors_table", "active")]
+
+    with engine.connect() as conn:
+        # Existing rows survive and the planner has fresh statistics
+        assert conn.execute(text("SELECT email FROM umar_patients_table")).all() == [
+            ("old@example.com",)
+        ]
+        stats = conn.execute(text("SELECT DISTINCT idx FROM sqlite_stat1")).scalars()
+        assert "ix_appointments_patient_start_id" in set(stats)
+    with Session(engine) as db:
+        rollup = db.execute(
+            select(
+                DailyScheduleSummary.appointments, DailyScheduleSummary.booked_minutes
+            )
+        ).all()
+    assert rollup == [(2, 45)]
+
+    # Idempotent: only the change it cannot make is left
+    assert [c.status for c in plan_upgrade(engine)] == ["skipped"]
+    engine.dispose()
+
+
+def test_cli_reports_and_dry_run(tmp_path, capsys):
+    url = f"sqlite:///{tmp_path / 'cli.db'}"
+    assert main(["--url", url, "--dry-run"]) == 0
+    assert "missing table umar_patients_table" in capsys.readouterr().out
+
+    assert main(["--url", url]) == 0
+    out = capsys.readouterr().out
+    assert "added table umar_patients_table" in out
+    assert out.endswith("analyzed\n")
+
+    assert main(["--url", url]) == 0
+    assert capsys.readouterr().out == "schema is up to date\n"
+
+
+def test_failed_change_leaves_the_others_applied(tmp_path, monkeypatch, capsys):
+    apply = migrations._apply
+
+    def failing_apply(conn, metadata, change):
+        if change.name == "umar_doctors_table":
+            raise CompileError("no DDL for this backend")
+        apply(conn, metadata, change)
+
+    monkeypatch.setattr(migrations, "_apply", failing_apply)
+    url = f"sqlite:///{tmp_path / 'partial.db'}"
+    assert main(["--url", url]) == 1
+    out = capsys.readouterr().out
+    assert "failed table umar_doctors_table (no DDL for this backend)" in out
+    assert "added table umar_patients_table" in out
+
+
+def test_changed_index_definition_is_reported(tmp_path, capsys):
+    url = f"sqlite:///{tmp_path / 'drift.db'}"
+    assert main(["--url", url, "--no-analyze"]) == 0
+    engine = build_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_appointments_doctor_start_duration"))
+        conn.execute(
+            text(
+                "CREATE INDEX ix_appointments_doctor_start_duration"
+                " ON umar_appointments_table (doctor_id, start_time)"
+            )
+        )
+    engine.dispose()
+    capsys.readouterr()
+
+    assert main(["--url", url, "--dry-run"]) == 0
+    out = capsys.readouterr().out
+    assert "skipped index ix_appointments_doctor_start_duration" in out
+    assert "has (doctor_id, start_time), model has" in out
+    assert "schema is up to date" not in out
@@ -0,0 +1,66 @@
+import logging
+
+from fastapi.testclient import TestClient
+
+from src.database import engine
+from src.main import app
+from src.models.model import Base
+from src.observability import metrics
+
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+
+def _sample(body: str, prefix: str) -> float:
+    """Value of the first exposition line starting with `prefix`."""
+    line = next(line for line in body.splitlines() if line.startswith(prefix))
+    return float(line.rsplit(" ", 1)[1])
+
+
+def test_metrics_report_latency_and_sql_per_route():
+    metrics.reset()
+    doctor = client.post(
+        "/doctors", json={"full_name": "Dr. Metric", "specialty": "Ops"}
+    )
+    client.get(f"/doctors/{doctor.json()['id']}")
+    client.get("/doctors/999999")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+
+    route = 'method="GET",route="/doctors/{id}"'
+    assert _sample(body, f'http_requests_total{{{route},status="404"}}') == 1
+    assert _sample(body, f"http_request_duration_seconds_count{{{route}}}") == 2
+    assert (
+        _sample(body, f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}') == 2
+    )
+    post = 'method="POST",route="/doctors"'
+    assert _sample(body, f"db_queries_total{{{post}}}") >= 1
+    assert _sample(body, f"db_rows_total{{{post}}}") >= 1
+    assert 'cache_hits_total{cache="doctors"}' in body
+
+
+def test_slow_request_log_includes_sql(caplog):
+    metrics.slow_request_ms = 0
+    try:
+        with caplog.at_level(logging.WARNING, logger="src.observability"):
+            client.get("/patients/999999")
+    finally:
+        metrics.slow_request_ms = None
+
+    message = caplog.records[-1].getMessage()
+    assert "Slow request GET /patients/999999" in message
+    assert "FROM umar_patients_table" in message
+
+
+def test_disabled_metrics_record_nothing():
+    metrics.reset()
+    metrics.enabled = False
+    try:
+        client.get("/health")
+    finally:
+        metrics.enabled = True
+    assert "route=" not in metrics.render({})
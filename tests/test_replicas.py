@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src import replicas as routing
+from src.database import get_db
+from src.main import app
+from src.models.model import Base, Patient
+from src.replicas import READ_YOUR_WRITES_COOKIE, ReplicaSet
+
+SEARCH = "/patients/search?email=same@example.com"
+
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    """Primary and two "replica" SQLite files, told apart by a last name."""
+    urls = {}
+    engines = []
+    for name in ("primary", "a", "b"):
+        url = f"sqlite:///{tmp_path / f'{name}.db'}"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine)() as db:
+            db.add(Patient(fname="R", lname=name, email="same@example.com", age=30))
+            db.commit()
+        urls[name] = url
+        engines.append(engine)
+    Primary = sessionmaker(bind=engines[0])
+
+    def override_get_db():
+        with Primary() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    # Reads that no replica takes open their own primary session
+    monkeypatch.setattr(routing, "get_sessionmaker", lambda: Primary)
+    try:
+        yield urls
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        for engine in engines:
+            engine.dispose()
+
+
+def _use(monkeypatch, *urls, **options) -> ReplicaSet:
+    replicas = ReplicaSet(urls, **options)
+    monkeypatch.setattr(routing, "replicas", replicas)
+    return replicas
+
+
+def _read_from(client) -> str:
+    resp = client.get(SEARCH)
+    assert resp.status_code == 200
+    return resp.json()[0]["lname"] if resp.json() else None
+
+
+def test_reads_round_robin_over_replicas(databases, monkeypatch):
+    replicas = _use(monkeypatch, databases["a"], databases["b"])
+    opened = []
+    primary = routing.get_sessionmaker
+    monkeypatch.setattr(
+        routing, "get_sessionmaker", lambda: opened.append(1) or primary()
+    )
+    client = TestClient(app)
+    assert [_read_from(client) for _ in range(4)] == ["a", "b", "a", "b"]
+    # Replica reads never open a primary session
+    assert opened == []
+    # Writes always go to the primary
+    resp = client.post(
+        "/patients",
+        json={"fname": "W", "lname": "rite", "email": "w@example.com", "age": 40},
+    )
+    assert resp.status_code == 201
+    assert READ_YOUR_WRITES_COOKIE not in resp.cookies
+    assert [r["reads"] for r in replicas.stats()["replicas"]] == [2, 2]
+
+
+def test_unhealthy_replicas_are_skipped(databases, monkeypatch, tmp_path):
+    down = f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    replicas = _use(monkeypatch, down, databases["b"])
+    client = TestClient(app)
+    assert [_read_from(client) for _ in range(3)] == ["b", "b", "b"]
+    assert [r["healthy"] for r in replicas.stats()["replicas"]] == [False, True]
+
+    # With no healthy replica left, reads fall back to the primary
+    _use(monkeypatch, down)
+    assert _read_from(client) == "primary"
+
+    replicas = ReplicaSet([down, databases["a"]])
+
+    async def pick_then_shut_down():
+        replica = await replicas.pick_async()
+        pooled = replica._async_engine.pool.checkedin()
+        await replicas.dispose_async()
+        return replica, pooled, replica._async_engine.pool.checkedin()
+
+    replica, pooled, after_dispose = asyncio.run(pick_then_shut_down())
+    assert replica.url == databases["a"]
+    assert not replicas.replicas[0].healthy
+    # The health check's pooled connection is closed on shutdown
+    assert (pooled, after_dispose) == (1, 0)
+
+
+def test_read_your_writes_window(databases, monkeypatch):
+    _use(monkeypatch, databases["a"], read_your_writes=5)
+    writer, other = TestClient(app), TestClient(app)
+    resp = writer.post(
+        "/patients",
+        json={"fname": "N", "lname": "ew", "email": "new@example.com", "age": 40},
+    )
+    assert resp.status_code == 201
+    assert READ_YOUR_WRITES_COOKIE in resp.cookies
+
+    # The writer sees its patient on the primary; others read the lagging
+    # replica, which does not have it yet
+    assert len(writer.get("/patients/search?email=new@example.com").json()) == 1
+    assert other.get("/patients/search?email=new@example.com").json() == []
+    assert _read_from(writer) == "primary"
+    assert _read_from(other) == "a"
+
+    # A failed write pins nothing
+    resp = other.post(
+        "/patients",
+        json={"fname": "N", "lname": "ew", "email": "new@example.com", "age": 40},
+    )
+    assert resp.status_code == 400
+    assert READ_YOUR_WRITES_COOKIE not in resp.cookies
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.models.model import Appointment, Base, Doctor, Patient
+from src.schemas.schema import AppointmentCreate
+from src.services import queries as service
+from src.services.schedule_index import schedule_index
+from src.services.utils import IntervalSet
+
+
+def test_interval_set_union_merges_overlapping_and_touching():
+    schedule = IntervalSet()
+    for start, end in [(10, 20), (30, 40), (50, 60), (20, 25), (35, 55)]:
+        schedule.union(start, end)
+    assert list(zip(schedule.starts, schedule.ends)) == [(10, 25), (30, 60)]
+    assert schedule.overlaps(24, 26)
+    assert not schedule.overlaps(25, 30)
+
+
+@pytest.fixture
+def indexed_db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'index.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(Patient(fname="I", lname="X", email="i@example.com", age=30))
+        db.add_all(Doctor(full_name=f"Dr. {i}", specialty="Index") for i in range(2))
+        db.commit()
+    try:
+        with Session() as db:
+            yield engine, db
+    finally:
+        schedule_index.reset()
+        engine.dispose()
+
+
+def _payload(start, duration=30, doctor_id=1):
+    return AppointmentCreate(
+        patient_id=1, doctor_id=doctor_id, start_time=start, duration=duration
+    )
+
+
+def test_index_warms_and_tracks_bookings(indexed_db):
+    engine, db = indexed_db
+    base = (datetime.now(timezone.utc) + timedelta(days=2)).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    )
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Appointment),
+            [
+                # Long past rows are not loaded
+                {
+                    "patient_id": 1,
+                    "doctor_id": 1,
+                    "reason": "",
+                    "start_time": base - timedelta(days=30),
+                    "duration": 30,
+                },
+                {
+                    "patient_id": 1,
+                    "doctor_id": 1,
+                    "reason": "",
+                    "start_time": base,
+                    "duration": 60,
+                },
+            ],
+        )
+    assert schedule_index.warm(db) == 1
+    assert schedule_index.stats()["memory_bytes"] > 0
+
+    assert schedule_index.overlaps(1, base + timedelta(minutes=30), 30)
+    assert not schedule_index.overlaps(2, base, 30)
+
+    service.create_appointment(db, _payload(base + timedelta(hours=1)))
+    assert schedule_index.overlaps(1, base + timedelta(minutes=75), 15)
+
+    with pytest.raises(HTTPException) as exc:
+        service.create_appointment(db, _payload(base + timedelta(minutes=80)))
+    assert exc.value.status_code == 409
+    assert schedule_index.stats()["conflicts"] >= 1
+
+    results = service.create_appointments_bulk(
+        db, [_payload(base, doctor_id=2), _payload(base + timedelta(hours=3))]
+    )
+    assert [r["status"] for r in results] == ["created", "created"]
+    assert schedule_index.overlaps(2, base + timedelta(minutes=15), 15)
+
+
+def test_stale_index_is_caught_by_database_check(indexed_db):
+    engine, db = indexed_db
+    schedule_index.warm(db)
+    start = (datetime.now(timezone.utc) + timedelta(days=3)).replace(
+        minute=0, second=0, microsecond=0
+    )
+    # Booked behind the index's back, as another process would
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Appointment),
+            [
+                {
+                    "patient_id": 1,
+                    "doctor_id": 1,
+                    "reason": "",
+                    "start_time": start,
+                    "duration": 30,
+                }
+            ],
+        )
+    assert schedule_index.overlaps(1, start, 30) is False
+
+    with pytest.raises(HTTPException) as exc:
+        service.create_appointment(db, _payload(start))
+    assert exc.value.status_code == 409
+    # The conflicting window was pulled into the index
+    assert schedule_index.overlaps(1, start, 30)
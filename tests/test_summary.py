@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.database import get_db
+from src.replicas import get_read_db
+from src.main import app
+from src.models.model import Appointment, Base, Doctor, Patient
+from src.schemas.schema import AppointmentCreate
+from src.services import queries as service
+from src.services import summary
+from src.services.summary import get_daily_summary, rebuild_daily_summary
+
+
+@pytest.fixture
+def summary_db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'summary.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(Patient(fname="S", lname="R", email="s@example.com", age=30))
+        db.add_all(Doctor(full_name=f"Dr. {i}", specialty="Rollup") for i in range(2))
+        db.commit()
+    try:
+        with Session() as db:
+            yield engine, db
+    finally:
+        engine.dispose()
+
+
+def _rollup(db, start, end):
+    return [
+        (s.doctor_id, s.day, s.appointments, s.booked_minutes)
+        for s in get_daily_summary(db, start, end)
+    ]
+
+
+@pytest.mark.parametrize("chunk", [service.IN_CLAUSE_CHUNK, 2])
+def test_bookings_maintain_rollup(summary_db, monkeypatch, chunk):
+    _, db = summary_db
+    # Small chunks split the lock and rollup IN lists across statements
+    monkeypatch.setattr(service, "IN_CLAUSE_CHUNK", chunk)
+    monkeypatch.setattr(summary, "IN_CLAUSE_CHUNK", chunk)
+    base = (datetime.now(timezone.utc) + timedelta(days=2)).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    )
+    day = base.date()
+    service.create_appointment(
+        db, AppointmentCreate(patient_id=1, doctor_id=1, start_time=base, duration=30)
+    )
+    results = service.create_appointments_bulk(
+        db,
+        [
+            AppointmentCreate(patient_id=1, doctor_id=d, start_time=start, duration=45)
+            for d, start in [
+                (1, base + timedelta(hours=1)),
+                (1, base + timedelta(minutes=15)),  # conflict: not counted
+                (2, base),
+                (2, base + timedelta(days=1)),
+            ]
+        ],
+    )
+    assert [r["status"] for r in results] == [
+        "created",
+        "conflict",
+        "created",
+        "created",
+    ]
+    with pytest.raises(HTTPException):
+        service.create_appointment(
+            db,
+            AppointmentCreate(patient_id=1, doctor_id=1, start_time=base, duration=30),
+        )
+
+    expected = [
+        (1, day, 2, 75),
+        (2, day, 1, 45),
+        (2, day + timedelta(days=1), 1, 45),
+    ]
+    assert _rollup(db, day, day + timedelta(days=1)) == expected
+    assert _rollup(db, day, day) == expected[:2]
+
+    # A rebuild from the base table lands on the same numbers
+    assert rebuild_daily_summary(db, batch_size=1) == 3
+    assert _rollup(db, day, day + timedelta(days=1)) == expected
+
+
+def test_rebuild_picks_up_rows_written_directly(summary_db):
+    engine, db = summary_db
+    start = datetime(2030, 3, 1, 23, 30, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Appointment),
+            [
+                {
+                    "patient_id": 1,
+                    "doctor_id": 1 + i % 2,
+                    "reason": "",
+                    "start_time": start + timedelta(minutes=30 * i),
+                    "duration": 30,
+                }
+                for i in range(4)
+            ],
+        )
+    assert _rollup(db, start.date(), start.date()) == []
+    assert rebuild_daily_summary(db) == 3
+    assert _rollup(db, start.date(), start.date() + timedelta(days=1)) == [
+        (1, start.date(), 1, 30),
+        (1, start.date() + timedelta(days=1), 1, 30),
+        (2, start.date() + timedelta(days=1), 2, 60),
+    ]
+
+
+def test_stats_endpoint_filters(summary_db):
+    _, db = summary_db
+    base = (datetime.now(timezone.utc) + timedelta(days=3)).replace(
+        hour=9, minute=0, second=0, microsecond=0
+    )
+    for doctor_id in (1, 2):
+        service.create_appointment(
+            db,
+            AppointmentCreate(
+                patient_id=1, doctor_id=doctor_id, start_time=base, duration=60
+            ),
+        )
+
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_read_db] = lambda: db
+    try:
+        client = TestClient(app)
+        day = base.date().isoformat()
+        resp = client.get(f"/stats/appointments?start_date={day}&doctor_id=2")
+        assert resp.status_code == 200
+        assert resp.json() == [
+            {"doctor_id": 2, "day": day, "appointments": 1, "booked_minutes": 60}
+        ]
+        assert len(client.get(f"/stats/appointments?start_date={day}").json()) == 2
+        too_long = base.date() + timedelta(days=400)
+        resp = client.get(f"/stats/appointments?start_date={day}&end_date={too_long}")
+        assert resp.status_code == 422
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_read_db, None)